@@ -0,0 +1,341 @@
+/*
+ * 五子棋AI热点计算的C实现（可选）。编译：python build_kernels.py
+ *
+ * 与纯Python实现逐位一致（见 native.py 的自检）：
+ *   window_points    对应 bitboard.BitBoard.window_points
+ *   update_codes     对应 evaluator.EvalBoard._update
+ *   score_from_codes 对应 ai._score_from_codes（需先由 patterns.py 调用 set_tables）
+ */
+#define PY_SSIZE_T_CLEAN
+#include <Python.h>
+#include <stdint.h>
+
+#define BOARD_SIZE 15
+#define STRIDE (BOARD_SIZE + 1)
+#define CELL_COUNT (STRIDE * BOARD_SIZE)
+#define PATTERN_COUNT 65536
+#define OUTSIDE 3
+/* 窗口最远伸出 4 * (STRIDE + 1) 格，数组末尾补棋盘外标记 */
+#define PADDED_COUNT (CELL_COUNT + 4 * (STRIDE + 1) + 1)
+#define MASK_WORDS ((CELL_COUNT + 63) / 64)
+
+static const int SHIFTS[4] = {1, STRIDE, STRIDE + 1, STRIDE - 1};
+
+/* PATTERN_TABLE[player][code] 的三项，下标 player 为 1、2 */
+static int32_t *table_player[3];
+static int32_t *table_opponent[3];
+static unsigned char *table_two[3];
+static double center_bonus[CELL_COUNT];
+static long score_four;
+static long score_two;
+static int tables_ready = 0;
+
+
+static int
+read_cells(PyObject *cells, unsigned char *out)
+{
+    if (!PyList_Check(cells) || PyList_GET_SIZE(cells) != CELL_COUNT) {
+        PyErr_SetString(PyExc_ValueError, "cells 必须是长度为 STRIDE*BOARD_SIZE 的列表");
+        return -1;
+    }
+    for (Py_ssize_t i = 0; i < CELL_COUNT; i++) {
+        long value = PyLong_AsLong(PyList_GET_ITEM(cells, i));
+        if (value == -1 && PyErr_Occurred())
+            return -1;
+        out[i] = (i % STRIDE == BOARD_SIZE) ? OUTSIDE : (unsigned char)value;  /* 哨兵列不可落子 */
+    }
+    for (Py_ssize_t i = CELL_COUNT; i < PADDED_COUNT; i++)
+        out[i] = OUTSIDE;
+    return 0;
+}
+
+
+static PyObject *
+mask_to_long(const uint64_t *words)
+{
+    PyObject *result = PyLong_FromUnsignedLongLong(words[MASK_WORDS - 1]);
+    PyObject *shift = PyLong_FromLong(64);
+    if (result == NULL || shift == NULL)
+        goto error;
+    for (int i = MASK_WORDS - 2; i >= 0; i--) {
+        PyObject *shifted = PyNumber_Lshift(result, shift);
+        Py_DECREF(result);
+        result = NULL;
+        if (shifted == NULL)
+            goto error;
+        PyObject *low = PyLong_FromUnsignedLongLong(words[i]);
+        if (low == NULL) {
+            Py_DECREF(shifted);
+            goto error;
+        }
+        result = PyNumber_Or(shifted, low);
+        Py_DECREF(shifted);
+        Py_DECREF(low);
+        if (result == NULL)
+            goto error;
+    }
+    Py_DECREF(shift);
+    return result;
+error:
+    Py_XDECREF(result);
+    Py_XDECREF(shift);
+    return NULL;
+}
+
+
+PyDoc_STRVAR(window_points_doc,
+"window_points(cells, player, count)\n\n"
+"所有“恰有count颗player棋子、其余格为空”的五格窗口中的空位（掩码）。");
+
+static PyObject *
+window_points(PyObject *module, PyObject *const *args, Py_ssize_t nargs)
+{
+    unsigned char cells[PADDED_COUNT];
+    uint64_t words[MASK_WORDS] = {0};
+
+    if (nargs != 3) {
+        PyErr_SetString(PyExc_TypeError, "window_points 需要3个参数");
+        return NULL;
+    }
+    long player = PyLong_AsLong(args[1]);
+    long count = PyLong_AsLong(args[2]);
+    if (PyErr_Occurred() || read_cells(args[0], cells) < 0)
+        return NULL;
+
+    for (int d = 0; d < 4; d++) {
+        int s = SHIFTS[d];
+        for (int start = 0; start < CELL_COUNT; start++) {
+            int own = 0, empty = 0;
+            for (int k = 0; k < 5; k++) {
+                unsigned char cell = cells[start + k * s];
+                if (cell == player)
+                    own++;
+                else if (cell == 0)
+                    empty++;
+                else
+                    break;
+            }
+            if (own != count || own + empty != 5)
+                continue;
+            for (int k = 0; k < 5; k++) {
+                int index = start + k * s;
+                if (cells[index] == 0)
+                    words[index >> 6] |= (uint64_t)1 << (index & 63);
+            }
+        }
+    }
+    return mask_to_long(words);
+}
+
+
+PyDoc_STRVAR(update_codes_doc,
+"update_codes(codes, slots, cells, delta, cache_black, cache_white)\n\n"
+"codes[slot] += delta * weight，并作废受影响格子的评估缓存。");
+
+static PyObject *
+update_codes(PyObject *module, PyObject *const *args, Py_ssize_t nargs)
+{
+    if (nargs != 6) {
+        PyErr_SetString(PyExc_TypeError, "update_codes 需要6个参数");
+        return NULL;
+    }
+    PyObject *codes = args[0], *slots = args[1], *affected = args[2];
+    PyObject *cache_black = args[4], *cache_white = args[5];
+    long delta = PyLong_AsLong(args[3]);
+    if (delta == -1 && PyErr_Occurred())
+        return NULL;
+    if (!PyList_Check(codes) || !PyTuple_Check(slots) || !PyTuple_Check(affected) ||
+            !PyList_Check(cache_black) || !PyList_Check(cache_white)) {
+        PyErr_SetString(PyExc_TypeError, "update_codes 参数类型错误");
+        return NULL;
+    }
+
+    Py_ssize_t code_count = PyList_GET_SIZE(codes);
+    for (Py_ssize_t i = 0; i < PyTuple_GET_SIZE(slots); i++) {
+        PyObject *pair = PyTuple_GET_ITEM(slots, i);
+        Py_ssize_t slot = PyLong_AsSsize_t(PyTuple_GET_ITEM(pair, 0));
+        long weight = PyLong_AsLong(PyTuple_GET_ITEM(pair, 1));
+        if (PyErr_Occurred())
+            return NULL;
+        if (slot < 0 || slot >= code_count) {
+            PyErr_SetString(PyExc_IndexError, "窗口编码下标越界");
+            return NULL;
+        }
+        long code = PyLong_AsLong(PyList_GET_ITEM(codes, slot));
+        if (code == -1 && PyErr_Occurred())
+            return NULL;
+        PyObject *value = PyLong_FromLong(code + delta * weight);
+        if (value == NULL)
+            return NULL;
+        if (PyList_SetItem(codes, slot, value) < 0)  /* 接管新值的引用并释放旧值 */
+            return NULL;
+    }
+
+    Py_ssize_t cache_count = PyList_GET_SIZE(cache_black);
+    if (PyList_GET_SIZE(cache_white) != cache_count) {
+        PyErr_SetString(PyExc_ValueError, "两方评估缓存长度不同");
+        return NULL;
+    }
+    for (Py_ssize_t i = 0; i < PyTuple_GET_SIZE(affected); i++) {
+        Py_ssize_t cell = PyLong_AsSsize_t(PyTuple_GET_ITEM(affected, i));
+        if (cell == -1 && PyErr_Occurred())
+            return NULL;
+        if (cell < 0 || cell >= cache_count) {
+            PyErr_SetString(PyExc_IndexError, "格子下标越界");
+            return NULL;
+        }
+        Py_INCREF(Py_None);
+        if (PyList_SetItem(cache_black, cell, Py_None) < 0)
+            return NULL;
+        Py_INCREF(Py_None);
+        if (PyList_SetItem(cache_white, cell, Py_None) < 0)
+            return NULL;
+    }
+    Py_RETURN_NONE;
+}
+
+
+PyDoc_STRVAR(set_tables_doc,
+"set_tables(table_black, table_white, center_bonus, score_four, score_two)\n\n"
+"载入 patterns.PATTERN_TABLE[1]、[2] 和 CENTER_BONUS，供 score_from_codes 使用。");
+
+static int
+load_table(PyObject *table, int player)
+{
+    if (!PyList_Check(table) || PyList_GET_SIZE(table) != PATTERN_COUNT) {
+        PyErr_SetString(PyExc_ValueError, "棋型表长度错误");
+        return -1;
+    }
+    for (Py_ssize_t code = 0; code < PATTERN_COUNT; code++) {
+        PyObject *entry = PyList_GET_ITEM(table, code);
+        if (!PyTuple_Check(entry) || PyTuple_GET_SIZE(entry) != 3) {
+            PyErr_SetString(PyExc_ValueError, "棋型表条目应为 (己方分, 对方分, 活二标记)");
+            return -1;
+        }
+        long own = PyLong_AsLong(PyTuple_GET_ITEM(entry, 0));
+        long opponent = PyLong_AsLong(PyTuple_GET_ITEM(entry, 1));
+        long two = PyLong_AsLong(PyTuple_GET_ITEM(entry, 2));
+        if (PyErr_Occurred())
+            return -1;
+        table_player[player][code] = (int32_t)own;
+        table_opponent[player][code] = (int32_t)opponent;
+        table_two[player][code] = (unsigned char)two;
+    }
+    return 0;
+}
+
+static PyObject *
+set_tables(PyObject *module, PyObject *args)
+{
+    PyObject *black, *white, *bonus;
+    if (!PyArg_ParseTuple(args, "OOOll", &black, &white, &bonus, &score_four, &score_two))
+        return NULL;
+    for (int player = 1; player <= 2; player++) {
+        if (table_player[player] == NULL) {
+            table_player[player] = PyMem_Malloc(sizeof(int32_t) * PATTERN_COUNT);
+            table_opponent[player] = PyMem_Malloc(sizeof(int32_t) * PATTERN_COUNT);
+            table_two[player] = PyMem_Malloc(PATTERN_COUNT);
+            if (!table_player[player] || !table_opponent[player] || !table_two[player])
+                return PyErr_NoMemory();
+        }
+    }
+    tables_ready = 0;
+    if (load_table(black, 1) < 0 || load_table(white, 2) < 0)
+        return NULL;
+    if (!PyList_Check(bonus) || PyList_GET_SIZE(bonus) != CELL_COUNT) {
+        PyErr_SetString(PyExc_ValueError, "CENTER_BONUS 长度错误");
+        return NULL;
+    }
+    for (Py_ssize_t i = 0; i < CELL_COUNT; i++) {
+        center_bonus[i] = PyFloat_AsDouble(PyList_GET_ITEM(bonus, i));
+        if (PyErr_Occurred())
+            return NULL;
+    }
+    tables_ready = 1;
+    Py_RETURN_NONE;
+}
+
+
+PyDoc_STRVAR(score_from_codes_doc,
+"score_from_codes(player, codes, index)\n\n"
+"由四个方向的窗口编码计算落子分数（浮点运算顺序与Python实现相同）。");
+
+static PyObject *
+score_from_codes(PyObject *module, PyObject *const *args, Py_ssize_t nargs)
+{
+    if (nargs != 3) {
+        PyErr_SetString(PyExc_TypeError, "score_from_codes 需要3个参数");
+        return NULL;
+    }
+    if (!tables_ready) {
+        PyErr_SetString(PyExc_RuntimeError, "尚未调用 set_tables");
+        return NULL;
+    }
+    long player = PyLong_AsLong(args[0]);
+    Py_ssize_t index = PyLong_AsSsize_t(args[2]);
+    if (PyErr_Occurred())
+        return NULL;
+    PyObject *codes = args[1];
+    if ((player != 1 && player != 2) || !PyList_Check(codes) || index < 0 || index >= CELL_COUNT ||
+            index * 4 + 3 >= PyList_GET_SIZE(codes)) {
+        PyErr_SetString(PyExc_ValueError, "score_from_codes 参数错误");
+        return NULL;
+    }
+
+    long code[4];
+    int two_count = 0;
+    for (int d = 0; d < 4; d++) {
+        code[d] = PyLong_AsLong(PyList_GET_ITEM(codes, index * 4 + d));
+        if (code[d] == -1 && PyErr_Occurred())
+            return NULL;
+        if (code[d] < 0 || code[d] >= PATTERN_COUNT) {
+            PyErr_SetString(PyExc_IndexError, "窗口编码越界");
+            return NULL;
+        }
+        two_count += table_two[player][code[d]];
+    }
+    int is_high_risk = two_count >= 2;
+
+    double score = 0;
+    for (int d = 0; d < 4; d++) {
+        long own = table_player[player][code[d]];
+        long opponent = table_opponent[player][code[d]];
+        if (opponent >= score_four)
+            score += (double)(opponent * 3);
+        else if (is_high_risk && opponent >= score_two)
+            score += (double)(opponent * 2);
+        else if (opponent >= score_two)
+            score += (double)own * 1.2 + (double)opponent * 0.3;
+        else
+            score += (double)own * 1.5 + (double)opponent * 0.5;
+    }
+    score += center_bonus[index];
+    return PyFloat_FromDouble(score);
+}
+
+
+static PyMethodDef kernel_methods[] = {
+    {"window_points", (PyCFunction)(void (*)(void))window_points, METH_FASTCALL, window_points_doc},
+    {"update_codes", (PyCFunction)(void (*)(void))update_codes, METH_FASTCALL, update_codes_doc},
+    {"set_tables", set_tables, METH_VARARGS, set_tables_doc},
+    {"score_from_codes", (PyCFunction)(void (*)(void))score_from_codes, METH_FASTCALL, score_from_codes_doc},
+    {NULL, NULL, 0, NULL}
+};
+
+static struct PyModuleDef kernel_module = {
+    PyModuleDef_HEAD_INIT, "_kernels", "五子棋AI热点计算的C实现", -1, kernel_methods
+};
+
+PyMODINIT_FUNC
+PyInit__kernels(void)
+{
+    PyObject *module = PyModule_Create(&kernel_module);
+    if (module == NULL)
+        return NULL;
+    if (PyModule_AddIntConstant(module, "BOARD_SIZE", BOARD_SIZE) < 0 ||
+            PyModule_AddIntConstant(module, "STRIDE", STRIDE) < 0) {
+        Py_DECREF(module);
+        return NULL;
+    }
+    return module;
+}
@@ -1,146 +1,51 @@
-import math
 import random
-from game_logic import check_win  # 依赖外部胜负判断函数
+import time
 import first  # 导入精简后的开局库
-
-# 评分常量（定义棋型价值）
-SCORE_FIVE = 10000000
-SCORE_FOUR = 100000
-SCORE_BLOCKED_FOUR = 10000
-SCORE_THREE = 1000  
-SCORE_BLOCKED_THREE = 100
-SCORE_TWO = 100
-SCORE_BLOCKED_TWO = 10
-
-def evaluate_line(line, center_index, player_str):
-    """评估单条线上的棋型分数（辅助评估函数）"""
-    count = 0  # 连续同色棋子数（不含中心位置）
-    block_left = 0  # 左侧阻挡（1=阻挡，0=空）
-    block_right = 0  # 右侧阻挡
-
-    # 向左统计连续棋子
-    for i in range(center_index - 1, -1, -1):
-        if line[i] == player_str:
-            count += 1
-        else:
-            # 边界（#）或对方棋子视为阻挡
-            if line[i] == '#' or line[i] not in ('0', player_str):
-                block_left = 1
-            break
-
-    # 向右统计连续棋子
-    for i in range(center_index + 1, len(line)):
-        if line[i] == player_str:
-            count += 1
-        else:
-            if line[i] == '#' or line[i] not in ('0', player_str):
-                block_right = 1
-            break
-
-    total_block = block_left + block_right
-
-    # 根据棋型返回分数
-    if count >= 4:
-        return SCORE_FIVE
-    if count == 3 and total_block == 0:
-        return SCORE_FOUR
-    if count == 3 and total_block == 1:
-        return SCORE_BLOCKED_FOUR
-    if count == 2 and total_block == 0:
-        return SCORE_THREE
-    if count == 2 and total_block == 1:
-        return SCORE_BLOCKED_THREE
-    if count == 1 and total_block == 0:
-        return SCORE_TWO
-    if count == 1 and total_block == 1:
-        return SCORE_BLOCKED_TWO
-    return 0
-
-
-def is_double_two_threat(board, opponent, x, y):
-    """检测(x,y)是否被对方的两个活二同时指向（高风险点）"""
-    if board[y][x] != 0:
-        return False  # 非空位不考虑
-
-    size = len(board)
-    directions = [(1, 0), (0, 1), (1, 1), (1, -1)]  # 四个方向
-    two_count = 0  # 活二指向该点的数量
-
-    # 模拟对方在(x,y)落子，检查是否形成活二（可发展为活三）
-    board[y][x] = opponent  # 临时落子
-
-    for dx, dy in directions:
-        # 提取当前方向的9个位置（-4到+4）
-        line = []
-        for i in range(-4, 5):
-            nx, ny = x + dx * i, y + dy * i
-            if 0 <= nx < size and 0 <= ny < size:
-                line.append(board[ny][nx])
-            else:
-                line.append(-1)  # 边界标记
-        center_idx = 4  # (x,y)在line中的位置
-
-        # 统计当前方向的连续子数（不含中心）和阻挡情况
-        left_count = 0
-        left_block = 0
-        for i in range(center_idx - 1, -1, -1):
-            if line[i] == opponent:
-                left_count += 1
-            else:
-                left_block = 1 if line[i] != 0 else 0  # 非空即阻挡
-                break
-
-        right_count = 0
-        right_block = 0
-        for i in range(center_idx + 1, len(line)):
-            if line[i] == opponent:
-                right_count += 1
-            else:
-                right_block = 1 if line[i] != 0 else 0
-                break
-
-        total_count = left_count + right_count  # 连续子数（不含中心）
-        total_block = left_block + right_block
-
-        # 若形成“活二”（连续1子+中心=2子，两端无挡，可发展为活三）
-        if total_count == 1 and total_block == 0:
-            two_count += 1
-
-    # 回溯（清除临时落子）
-    board[y][x] = 0
-
-    # 两个及以上方向的活二指向该点 → 高风险
-    return two_count >= 2
-
-
-def evaluate_position(board, player, x, y):
-    """评估落子(x,y)后的全局分数（平衡攻防，区分普通/关键威胁）"""
-    size = len(board)
-    if board[y][x] != 0:
-        return 0  # 非空位置分数为0
-
-    directions = [(1, 0), (0, 1), (1, 1), (1, -1)]  # 四个方向
+from bitboard import STRIDE, iter_bits, popcount
+from transposition import TranspositionTable, DEFAULT_TT_SIZE, EXACT, LOWER, UPPER
+from patterns import SCORE_FIVE, SCORE_FOUR, SCORE_THREE, SCORE_TWO, PATTERN_TABLE, CENTER_BONUS
+from evaluator import EvalBoard
+from move_ordering import MoveOrdering
+from threat_search import find_vcf, find_vct
+from vector_eval import fill_score_cache
+from native import kernels
+import solved_cache
+
+# 难度 → (最大搜索深度, 默认每步思考时间预算/毫秒)
+DIFFICULTY_SETTINGS = {
+    3: (3, 2000),  # 简单
+    4: (4, 5000),  # 正常
+    5: (5, 10000),  # 困难
+}
+
+# 候选点范围：与已有棋子的距离不超过该值（1为周围一圈，2更接近强引擎但分支更多）
+CANDIDATE_RADIUS = 1
+
+# 威胁空间搜索（VCF/VCT）各自最多占用本步时间预算的比例
+VCF_TIME_SHARE = 0.1
+VCT_TIME_SHARE = 0.2
+
+# 静态搜索：minmax 到达叶子时给出棋型静态分，并继续只展开冲四、活三等强制走法
+QUIESCENCE = True
+QS_MAX_MOVES = 3  # 静态搜索每层最多试的强制走法数
+QS_MAX_PLY = 6  # 静态搜索最多延伸的层数
+QS_SCORE_LIMIT = SCORE_FIVE // 10  # 静态分的上限，远小于成五分，不会被当成已分胜负
+
+# 是否使用跨对局保留的已解局面缓存（见 solved_cache）；基准测试、对战场需要可复现时关闭
+USE_SOLVED_CACHE = True
+
+
+def _score_from_codes_python(player, codes, index):
+    """由四个方向的窗口编码计算落子分数"""
+    table = PATTERN_TABLE[player]
+    base = index * 4
+    entries = (table[codes[base]], table[codes[base + 1]], table[codes[base + 2]], table[codes[base + 3]])
+
+    # 当前点是否是对方的“双活二威胁点”（高风险需优先防御）
+    is_high_risk = entries[0][2] + entries[1][2] + entries[2][2] + entries[3][2] >= 2
     score = 0
-    opponent = 3 - player
-
-    # 检测当前点是否是对方的“双活二威胁点”（高风险需优先防御）
-    is_high_risk = is_double_two_threat(board, opponent, x, y)
-
-    for dx, dy in directions:
-        # 提取当前方向的9个位置（-4到+4）
-        line = []
-        for i in range(-4, 5):
-            nx, ny = x + dx * i, y + dy * i
-            if 0 <= nx < size and 0 <= ny < size:
-                line.append(str(board[ny][nx]))
-            else:
-                line.append('#')  # 边界标记
-        center_index = 4  # 当前落子在line中的位置
-
-        # 计算玩家和对手的分数
-        player_score = evaluate_line(line, center_index, str(player))
-        opponent_score = evaluate_line(line, center_index, str(opponent))
 
+    for player_score, opponent_score, _ in entries:
         # 攻防权重调整（核心优化）：
         if opponent_score >= SCORE_FOUR:
             # 对方高威胁（冲四、活四）：最高优先级防御
@@ -158,38 +63,54 @@ def evaluate_position(board, player, x, y):
                 score += player_score * 1.5 + opponent_score * 0.5
 
     # 中心区域加成（鼓励早期抢占中心）
-    center_x, center_y = size // 2, size // 2
-    distance = math.sqrt((x - center_x) ** 2 + (y - center_y) ** 2)
-    score += max(0, 100 - distance * 5)
+    score += CENTER_BONUS[index]
 
     return score
 
 
-def get_candidate_moves(board, player, n=15):
-    """获取候选落子（减少搜索范围，优先有邻棋的位置）"""
-    size = len(board)
+# 编译了C扩展时用 _kernels 中逐位一致的实现（见 native）
+_score_from_codes = kernels.score_from_codes if kernels is not None else _score_from_codes_python
+
+
+def evaluate_position(board, player, x, y):
+    """评估落子(x,y)后的全局分数（平衡攻防，区分普通/关键威胁）
+
+    board 为 EvalBoard：各方向的窗口编码随落子增量维护，查 patterns.PATTERN_TABLE
+    即得双方分数和对方活二标记；分数按格缓存，只有经过最近落子点的四条线上的格子需要重算。
+    """
+    index = y * STRIDE + x
+    if board.cells[index] != 0:
+        return 0  # 非空位置分数为0
+
+    cache = board.score_cache[player]
+    score = cache[index]
+    if score is None:
+        score = cache[index] = _score_from_codes(player, board.codes, index)
+    return score
+
+
+def get_candidate_moves(board, player, n=15, stats=None):
+    """获取候选落子（减少搜索范围，优先有邻棋的位置）
+
+    stats 为 search_stats.SearchStats 时分别统计打分和生成候选点的用时。
+    """
+    if stats is not None:
+        start = time.perf_counter()
+    size = board.size
     candidate_moves = []
-    opponent = 3 - player
 
-    for y in range(size):
-        for x in range(size):
-            if board[y][x] == 0:
-                # 只保留有邻棋的位置（减少无效计算）
-                has_neighbor = False
-                for dy in (-1, 0, 1):
-                    for dx in (-1, 0, 1):
-                        if dx == 0 and dy == 0:
-                            continue
-                        nx, ny = x + dx, y + dy
-                        if 0 <= nx < size and 0 <= ny < size and board[ny][nx] != 0:
-                            has_neighbor = True
-                            break
-                    if has_neighbor:
-                        break
-                if has_neighbor:
-                    # 用评估函数打分，筛选高价值候选
-                    score = evaluate_position(board, player, x, y)
-                    candidate_moves.append((x, y, score))
+    # 只保留有邻棋的空位：棋盘随落子增量维护的邻域（范围见 CANDIDATE_RADIUS）
+    neighbors = board.candidates
+
+    if stats is not None:
+        eval_start = time.perf_counter()
+    for x, y in iter_bits(neighbors):
+        # 用评估函数打分，筛选高价值候选
+        score = evaluate_position(board, player, x, y)
+        candidate_moves.append((x, y, score))
+    if stats is not None:
+        eval_end = time.perf_counter()
+        stats.time_eval += eval_end - eval_start
 
     # 若无候选，默认中心
     if not candidate_moves:
@@ -198,57 +119,255 @@ def get_candidate_moves(board, player, n=15):
 
     # 按分数排序，取前n个
     candidate_moves.sort(key=lambda m: m[2], reverse=True)
+    if stats is not None:
+        stats.time_movegen += time.perf_counter() - start - (eval_end - eval_start)
     return candidate_moves[:n]
 
 
 def check_winning_move(board, player):
     """检查是否有一步必胜的走法（最高优先级）"""
-    size = len(board)
-    for y in range(size):
-        for x in range(size):
-            if board[y][x] == 0:
-                board[y][x] = player  # 模拟落子
-                if check_win(board, player):
-                    board[y][x] = 0  # 回溯
-                    return (x, y)
-                board[y][x] = 0  # 回溯
+    points = board.winning_points(player)
+    for move in iter_bits(points):
+        return move
     return None
 
 
-def minmax(board, player, depth, alpha, beta):
-    """minimax算法（带alpha-beta剪枝，强化进攻倾向）"""
+class SearchTimeout(Exception):
+    """搜索超出时间预算或被外部取消"""
+
+
+class SearchContext:
+    """一次ai_move搜索中各层minmax共享的状态"""
+
+    def __init__(self, tt=None, deadline=None, should_stop=None, stats=None, ordering=None, quiescence=None):
+        self.tt = tt  # 置换表，None表示不使用
+        self.deadline = deadline  # time.monotonic() 截止时刻，None表示不限时
+        self.should_stop = should_stop  # 返回True时停止搜索（用于取消后台搜索）
+        self.stats = stats  # search_stats.SearchStats，None表示不统计
+        self.ordering = ordering  # move_ordering.MoveOrdering，None表示只按静态评分排序
+        self.quiescence = QUIESCENCE if quiescence is None else quiescence  # 叶子节点是否做静态搜索
+        self.root_depth = 0  # 当前迭代的搜索深度，层数 = root_depth - 剩余深度
+        self.completed_depth = 0  # 迭代加深中最后一次完整搜索（得到了走法）的深度
+        self.nodes = 0  # 含静态搜索的节点
+        self.qs_nodes = 0  # 其中静态搜索的节点数
+
+    def check_time(self):
+        if self.deadline is not None and time.monotonic() >= self.deadline:
+            raise SearchTimeout()
+        if self.should_stop is not None and self.should_stop():
+            raise SearchTimeout()
+
+
+def static_evaluation(board, player):
+    """轮到player落子时的局面静态分：己方最佳落点形成的棋型分减去对方最佳落点的棋型分（查 PATTERN_TABLE）"""
+    table = PATTERN_TABLE[player]
+    codes = board.codes
+    own = 0
+    threat = 0
+    for x, y in iter_bits(board.candidates):
+        base = (y * STRIDE + x) * 4
+        e0, e1, e2, e3 = table[codes[base]], table[codes[base + 1]], table[codes[base + 2]], table[codes[base + 3]]
+        score = e0[0] + e1[0] + e2[0] + e3[0]
+        if score > own:
+            own = score
+        score = e0[1] + e1[1] + e2[1] + e3[1]
+        if score > threat:
+            threat = score
+    return max(-QS_SCORE_LIMIT, min(QS_SCORE_LIMIT, own - threat))
+
+
+def _forcing_moves(board, player):
+    """己方的强制走法：先冲四/活四（含跳四），再活三，各自按评分从高到低"""
+    fours = board.window_points(player, 3)
+    table = PATTERN_TABLE[player]
+    codes = board.codes
+    four_moves = []
+    three_moves = []
+    for x, y in iter_bits(board.candidates):
+        score = evaluate_position(board, player, x, y)
+        if fours >> (y * STRIDE + x) & 1:
+            four_moves.append((score, x, y))
+            continue
+        base = (y * STRIDE + x) * 4
+        if (table[codes[base]][0] >= SCORE_THREE or table[codes[base + 1]][0] >= SCORE_THREE or
+                table[codes[base + 2]][0] >= SCORE_THREE or table[codes[base + 3]][0] >= SCORE_THREE):
+            three_moves.append((score, x, y))
+    four_moves.sort(reverse=True)
+    three_moves.sort(reverse=True)
+    return [(x, y) for _, x, y in four_moves + three_moves]
+
+
+def quiescence(board, player, alpha, beta, ctx=None, ply=0):
+    """静态搜索：对手刚落完子、轮到player时，只沿强制走法延伸，返回player视角的分数
+
+    先看胜负已定的情况（对手已成五、己方能成五、对手有两个成五点），
+    对手有一个成五点时只能去挡；否则以静态分为下限（可以不走强制棋），
+    再试己方排在最前的 QS_MAX_MOVES 个冲四和活三，最多延伸 QS_MAX_PLY 层。
+    展开的范围只由局面决定、与窗口无关，同一局面在不同窗口下（PVS重搜、并行搜索）结论一致。
+    """
+    if ctx is not None:
+        ctx.nodes += 1
+        ctx.qs_nodes += 1
+        if ctx.stats is not None:
+            ctx.stats.qs_nodes += 1
+        ctx.check_time()
+
+    opponent = 3 - player
+    if board.has_five(opponent):
+        return -SCORE_FIVE
+    if board.winning_points(player):
+        return SCORE_FIVE
+    threats = board.winning_points(opponent)
+    if threats:
+        if popcount(threats) >= 2:
+            return -SCORE_FIVE  # 两个成五点挡不住
+        if ply >= QS_MAX_PLY:
+            return static_evaluation(board, player)
+        # 只有一个成五点：必须挡
+        x, y = next(iter_bits(threats))
+        board.place(x, y, player)
+        try:
+            score = -quiescence(board, opponent, -beta, -alpha, ctx, ply + 1)
+        finally:
+            board.remove(x, y)
+        return score
+
+    best_score = static_evaluation(board, player)
+    if best_score >= beta or ply >= QS_MAX_PLY:
+        return best_score
+    if best_score > alpha:
+        alpha = best_score
+
+    for x, y in _forcing_moves(board, player)[:QS_MAX_MOVES]:
+        board.place(x, y, player)
+        try:
+            score = -quiescence(board, opponent, -beta, -alpha, ctx, ply + 1)
+        finally:
+            board.remove(x, y)
+        if score > best_score:
+            best_score = score
+            if score > alpha:
+                alpha = score
+            if alpha >= beta:
+                break
+    return best_score
+
+
+def minmax(board, player, depth, alpha, beta, last_move=None, ctx=None):
+    """minimax算法（带alpha-beta剪枝，强化进攻倾向）
+
+    board 为 EvalBoard（带增量评估缓存的位棋盘），落子/回溯均只更新局部。
+    last_move 为对手刚下的一步，此时只有对手可能刚成五；
+    为 None 时（搜索根节点）双方都要检查。
+    ctx 为 SearchContext：其中的置换表让不同落子顺序到达的同一局面只搜索一次；
+    超过截止时间时抛出 SearchTimeout；落子总会回溯，返回或抛出异常后board都与调用前相同。
+    走法顺序：置换表走法优先；非根节点再按杀手走法、历史表排序（见 move_ordering）。
+    根节点保持静态评分顺序，使同分时选中的走法不受启发信息影响。
+    第一个走法之后用零窗口试探（PVS），只有可能更好时才用完整窗口重搜。
+    深度为0时进入静态搜索（见 quiescence），ctx.quiescence（没有ctx时为 QUIESCENCE）为 False 时返回0。
+    """
     if depth == 0:
+        if ctx.quiescence if ctx is not None else QUIESCENCE:
+            return quiescence(board, player, alpha, beta, ctx), None
         return 0, None  # 深度为0时返回基础分
 
+    tt = None
+    stats = None
+    ordering = None
+    if ctx is not None:
+        ctx.nodes += 1
+        ctx.check_time()
+        tt = ctx.tt
+        stats = ctx.stats
+        ordering = ctx.ordering
+        if stats is not None:
+            stats.count_node(depth)
+            win_check_start = time.perf_counter()
+
     opponent = 3 - player
-    candidate_moves = get_candidate_moves(board, player)
 
-    # 检查当前是否已获胜
-    if check_win(board, player):
-        return SCORE_FIVE, None
-    if check_win(board, opponent):
-        return -SCORE_FIVE, None
+    # 检查当前是否已分出胜负（只有刚落子的一方可能获胜）
+    result = None
+    if last_move is None and board.has_five(player):
+        result = SCORE_FIVE
+    elif board.has_five(opponent):
+        result = -SCORE_FIVE
+    if stats is not None:
+        stats.time_win_check += time.perf_counter() - win_check_start
+    if result is not None:
+        return result, None
+
+    # 查置换表：深度足够的条目可直接返回或收窄窗口
+    alpha_orig = alpha
+    hash_move = None
+    if tt is not None:
+        key = board.position_key(player)
+        entry = tt.lookup(key)
+        if stats is not None:
+            stats.tt_probes += 1
+            if entry is not None:
+                stats.tt_hits += 1
+        if entry is not None:
+            entry_depth, flag, entry_score, hash_move = entry
+            if entry_depth >= depth:
+                if flag == EXACT:
+                    if stats is not None:
+                        stats.tt_cutoffs += 1
+                    return entry_score, hash_move
+                if flag == LOWER:
+                    alpha = max(alpha, entry_score)
+                else:
+                    beta = min(beta, entry_score)
+                if alpha >= beta:
+                    if stats is not None:
+                        stats.tt_cutoffs += 1
+                    return entry_score, hash_move
+
+    candidate_moves = get_candidate_moves(board, player, stats=stats)
+    if stats is not None:
+        stats.count_candidates(len(candidate_moves))
+        stats.expanded += 1
+    ply = ctx.root_depth - depth if ctx is not None else 0
+    if ordering is not None and last_move is not None:
+        # 置换表走法 → 杀手走法 → 历史分，更早产生剪枝
+        ordering.order(candidate_moves, player, ply, hash_move)
+    elif hash_move is not None:
+        # 置换表中的最佳走法优先搜索，更早产生剪枝
+        candidate_moves.sort(key=lambda m: (m[0], m[1]) != hash_move)
 
     best_score = -float('inf')
     best_move = None
+    searched = 0
 
     for x, y, _ in candidate_moves:
-        if board[y][x] != 0:
+        if board.get(x, y) != 0:
             continue  # 跳过非空位置
 
         # 模拟落子
-        board[y][x] = player
-        # 递归搜索对手的最优解（分数取反）
-        score, _ = minmax(board, opponent, depth - 1, -beta, -alpha)
-        score = -score
-
-        # 对进攻性走法额外加分（鼓励主动建威胁）
-        current_score = evaluate_position(board, player, x, y)
-        if current_score >= SCORE_TWO:  # 形成活二及以上进攻型棋型
-            score *= 1.1
-
-        # 回溯
-        board[y][x] = 0
+        board.place(x, y, player)
+        try:
+            # 递归搜索对手的最优解（分数取反）
+            if searched == 0:
+                score, _ = minmax(board, opponent, depth - 1, -beta, -alpha, (x, y), ctx)
+                score = -score
+            else:
+                # 零窗口试探：只判断是否比alpha好，比完整窗口剪枝更多
+                score, _ = minmax(board, opponent, depth - 1, -alpha - 1, -alpha, (x, y), ctx)
+                score = -score
+                if alpha < score < beta:
+                    if stats is not None:
+                        stats.pvs_researches += 1
+                    score, _ = minmax(board, opponent, depth - 1, -beta, -alpha, (x, y), ctx)
+                    score = -score
+
+            # 对进攻性走法额外加分（鼓励主动建威胁）
+            current_score = evaluate_position(board, player, x, y)
+            if current_score >= SCORE_TWO:  # 形成活二及以上进攻型棋型
+                score *= 1.1
+        finally:
+            # 回溯（超时时也要回溯，保证调用方的棋盘不变）
+            board.remove(x, y)
+        searched += 1
 
         # 更新最优解
         if score > best_score:
@@ -259,44 +378,247 @@ def minmax(board, player, depth, alpha, beta):
         if best_score > alpha:
             alpha = best_score
         if alpha >= beta:
+            if ordering is not None:
+                ordering.record_cutoff(player, ply, (x, y), depth)
+            if stats is not None:
+                stats.cutoffs += 1
+                if searched == 1:
+                    stats.first_move_cutoffs += 1
             break
 
+    if tt is not None and best_move is not None:
+        if best_score <= alpha_orig:
+            flag = UPPER
+        elif best_score >= beta:
+            flag = LOWER
+        else:
+            flag = EXACT
+        tt.store(key, depth, flag, best_score, best_move)
+
     return best_score, best_move
 
 
-def ai_move(board, player, difficulty=5):
-    """AI决策入口（平衡攻防优先级，符合人类下棋逻辑）"""
+class SearchCache:
+    """同一盘棋内跨回合保留的搜索缓存（置换表、走法排序的历史表），上一回合的搜索结果可继续复用"""
+
+    def __init__(self, tt_size=DEFAULT_TT_SIZE):
+        self.tt = TranspositionTable(tt_size)
+        self.ordering = MoveOrdering()
+        self.last_search = None  # 最近一次ai_move的SearchContext（节点数等），未进入搜索时为None
+
+    def new_search(self):
+        """每次ai_move开始搜索时调用"""
+        self.tt.new_search()
+        self.ordering.new_search()
+
+    def clear(self):
+        self.tt.clear()
+        self.ordering.clear()
+
+
+_default_cache = SearchCache()
+
+
+def iterative_deepening(board, player, max_depth, ctx):
+    """迭代加深：从深度1搜到max_depth，超时则返回最后一次完整搜索的结果
+
+    上一轮的最佳走法存在置换表中，下一轮在根节点优先搜索它。
+    board 只被读取：搜索在私有副本上落子/回溯，同一局面可以同时交给多个搜索。
+    返回结果对应的深度记在 ctx.completed_depth 中。
+    """
+    best_score, best_move = None, None
+    search_board = board.copy()
+    stats = ctx.stats
+    for depth in range(1, max_depth + 1):
+        ctx.root_depth = depth
+        if stats is not None:
+            stats.begin_iteration(depth, ctx.nodes)
+        try:
+            score, move = minmax(search_board, player, depth, -float('inf'), float('inf'), ctx=ctx)
+        except SearchTimeout:
+            if stats is not None:
+                stats.end_iteration(ctx.nodes, None, None)
+            break
+        if stats is not None:
+            stats.end_iteration(ctx.nodes, move, score)
+        if move is not None:
+            best_score, best_move = score, move
+            ctx.completed_depth = depth
+        if abs(score) >= SCORE_FIVE:
+            break  # 已经算出必胜/必败，无需加深
+    return best_score, best_move
+
+
+def score_root_move(board, player, move, depth, ctx):
+    """用完整窗口搜索根节点的一步，返回落子方视角的分数（与 minmax 在根节点给这一步的分数相同）
+
+    供复盘给候选点和实战走法打分（见 analysis）。超时抛出 SearchTimeout，board 保持不变。
+    """
+    x, y = move
+    ctx.root_depth = depth
+    board.place(x, y, player)
+    try:
+        score, _ = minmax(board, 3 - player, depth - 1, -float('inf'), float('inf'), move, ctx)
+    finally:
+        board.remove(x, y)
+    return -score
+
+
+def new_game():
+    """新开一局时清空默认搜索缓存"""
+    _default_cache.clear()
+
+
+def predict_reply(board, player, move, cache=None):
+    """猜测对手对 move 的应手（供后台预想搜索使用）
+
+    先看对手能否直接成五、是否必须挡四，否则取置换表中落子后局面的最佳走法
+    （即主要变例的下一步），表中没有时取对手评分最高的候选点。
+    落子后已成五或棋盘已满时返回None。
+    """
+    if cache is None:
+        cache = _default_cache
+    bitboard = EvalBoard.from_array(board, CANDIDATE_RADIUS)
+    bitboard.place(move[0], move[1], player)
+    if bitboard.has_five(player) or bitboard.count == bitboard.size * bitboard.size:
+        return None
+    opponent = 3 - player
+    reply = check_winning_move(bitboard, opponent) or check_winning_move(bitboard, player)
+    if reply:
+        return reply
+    entry = cache.tt.lookup(bitboard.position_key(opponent))
+    if entry is not None and entry[3] is not None and bitboard.get(*entry[3]) == 0:
+        return entry[3]
+    return get_candidate_moves(bitboard, opponent, n=1)[0][:2]
+
+
+def threat_space_move(board, player, budget_ms=None):
+    """威胁空间搜索，返回 (走法, 来源) 或 None（都没有，或在限制内没算出来）
+
+    来源为 "vcf"（己方连续冲四杀，必胜已证明）、"vct"（己方连续冲四/活三杀，
+    防守方只考虑了部分应手，不算严格证明）或 "defense"（破解对手VCF的一步）。
+    board 只被读取。
+    """
+    opponent = 3 - player
+    vcf_ms = budget_ms * VCF_TIME_SHARE if budget_ms is not None else None
+    vct_ms = budget_ms * VCT_TIME_SHARE if budget_ms is not None else None
+
+    sequence = find_vcf(board, player, time_limit_ms=vcf_ms)
+    if sequence:
+        return sequence[0], "vcf"
+
+    opponent_sequence = find_vcf(board, opponent, time_limit_ms=vcf_ms)
+    if opponent_sequence:
+        # 对手有连续冲四杀：先试对手的第一步，再试候选点，找一步下完后对手不再有VCF的
+        defenses = [opponent_sequence[0]] + [m[:2] for m in get_candidate_moves(board, player)]
+        per_try_ms = vcf_ms / len(defenses) if vcf_ms is not None else None
+        trial = board.copy()  # 试下在副本上进行
+        for x, y in defenses:
+            if trial.get(x, y) != 0:
+                continue
+            trial.place(x, y, player)
+            refuted = find_vcf(trial, opponent, time_limit_ms=per_try_ms) is None
+            trial.remove(x, y)
+            if refuted:
+                return (x, y), "defense"
+        return None
+
+    sequence = find_vct(board, player, time_limit_ms=vct_ms)
+    if sequence:
+        return sequence[0], "vct"
+    return None
+
+
+def ai_move(board, player, difficulty=5, cache=None, time_limit_ms=None, should_stop=None, stats=None,
+            parallel=None, radius=None, quiescence=None):
+    """AI决策入口（平衡攻防优先级，符合人类下棋逻辑）
+
+    difficulty 决定最大搜索深度和默认时间预算（见 DIFFICULTY_SETTINGS），
+    time_limit_ms 可单独指定本步的时间预算（毫秒）。
+    should_stop 为可选的回调，返回True时尽快结束搜索（见 ai_worker）。
+    cache 为 SearchCache，默认使用模块内的缓存（新开一局时调用 new_game 清空）。
+    stats 为可选的 search_stats.SearchStats，用于调试时统计搜索过程。
+    parallel 为 parallel_search.ParallelSearcher 时，根节点的候选点分给多个进程搜索。
+    radius、quiescence 为本步使用的候选点范围和是否做静态搜索，默认取 CANDIDATE_RADIUS、QUIESCENCE。
+    board 只被读取（搜索在私有的位棋盘副本上落子/回溯），多个线程可以同时分析同一局面，
+    各自传入自己的 cache 即可。
+    """
+    start = time.monotonic()
+    if cache is None:
+        cache = _default_cache
+    max_depth, budget_ms = DIFFICULTY_SETTINGS.get(difficulty, (difficulty, None))
+    if time_limit_ms is not None:
+        budget_ms = time_limit_ms
+    deadline = start + budget_ms / 1000 if budget_ms is not None else None
     size = len(board)
-    move_count = sum(sum(1 for cell in row if cell != 0) for row in board)
+    # 搜索在位棋盘副本上进行，界面使用的数组保持不变
+    bitboard = EvalBoard.from_array(board, CANDIDATE_RADIUS if radius is None else radius)
+    cache.last_search = None
+
+    def decided(move, source):
+        if stats is not None:
+            stats.source = source
+            stats.time_total = time.monotonic() - start
+        return move
 
     # 1. 必胜/必防步（不允许失误）
-    winning_move = check_winning_move(board, player)
+    winning_move = check_winning_move(bitboard, player)
     if winning_move:
-        return winning_move
-    blocking_move = check_winning_move(board, 3 - player)
+        return decided(winning_move, "win")
+    blocking_move = check_winning_move(bitboard, 3 - player)
     if blocking_move:
-        return blocking_move
-
-    # 2. 开局库
+        return decided(blocking_move, "block")
+
+    # 之前的对局（或其他进程）证明过必胜的局面直接取结果
+    solved = solved_cache.default_cache() if USE_SOLVED_CACHE else None
+    if solved is not None:
+        solved_move = solved.lookup(board, player)
+        if solved_move is not None:
+            return decided(solved_move, "solved")
+
+    # 2. 连续冲四/活三杀棋，以及破解对手的连续冲四
+    if stats is not None:
+        threat_start = time.perf_counter()
+    threat = threat_space_move(bitboard, player, budget_ms)
+    if stats is not None:
+        stats.time_threat += time.perf_counter() - threat_start
+    if threat:
+        threat_move, threat_source = threat
+        if threat_source == "vcf" and solved is not None:
+            # 只记录VCF杀棋：minmax（候选点有上限）和VCT（防守只试部分应手）的结论都不是严格证明
+            solved.store(board, player, threat_move, 0)
+        return decided(threat_move, "threat")
+
+    # 整盘打分一次填满双方的评估缓存，下面的开局验证和根节点候选点排序都只需查表
+    scores = fill_score_cache(bitboard, board)
+
+    # 3. 开局库
     if first.is_very_early_game(board):
         opening_move = first.get_opening_move(board, player)
         if opening_move and board[opening_move[1]][opening_move[0]] == 0:
             # 验证：预设走法需接近AI最优候选（80%评分）
             tx, ty = opening_move
-            opening_score = evaluate_position(board, player, tx, ty)
-            candidate_moves = get_candidate_moves(board, player, n=3)
+            opening_score = scores[player][ty][tx]
+            candidate_moves = get_candidate_moves(bitboard, player, n=3)
             best_candidate_score = max([m[2] for m in candidate_moves]) if candidate_moves else 0
             if opening_score >= best_candidate_score * 0.8:
-                return opening_move
-
-    # 3. 核心逻辑
-    _, move = minmax(board, player, difficulty, -float('inf'), float('inf'))
+                return decided(opening_move, "opening")
+
+    # 4. 核心逻辑
+    cache.new_search()
+    ctx = SearchContext(cache.tt, deadline, should_stop, stats, cache.ordering, quiescence)
+    cache.last_search = ctx
+    if parallel is not None:
+        parallel.new_search()
+        score, move = parallel.iterative_deepening(bitboard, player, max_depth, ctx)
+    else:
+        score, move = iterative_deepening(bitboard, player, max_depth, ctx)
     if move:
-        return move
+        return decided(move, "search")
 
-    # 4. 兜底方案
-    candidate_moves = get_candidate_moves(board, player)
+    # 5. 兜底方案
+    candidate_moves = get_candidate_moves(bitboard, player)
     if candidate_moves:
-        return candidate_moves[0][:2]
+        return decided(candidate_moves[0][:2], "fallback")
     empty_cells = [(x, y) for y in range(size) for x in range(size) if board[y][x] == 0]
-    return random.choice(empty_cells) if empty_cells else None
\ No newline at end of file
+    return decided(random.choice(empty_cells) if empty_cells else None, "fallback")
\ No newline at end of file
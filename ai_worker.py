@@ -0,0 +1,181 @@
+import multiprocessing as mp
+import queue
+import time
+
+import numpy as np
+
+# 后台预想搜索不设时间上限，由 should_stop 结束（被取消，或命中后用完本步时间）
+PONDER_TIME_LIMIT_MS = float('inf')
+
+
+def _worker_loop(requests, results, cancelled_id, ponder_hit, search_workers):
+    """子进程主循环：依次处理搜索请求，置换表等缓存在进程内跨回合保留"""
+    import ai
+    import solved_cache
+    from search_stats import SearchStats
+
+    if ai.USE_SOLVED_CACHE:
+        solved_cache.default_cache()  # 启动时就打开已解局面缓存，第一步不必等待
+
+    parallel = None
+    if search_workers > 1:
+        from parallel_search import ParallelSearcher
+        parallel = ParallelSearcher(search_workers)
+
+    while True:
+        message = requests.get()
+        kind = message[0]
+        if kind == "quit":
+            break
+        if kind == "new_game":
+            ai.new_game()
+            if parallel is not None:
+                parallel.new_game()
+        elif kind in ("search", "ponder"):
+            _, request_id, board, player, difficulty, time_limit_ms, collect_stats = message
+            if cancelled_id.value >= request_id:
+                continue  # 还没开始就被取消了
+
+            if kind == "search":
+                def should_stop():
+                    return cancelled_id.value >= request_id
+                search_time_ms = time_limit_ms
+            else:
+                # 预想：在猜测的对手应手之后搜索，直到被取消；
+                # 猜中时主进程置 ponder_hit，从那一刻起再给本步的时间预算
+                hit_deadline = []
+                if time_limit_ms is None:
+                    time_limit_ms = ai.DIFFICULTY_SETTINGS.get(difficulty, (difficulty, None))[1]
+
+                def should_stop():
+                    if cancelled_id.value >= request_id:
+                        return True
+                    if not hit_deadline:
+                        if ponder_hit.value != request_id:
+                            return False
+                        limit = time_limit_ms / 1000 if time_limit_ms is not None else float('inf')
+                        hit_deadline.append(time.monotonic() + limit)
+                    return time.monotonic() >= hit_deadline[0]
+                search_time_ms = PONDER_TIME_LIMIT_MS
+
+            stats = SearchStats() if collect_stats else None
+            move = ai.ai_move(board, player, difficulty, time_limit_ms=search_time_ms,
+                              should_stop=should_stop, stats=stats, parallel=parallel)
+            if kind == "ponder" and cancelled_id.value >= request_id:
+                continue  # 没猜中，结果作废（置换表中的条目仍保留给下一次搜索）
+            if stats is not None and kind == "ponder":
+                stats.source += "(预想)"
+            reply = ai.predict_reply(board, player, move) if move else None
+            results.put((request_id, move, stats, reply))
+
+    if parallel is not None:
+        parallel.close()
+
+
+class AIWorker:
+    """在独立进程中运行AI搜索，主线程（pygame事件循环）不会被阻塞
+
+    用法：request_move() 提交请求后，每帧调用 poll() 查看结果；
+    悔棋、重新开始等情况调用 cancel() 放弃当前请求。
+    AI落子后可调用 ponder()：在玩家思考期间按猜测的应手提前搜索，
+    玩家正好下在猜测点时 request_move() 直接接上这次搜索（已搜完则立即返回），
+    没猜中则取消预想，置换表中的条目留给新的搜索。
+    collect_stats=True 时，最近一次完成的搜索统计保存在 last_stats（SearchStats）。
+    search_workers > 1 时子进程再用进程池并行搜索（见 parallel_search）。
+    """
+
+    def __init__(self, search_workers=1):
+        self._requests = mp.Queue()
+        self._results = mp.Queue()
+        self._cancelled_id = mp.Value('i', 0, lock=False)
+        self._ponder_hit = mp.Value('i', 0, lock=False)
+        self._request_id = 0
+        self._pending = False
+        self._ponder = None  # 进行中的预想：(请求编号, 预想局面, 请求参数)
+        self.predicted_reply = None  # 最近一次AI落子后猜测的玩家应手
+        self.ponder_hits = 0
+        self.last_stats = None
+        # 守护进程不能再创建子进程，并行搜索时改为普通进程（退出前必须调用 close）
+        self._process = mp.Process(target=_worker_loop,
+                                   args=(self._requests, self._results, self._cancelled_id,
+                                         self._ponder_hit, search_workers),
+                                   daemon=search_workers <= 1)
+        self._process.start()
+
+    @property
+    def busy(self):
+        """是否有尚未返回结果的请求"""
+        return self._pending
+
+    @property
+    def pondering(self):
+        return self._ponder is not None
+
+    def request_move(self, board, player, difficulty, time_limit_ms=None, collect_stats=False):
+        """提交一次落子请求（非阻塞），之前未完成的请求会被取消；与预想局面相同时直接沿用预想"""
+        if self._ponder is not None:
+            request_id, ponder_board, params = self._ponder
+            if (params == (player, difficulty, time_limit_ms, collect_stats)
+                    and np.array_equal(board, ponder_board)):
+                self._ponder = None
+                self._ponder_hit.value = request_id
+                self._pending = True
+                self.ponder_hits += 1
+                return
+        self.cancel()
+        self._request_id += 1
+        self._pending = True
+        self._requests.put(("search", self._request_id, board.copy(), player, difficulty,
+                            time_limit_ms, collect_stats))
+
+    def ponder(self, board, player, difficulty, time_limit_ms=None, collect_stats=False):
+        """AI（player）落子后调用：假设玩家下在 predicted_reply，在后台提前搜索AI的下一步
+
+        参数应与之后的 request_move 一致，否则不算命中。没有猜测的应手时不做任何事。
+        """
+        self.cancel()
+        if self.predicted_reply is None:
+            return
+        x, y = self.predicted_reply
+        if board[y][x] != 0:
+            return
+        ponder_board = board.copy()
+        ponder_board[y][x] = 3 - player
+        self._request_id += 1
+        self._ponder = (self._request_id, ponder_board, (player, difficulty, time_limit_ms, collect_stats))
+        self._requests.put(("ponder", self._request_id, ponder_board, player, difficulty,
+                            time_limit_ms, collect_stats))
+
+    def poll(self):
+        """非阻塞地查询结果，返回 (是否完成, 落子)"""
+        if not self._pending:
+            return False, None
+        while True:
+            try:
+                request_id, move, stats, reply = self._results.get_nowait()
+            except queue.Empty:
+                return False, None
+            if request_id == self._request_id:
+                self._pending = False
+                self.last_stats = stats
+                self.predicted_reply = reply
+                return True, move
+            # 已取消请求的过期结果，直接丢弃
+
+    def cancel(self):
+        """放弃当前请求（包括进行中的预想），子进程中的搜索会尽快停止"""
+        self._cancelled_id.value = self._request_id
+        self._pending = False
+        self._ponder = None
+
+    def new_game(self):
+        self.cancel()
+        self.predicted_reply = None
+        self._requests.put(("new_game",))
+
+    def close(self):
+        self.cancel()
+        self._requests.put(("quit",))
+        self._process.join(timeout=1)
+        if self._process.is_alive():
+            self._process.terminate()
@@ -0,0 +1,232 @@
+"""批量分析（复盘）：一次分析多个局面或整盘棋，给出每个局面的最佳走法、分数、主要变例和前几名候选
+
+    for result in analysis.analyze_game(moves, depth=3, top_k=3): ...
+    for result in analysis.analyze_games(games, processes=4): ...    # 进程池，边算边返回
+    for result in analysis.analyze_positions([(board, player), ...]): ...
+
+同一盘棋中相邻的局面共用一个 ai.SearchCache（置换表、历史表），位棋盘沿着棋谱增量落子，
+评估缓存只作废新落子附近的格子，不必每个局面都从二维数组重新构造。
+多进程时每盘棋按连续的 chunk_size 步切块分给进程池，块内仍共用缓存；结果按原顺序逐个返回。
+
+每个局面的结果是一个dict：
+    game / ply / player     第几盘（从0开始）、第几手（从0开始，即该局面之前已下的步数）、轮到谁
+    move / score / depth    最佳走法、分数（轮到的一方视角）、完成的搜索深度（0 表示由VCF得出）
+    pv                      主要变例（从置换表中沿最佳走法取出），双方交替
+    alternatives            前 top_k 个候选 [(走法, 分数)]，第一个即最佳走法
+    played / played_score   棋谱中实际下的一步及其分数（分析单个局面时为None）
+    nodes / time            搜索节点数、用时（秒）
+
+    python analysis.py arena_games.pgn --depth 3 --top 3 --processes 4   # 棋谱格式见 game_record
+"""
+import argparse
+import multiprocessing as mp
+import sys
+import time
+
+import ai
+from game_record import move_to_text, read_games
+from evaluator import EvalBoard
+from patterns import SCORE_FIVE
+from threat_search import find_vcf
+
+DEFAULT_DEPTH = 3
+DEFAULT_TOP_K = 3
+DEFAULT_CHUNK_SIZE = 20  # 多进程时每个任务连续分析的步数；越大缓存复用越多，越小越早返回结果
+
+
+def principal_variation(board, player, tt, max_length):
+    """从置换表中沿最佳走法取出主要变例（board 不会被修改）"""
+    board = board.copy()
+    pv = []
+    while len(pv) < max_length:
+        entry = tt.lookup(board.position_key(player))
+        if entry is None or entry[3] is None:
+            break
+        x, y = entry[3]
+        if board.get(x, y) != 0:
+            break  # 哈希冲突
+        pv.append((x, y))
+        board.place(x, y, player)
+        if board.has_five(player):
+            break
+        player = 3 - player
+    return pv
+
+
+def _score_moves(board, player, moves, depth, ctx):
+    """用 ai.score_root_move 分别给根节点的若干走法打分，返回 [(走法, 分数)]；超时则返回已经算完的部分"""
+    scored = []
+    for move in moves:
+        try:
+            scored.append((move, ai.score_root_move(board, player, move, depth, ctx)))
+        except ai.SearchTimeout:
+            break
+    return scored
+
+
+def analyze_board(board, player, depth=DEFAULT_DEPTH, top_k=DEFAULT_TOP_K, cache=None, time_limit_ms=None,
+                  played=None, threats=True):
+    """分析一个局面（board 为 EvalBoard，不会被修改），返回结果dict（见模块说明）
+
+    cache 为 ai.SearchCache，同一盘棋的相邻局面传入同一个以复用置换表。
+    time_limit_ms 为每个局面的时间上限，超时时使用最后一次完整迭代的结果。
+    threats 为 True 时先找VCF（连续冲四杀），找到时直接给出杀棋序列。
+    """
+    start = time.perf_counter()
+    if cache is None:
+        cache = ai.SearchCache()
+    cache.new_search()
+    deadline = time.monotonic() + time_limit_ms / 1000 if time_limit_ms is not None else None
+    ctx = ai.SearchContext(cache.tt, deadline, ordering=cache.ordering)
+    result = {"player": player, "played": played, "played_score": None}
+
+    winning_move = ai.check_winning_move(board, player)
+    sequence = [winning_move] if winning_move else None
+    if sequence is None and threats:
+        sequence = find_vcf(board, player)
+    if sequence:
+        move, score, pv, completed = sequence[0], SCORE_FIVE, sequence, 0
+        alternatives = [(move, score)]
+    else:
+        score, move = ai.iterative_deepening(board, player, depth, ctx)
+        completed = ctx.completed_depth
+        if move is None:
+            # 一层都没算完（或棋盘已满），取静态评分最高的候选点
+            candidates = ai.get_candidate_moves(board, player, n=1)
+            move, score, completed = candidates[0][:2], 0, 0
+        pv = principal_variation(board, player, cache.tt, max(completed, 1)) or [move]
+        if pv[0] != move:
+            pv = [move]
+        alternatives = [(move, score)]
+        if top_k > 1 and completed > 0:
+            others = [m[:2] for m in ai.get_candidate_moves(board, player) if m[:2] != move]
+            scored = _score_moves(board, player, others, completed, ctx)
+            scored.sort(key=lambda item: item[1], reverse=True)  # 同分时保持静态评分顺序
+            alternatives += scored[:top_k - 1]
+
+    if played is not None:
+        for alternative, alternative_score in alternatives:
+            if alternative == played:
+                result["played_score"] = alternative_score
+                break
+        else:
+            if completed > 0 and board.get(*played) == 0:
+                scored = _score_moves(board, player, [played], completed, ctx)
+                if scored:
+                    result["played_score"] = scored[0][1]
+
+    result.update(move=move, score=score, depth=completed, pv=pv, alternatives=alternatives,
+                  nodes=ctx.nodes, time=time.perf_counter() - start)
+    return result
+
+
+def analyze_position(board, player, depth=DEFAULT_DEPTH, top_k=DEFAULT_TOP_K, cache=None, time_limit_ms=None,
+                     threats=True):
+    """分析二维数组表示的单个局面"""
+    bitboard = EvalBoard.from_array(board, ai.CANDIDATE_RADIUS)
+    return analyze_board(bitboard, player, depth, top_k, cache, time_limit_ms, threats=threats)
+
+
+def analyze_game(moves, depth=DEFAULT_DEPTH, top_k=DEFAULT_TOP_K, time_limit_ms=None, threats=True,
+                 start=0, stop=None, game=0):
+    """逐步分析一盘棋（moves 为 [(x, y)]，黑棋先行），依次生成第 start~stop-1 手之前局面的结果
+
+    某一步成五后棋局结束，不再分析之后的步数。
+    """
+    stop = len(moves) if stop is None else min(stop, len(moves))
+    cache = ai.SearchCache()
+    board = EvalBoard(ai.CANDIDATE_RADIUS)
+    for ply, (x, y) in enumerate(moves[:start]):
+        board.place(x, y, 1 if ply % 2 == 0 else 2)
+    for ply in range(start, stop):
+        player = 1 if ply % 2 == 0 else 2
+        if board.has_five(3 - player):
+            break
+        x, y = moves[ply]
+        result = analyze_board(board, player, depth, top_k, cache, time_limit_ms, (x, y), threats)
+        result["game"] = game
+        result["ply"] = ply
+        yield result
+        board.place(x, y, player)
+
+
+def analyze_positions(positions, depth=DEFAULT_DEPTH, top_k=DEFAULT_TOP_K, time_limit_ms=None, threats=True):
+    """依次分析 [(二维数组, 轮到的一方)]，共用一个搜索缓存（置换表按完整局面哈希，不同局面互不干扰）"""
+    cache = ai.SearchCache()
+    for index, (board, player) in enumerate(positions):
+        result = analyze_position(board, player, depth, top_k, cache, time_limit_ms, threats)
+        result["game"] = None
+        result["ply"] = index
+        yield result
+
+
+def _analyze_chunk(task):
+    """子进程：分析一盘棋中连续的若干步，返回结果列表"""
+    game, moves, start, stop, options = task
+    ai.USE_SOLVED_CACHE = False
+    return list(analyze_game(moves, start=start, stop=stop, game=game, **options))
+
+
+def analyze_games(games, depth=DEFAULT_DEPTH, top_k=DEFAULT_TOP_K, time_limit_ms=None, threats=True,
+                  processes=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    """用进程池分析多盘棋，按 (盘, 步) 的顺序边算边生成结果
+
+    processes=1 时在当前进程中分析，不切块（整盘共用一个缓存）。
+    """
+    options = {"depth": depth, "top_k": top_k, "time_limit_ms": time_limit_ms, "threats": threats}
+    if processes == 1:
+        for game, moves in enumerate(games):
+            yield from analyze_game(moves, game=game, **options)
+        return
+    # games 可以是逐盘读取的生成器，任务随读随发
+    tasks = ((game, moves, start, start + chunk_size, options)
+             for game, moves in enumerate(games)
+             for start in range(0, len(moves), chunk_size))
+    with mp.Pool(processes) as pool:
+        for results in pool.imap(_analyze_chunk, tasks):
+            yield from results
+
+
+def format_result(result):
+    """一行文字：第几手、实际走法、推荐走法、变例和候选"""
+    side = "黑" if result["player"] == 1 else "白"
+    text = f"第{result['ply'] + 1:>3}手 {side}"
+    if result["played"] is not None:
+        played_score = result["played_score"]
+        played_score = f"{played_score:.0f}" if played_score is not None else "?"
+        text += f" 实战 {move_to_text(result['played']):<3} ({played_score})"
+    text += f" 推荐 {move_to_text(result['move']):<3} ({result['score']:.0f}, 深度{result['depth']})"
+    text += "  变例 " + " ".join(move_to_text(m) for m in result["pv"])
+    if len(result["alternatives"]) > 1:
+        text += "  候选 " + " ".join(f"{move_to_text(m)}({s:.0f})" for m, s in result["alternatives"][1:])
+    return text
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="五子棋棋谱批量分析")
+    parser.add_argument("records", help="棋谱文件（格式见 game_record，按扩展名或内容自动判断）")
+    parser.add_argument("--depth", type=int, default=DEFAULT_DEPTH, help="搜索深度")
+    parser.add_argument("--top", type=int, default=DEFAULT_TOP_K, help="每个局面给出的候选数")
+    parser.add_argument("--time", type=int, default=None, help="每个局面的时间上限/毫秒")
+    parser.add_argument("--processes", type=int, default=None, help="并行进程数（默认CPU核数）")
+    parser.add_argument("--chunk", type=int, default=DEFAULT_CHUNK_SIZE, help="每个任务连续分析的步数")
+    args = parser.parse_args(argv)
+
+    games = (moves for moves, _ in read_games(args.records))
+    start = time.perf_counter()
+    count = 0
+    game_count = 0
+    for result in analyze_games(games, args.depth, args.top, args.time, processes=args.processes,
+                                chunk_size=args.chunk):
+        if result["ply"] == 0:
+            print(f"\n=== 第{result['game'] + 1}盘 ===")
+            game_count += 1
+        print(format_result(result))
+        count += 1
+    elapsed = time.perf_counter() - start
+    print(f"\n{game_count}盘 {count}个局面，用时 {elapsed:.1f}s（{count / max(elapsed, 1e-9):.1f} 局面/秒）")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,275 @@
+"""AI对战场（无需pygame）：两种 ai_move 配置对下多盘，统计胜率和Elo差
+
+用法：
+    python arena.py --a depth=3 --b depth=4,time=2000 --games 40
+    python arena.py --a depth=4 --b depth=4,radius=2 --games 100 --processes 8 -o games.pgn
+    python arena.py --a depth=3 --b depth=5,qs=0 --games 40
+
+引擎配置为逗号分隔的 key=value：
+    depth   最大搜索深度（即 ai_move 的 difficulty）
+    time    每步时间预算/毫秒（默认取 ai.DIFFICULTY_SETTINGS 中的值）
+    radius  候选点范围（ai_move 的 radius）
+    qs      叶子节点是否做静态搜索（ai_move 的 quiescence，默认1）
+每个开局下两盘，双方交换执黑；棋谱以类PGN格式写入文件。
+"""
+import argparse
+import math
+import multiprocessing as mp
+import random
+import sys
+import time
+
+from constants import BOARD_SIZE
+from game_record import move_to_text, text_to_move
+
+RESULT_TEXT = {1: "1-0", 2: "0-1", 0: "1/2-1/2"}
+
+
+def parse_engine(spec):
+    """'depth=3,time=1000' → {'depth': 3, 'time': 1000, 'radius': 1, 'qs': 1}"""
+    config = {"depth": 3, "time": None, "radius": 1, "qs": 1}
+    for item in filter(None, spec.split(",")):
+        key, value = item.split("=")
+        if key not in config:
+            raise ValueError(f"未知的引擎参数：{key}")
+        config[key] = int(value)
+    return config
+
+
+def engine_name(config):
+    parts = [f"depth={config['depth']}"]
+    if config["time"] is not None:
+        parts.append(f"time={config['time']}")
+    if config["radius"] != 1:
+        parts.append(f"radius={config['radius']}")
+    if not config["qs"]:
+        parts.append("qs=0")
+    return ",".join(parts)
+
+
+def opening_count(stones):
+    """不同开局局面的总数：天元之外的黑子、白子分别取中心5x5内其余24个点（与落子顺序无关）"""
+    if stones < 1 or stones > 25:
+        return 0
+    black, white = (stones + 1) // 2, stones // 2
+    return math.comb(24, black - 1) * math.comb(25 - black, white)
+
+
+def _opening_position(opening):
+    """开局的局面（黑子集合, 白子集合）；落子顺序不同但局面相同的开局视为同一个"""
+    return frozenset(opening[0::2]), frozenset(opening[1::2])
+
+
+def make_openings(count, stones=3, seed=0):
+    """生成count个局面互不相同的开局：黑棋天元，其余几步在中心5x5内随机落子
+
+    count 超过不同开局的总数（见 opening_count）时抛出 ValueError。
+    """
+    total = opening_count(stones)
+    if count > total:
+        raise ValueError(f"{stones}子开局只有{total}种，不够{count}个")
+    rng = random.Random(seed)
+    center = BOARD_SIZE // 2
+    openings = []
+    seen = set()
+    while len(openings) < count:
+        opening = [(center, center)]
+        while len(opening) < stones:
+            move = (center + rng.randint(-2, 2), center + rng.randint(-2, 2))
+            if move not in opening:
+                opening.append(move)
+        position = _opening_position(opening)
+        if position not in seen:
+            seen.add(position)
+            openings.append(opening)
+    return openings
+
+
+def play_game(task):
+    """对下一盘，返回对局记录（dict）
+
+    task = (编号, 开局序号, 开局, 黑方配置, 白方配置, 黑方是否为A, 最多步数)
+    """
+    import ai
+    from game_logic import check_win_at
+
+    number, opening_index, opening, black, white, a_is_black, max_moves = task
+    ai.USE_SOLVED_CACHE = False  # 各盘互不影响，双方也不共用已解局面
+    configs = {1: black, 2: white}
+    caches = {1: ai.SearchCache(), 2: ai.SearchCache()}
+    think = {1: 0.0, 2: 0.0}
+    nodes = {1: 0, 2: 0}
+    searched = {1: 0, 2: 0}
+
+    board = [[0] * BOARD_SIZE for _ in range(BOARD_SIZE)]
+    moves = []
+    winner = 0
+    for x, y in opening:
+        board[y][x] = 1 if len(moves) % 2 == 0 else 2
+        moves.append((x, y))
+
+    while len(moves) < max_moves:
+        player = 1 if len(moves) % 2 == 0 else 2
+        config = configs[player]
+        start = time.perf_counter()
+        move = ai.ai_move([row[:] for row in board], player, config["depth"], cache=caches[player],
+                          time_limit_ms=config["time"], radius=config["radius"], quiescence=bool(config["qs"]))
+        think[player] += time.perf_counter() - start
+        searched[player] += 1
+        if caches[player].last_search is not None:
+            nodes[player] += caches[player].last_search.nodes
+        if move is None:
+            break
+        x, y = move
+        if board[y][x] != 0:
+            winner = 3 - player  # 非法落子判负
+            break
+        board[y][x] = player
+        moves.append((x, y))
+        if check_win_at(board, x, y, player):
+            winner = player
+            break
+
+    a, b = (1, 2) if a_is_black else (2, 1)
+    return {
+        "number": number,
+        "opening": opening_index,
+        "opening_plies": len(opening),
+        "moves": moves,
+        "winner": winner,
+        "a_is_black": a_is_black,
+        "black": engine_name(black),
+        "white": engine_name(white),
+        "a_think": think[a], "b_think": think[b],
+        "a_moves": searched[a], "b_moves": searched[b],
+        "a_nodes": nodes[a], "b_nodes": nodes[b],
+    }
+
+
+def format_record(game):
+    """类PGN格式的棋谱"""
+    lines = [
+        '[Event "arena"]',
+        f'[Game "{game["number"]}"]',
+        f'[Black "{game["black"]}"]',
+        f'[White "{game["white"]}"]',
+        f'[Opening "{game["opening"]}"]',
+        f'[OpeningPlies "{game["opening_plies"]}"]',
+        f'[Result "{RESULT_TEXT[game["winner"]]}"]',
+        "",
+    ]
+    text = []
+    for i in range(0, len(game["moves"]), 2):
+        pair = " ".join(move_to_text(m) for m in game["moves"][i:i + 2])
+        text.append(f"{i // 2 + 1}. {pair}")
+    text.append(RESULT_TEXT[game["winner"]])
+    # 每行10个回合
+    for i in range(0, len(text), 10):
+        lines.append(" ".join(text[i:i + 10]))
+    return "\n".join(lines) + "\n\n"
+
+
+def elo_difference(score):
+    """得分率 → Elo差（A相对B）"""
+    if score <= 0:
+        return -float('inf')
+    if score >= 1:
+        return float('inf')
+    return -400 * math.log10(1 / score - 1)
+
+
+def summarize(games):
+    """统计A方的胜负和、Elo差及95%置信区间、平均思考时间和节点数"""
+    wins = losses = draws = 0
+    points = []
+    for game in games:
+        a_player = 1 if game["a_is_black"] else 2
+        if game["winner"] == 0:
+            draws += 1
+            points.append(0.5)
+        elif game["winner"] == a_player:
+            wins += 1
+            points.append(1.0)
+        else:
+            losses += 1
+            points.append(0.0)
+    n = len(points)
+    score = sum(points) / n
+    variance = sum((p - score) ** 2 for p in points) / n
+    margin = 1.96 * math.sqrt(variance / n)
+    a_moves = sum(g["a_moves"] for g in games) or 1
+    b_moves = sum(g["b_moves"] for g in games) or 1
+    return {
+        "games": n, "wins": wins, "losses": losses, "draws": draws,
+        "score": score,
+        "elo": elo_difference(score),
+        "elo_low": elo_difference(score - margin),
+        "elo_high": elo_difference(score + margin),
+        "a_think_ms": sum(g["a_think"] for g in games) / a_moves * 1000,
+        "b_think_ms": sum(g["b_think"] for g in games) / b_moves * 1000,
+        "a_nodes": sum(g["a_nodes"] for g in games) / a_moves,
+        "b_nodes": sum(g["b_nodes"] for g in games) / b_moves,
+    }
+
+
+def run_match(engine_a, engine_b, games, opening_stones=3, max_moves=BOARD_SIZE * BOARD_SIZE,
+              processes=None, seed=0, record_path=None, log=print):
+    """并行对下games盘，返回 (统计, 按编号排序的对局列表)；record_path 不为None时边下边写棋谱"""
+    openings = make_openings((games + 1) // 2, opening_stones, seed)
+    tasks = []
+    for i, opening in enumerate(openings):
+        tasks.append((len(tasks) + 1, i + 1, opening, engine_a, engine_b, True, max_moves))
+        if len(tasks) < games:
+            tasks.append((len(tasks) + 1, i + 1, opening, engine_b, engine_a, False, max_moves))
+
+    results = []
+    records = open(record_path, "w", encoding="utf-8") if record_path else None
+    try:
+        with mp.Pool(processes) as pool:
+            for game in pool.imap_unordered(play_game, tasks):
+                results.append(game)
+                if records is not None:
+                    records.write(format_record(game))
+                    records.flush()
+                a_player = 1 if game["a_is_black"] else 2
+                outcome = "和" if game["winner"] == 0 else ("A胜" if game["winner"] == a_player else "B胜")
+                log(f"第{game['number']:>3}盘 A执{'黑' if game['a_is_black'] else '白'} "
+                    f"{outcome} {len(game['moves'])}手  ({len(results)}/{len(tasks)})")
+    finally:
+        if records is not None:
+            records.close()
+    results.sort(key=lambda g: g["number"])
+    return summarize(results), results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="五子棋AI对战场")
+    parser.add_argument("--a", default="depth=3", help="引擎A的配置")
+    parser.add_argument("--b", default="depth=3", help="引擎B的配置")
+    parser.add_argument("--games", type=int, default=20, help="对局数（每个开局下两盘）")
+    parser.add_argument("--opening-stones", type=int, default=3, help="随机开局的棋子数")
+    parser.add_argument("--max-moves", type=int, default=BOARD_SIZE * BOARD_SIZE, help="超过该步数判和")
+    parser.add_argument("--processes", type=int, default=None, help="并行进程数（默认CPU核数）")
+    parser.add_argument("--seed", type=int, default=0, help="开局随机种子")
+    parser.add_argument("-o", "--output", default="arena_games.pgn", help="棋谱文件")
+    args = parser.parse_args(argv)
+    if (args.games + 1) // 2 > opening_count(args.opening_stones):
+        parser.error(f"{args.opening_stones}子开局只有{opening_count(args.opening_stones)}种，"
+                     f"最多下{opening_count(args.opening_stones) * 2}盘")
+
+    engine_a, engine_b = parse_engine(args.a), parse_engine(args.b)
+    summary, _ = run_match(engine_a, engine_b, args.games, args.opening_stones, args.max_moves,
+                           args.processes, args.seed, args.output)
+
+    print(f"\nA: {engine_name(engine_a)}\nB: {engine_name(engine_b)}")
+    print(f"A {summary['wins']}胜 {summary['losses']}负 {summary['draws']}和，"
+          f"得分率 {summary['score'] * 100:.1f}%")
+    print(f"Elo差(A-B): {summary['elo']:+.0f}  95%置信区间 [{summary['elo_low']:+.0f}, {summary['elo_high']:+.0f}]")
+    print(f"平均每步: A {summary['a_think_ms']:.0f}ms {summary['a_nodes']:.0f}节点，"
+          f"B {summary['b_think_ms']:.0f}ms {summary['b_nodes']:.0f}节点")
+    print(f"棋谱已写入 {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,341 @@
+"""AI基准测试（无需pygame）
+
+用法：
+    python benchmark.py                              # 跑全部局面，结果写入 benchmark_result.json
+    python benchmark.py -o new.json --compare old.json  # 与上一次的结果对比
+    python benchmark.py --category tactical --depth 4
+    python benchmark.py --workers 8 --compare serial.json  # 并行搜索与串行对比
+
+对 benchmark_positions.txt 中的每个局面分别测试 ai.ai_move、ai.minmax、
+ai.get_candidate_moves、ai.evaluate_position、vector_eval.score_matrix 和 game_logic.check_win，
+记录节点数、每秒节点数、耗时、峰值内存和所选落子。
+"""
+import argparse
+import json
+import platform
+import sys
+import time
+import tracemalloc
+
+import ai
+import vector_eval
+from evaluator import EvalBoard
+from game_logic import check_win
+from constants import BOARD_SIZE
+
+DEFAULT_CORPUS = "benchmark_positions.txt"
+DEFAULT_OUTPUT = "benchmark_result.json"
+
+
+def _parse_stones(text):
+    stones = []
+    for item in text.split():
+        x, y = item.split(",")
+        stones.append((int(x), int(y)))
+    return stones
+
+
+def load_corpus(path=DEFAULT_CORPUS):
+    """读取局面库，返回 [{name, category, note, black, white, to_move}, ...]（保持文件中的顺序）"""
+    positions = []
+    current = None
+    with open(path, encoding="utf-8") as f:
+        for number, raw in enumerate(f, 1):
+            line = raw.strip()
+            if not line or line.startswith("#"):
+                continue
+            if line.startswith("[") and line.endswith("]"):
+                current = {"name": line[1:-1], "category": "", "note": "",
+                           "black": [], "white": [], "to_move": None}
+                positions.append(current)
+                continue
+            if current is None or "=" not in line:
+                raise ValueError(f"{path}:{number}: 无法解析：{line}")
+            key, value = (part.strip() for part in line.split("=", 1))
+            if key in ("black", "white"):
+                current[key] = _parse_stones(value)
+            elif key == "to_move":
+                current[key] = int(value)
+            elif key in ("category", "note"):
+                current[key] = value
+            else:
+                raise ValueError(f"{path}:{number}: 未知字段：{key}")
+
+    for position in positions:
+        if position["to_move"] is None:
+            # 黑先：双方子数相同时轮到黑棋
+            position["to_move"] = 1 if len(position["black"]) == len(position["white"]) else 2
+    return positions
+
+
+def format_position(name, black, white, category="", note="", to_move=None):
+    """局面 → 局面库中的一段文字（load_corpus 读取的格式）"""
+    lines = [f"[{name}]"]
+    if category:
+        lines.append(f"category = {category}")
+    if black:
+        lines.append("black = " + " ".join(f"{x},{y}" for x, y in black))
+    if white:
+        lines.append("white = " + " ".join(f"{x},{y}" for x, y in white))
+    if to_move is not None:
+        lines.append(f"to_move = {to_move}")
+    if note:
+        lines.append(f"note = {note}")
+    return "\n".join(lines) + "\n\n"
+
+
+def position_board(position):
+    """局面 → 与界面相同的二维列表棋盘"""
+    board = [[0] * BOARD_SIZE for _ in range(BOARD_SIZE)]
+    for player, key in ((1, "black"), (2, "white")):
+        for x, y in position[key]:
+            board[y][x] = player
+    return board
+
+
+def _timed(func, repeat):
+    """重复调用func，返回 (最后一次的返回值, 平均每次耗时/秒)"""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = func()
+    return result, (time.perf_counter() - start) / repeat
+
+
+def _peak_memory(func):
+    """在tracemalloc下单独再跑一次，返回峰值内存（KB）；计时不在这一次里进行"""
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return round(peak / 1024, 1)
+
+
+def _rate(nodes, seconds):
+    return round(nodes / seconds) if seconds > 0 else None
+
+
+def bench_ai_move(board, player, difficulty, time_limit_ms, measure_memory, parallel=None):
+    def run():
+        cache = ai.SearchCache()
+        if parallel is not None:
+            parallel.new_game()
+        move = ai.ai_move([row[:] for row in board], player, difficulty,
+                          cache=cache, time_limit_ms=time_limit_ms, parallel=parallel)
+        return move, cache
+
+    (move, cache), seconds = _timed(run, 1)
+    # 未进入minmax（必胜/必防、威胁搜索、开局库）时节点数为0
+    nodes = cache.last_search.nodes if cache.last_search is not None else 0
+    return {
+        "move": list(move) if move else None,
+        "time_ms": round(seconds * 1000, 2),
+        "nodes": nodes,
+        "nodes_per_sec": _rate(nodes, seconds),
+        "peak_kb": _peak_memory(run) if measure_memory else None,
+    }
+
+
+def bench_minmax(board, player, depth, measure_memory):
+    def run():
+        cache = ai.SearchCache()
+        ctx = ai.SearchContext(cache.tt, ordering=cache.ordering)
+        ctx.root_depth = depth
+        score, move = ai.minmax(EvalBoard.from_array(board), player, depth,
+                                -float('inf'), float('inf'), ctx=ctx)
+        return score, move, ctx
+
+    (score, move, ctx), seconds = _timed(run, 1)
+    return {
+        "depth": depth,
+        "move": list(move) if move else None,
+        "score": score,
+        "time_ms": round(seconds * 1000, 2),
+        "nodes": ctx.nodes,
+        "nodes_per_sec": _rate(ctx.nodes, seconds),
+        "peak_kb": _peak_memory(run) if measure_memory else None,
+    }
+
+
+def bench_candidates(board, player, repeat):
+    # 每次都用新的棋盘，避免测到的只是评估缓存的命中
+    boards = [EvalBoard.from_array(board) for _ in range(repeat)]
+    remaining = iter(boards)
+    moves, seconds = _timed(lambda: ai.get_candidate_moves(next(remaining), player), repeat)
+    return {
+        "count": len(moves),
+        "top": [list(m[:2]) for m in moves[:3]],
+        "time_us": round(seconds * 1e6, 1),
+    }
+
+
+def bench_evaluate(board, player, repeat):
+    empty = [(x, y) for y in range(BOARD_SIZE) for x in range(BOARD_SIZE) if board[y][x] == 0]
+    boards = [EvalBoard.from_array(board) for _ in range(repeat)]
+    remaining = iter(boards)
+
+    def run():
+        bitboard = next(remaining)
+        return sum(ai.evaluate_position(bitboard, player, x, y) for x, y in empty)
+
+    total, seconds = _timed(run, repeat)
+    return {
+        "cells": len(empty),
+        "score_sum": total,
+        "time_us_per_cell": round(seconds * 1e6 / max(len(empty), 1), 3),
+    }
+
+
+def bench_score_matrix(board, player, repeat):
+    """整盘向量化打分；score_sum 与 evaluate_position 的一致（求和顺序不同，末位可能有舍入差）"""
+    scores, seconds = _timed(lambda: vector_eval.score_matrix(board, player), repeat)
+    return {
+        "score_sum": float(scores.sum()),
+        "time_us": round(seconds * 1e6, 1),
+    }
+
+
+def bench_check_win(board, repeat):
+    result, seconds = _timed(lambda: (check_win(board, 1), check_win(board, 2)), repeat)
+    return {
+        "result": list(result),
+        "time_us": round(seconds * 1e6, 1),
+    }
+
+
+def run_benchmark(positions, difficulty=4, time_limit_ms=60000, minmax_depth=4,
+                  repeat=20, measure_memory=True, log=None, parallel=None):
+    """对每个局面跑全部测试，返回可直接写成JSON的结果
+
+    parallel 为 parallel_search.ParallelSearcher 时 ai_move 使用并行搜索
+    （峰值内存只统计主进程）。
+    """
+    # 已解局面缓存会让重复运行的结果不同；只在本次测试期间关闭，结束后恢复调用方的设置
+    use_solved_cache = ai.USE_SOLVED_CACHE
+    ai.USE_SOLVED_CACHE = False
+    results = []
+    try:
+        for position in positions:
+            board = position_board(position)
+            player = position["to_move"]
+            entry = {
+                "name": position["name"],
+                "category": position["category"],
+                "to_move": player,
+                "stones": len(position["black"]) + len(position["white"]),
+                "ai_move": bench_ai_move(board, player, difficulty, time_limit_ms, measure_memory, parallel),
+                "minmax": bench_minmax(board, player, minmax_depth, measure_memory),
+                "get_candidate_moves": bench_candidates(board, player, repeat),
+                "evaluate_position": bench_evaluate(board, player, repeat),
+                "score_matrix": bench_score_matrix(board, player, repeat),
+                "check_win": bench_check_win(board, repeat),
+            }
+            results.append(entry)
+            if log is not None:
+                log(f"{entry['name']:<18} ai_move {entry['ai_move']['move']} "
+                    f"{entry['ai_move']['time_ms']:9.1f}ms {entry['ai_move']['nodes']:7d}节点  "
+                    f"minmax {entry['minmax']['time_ms']:9.1f}ms {entry['minmax']['nodes']:7d}节点")
+    finally:
+        ai.USE_SOLVED_CACHE = use_solved_cache
+
+    ai_time = sum(r["ai_move"]["time_ms"] for r in results)
+    ai_nodes = sum(r["ai_move"]["nodes"] for r in results)
+    minmax_time = sum(r["minmax"]["time_ms"] for r in results)
+    minmax_nodes = sum(r["minmax"]["nodes"] for r in results)
+    return {
+        "settings": {
+            "difficulty": difficulty,
+            "time_limit_ms": time_limit_ms,
+            "minmax_depth": minmax_depth,
+            "repeat": repeat,
+            "workers": parallel.workers if parallel is not None else 1,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+        },
+        "summary": {
+            "positions": len(results),
+            "ai_move_time_ms": round(ai_time, 2),
+            "ai_move_nodes": ai_nodes,
+            "minmax_time_ms": round(minmax_time, 2),
+            "minmax_nodes": minmax_nodes,
+            "minmax_nodes_per_sec": _rate(minmax_nodes, minmax_time / 1000),
+        },
+        "positions": results,
+    }
+
+
+def compare(old, new, log=print):
+    """对比两次结果：耗时变化、节点数变化，以及所选落子是否改变"""
+    old_positions = {p["name"]: p for p in old["positions"]}
+    log(f"{'局面':<18}{'ai_move耗时':>14}{'minmax耗时':>14}{'minmax节点':>14}  落子")
+    for entry in new["positions"]:
+        before = old_positions.get(entry["name"])
+        if before is None:
+            log(f"{entry['name']:<18}（新增局面）")
+            continue
+
+        def ratio(section, key):
+            a, b = before[section][key], entry[section][key]
+            return f"{b / a:>13.2f}x" if a else f"{'-':>14}"
+
+        changed = []
+        if before["ai_move"]["move"] != entry["ai_move"]["move"]:
+            changed.append(f"ai_move {before['ai_move']['move']}→{entry['ai_move']['move']}")
+        if before["minmax"]["move"] != entry["minmax"]["move"]:
+            changed.append(f"minmax {before['minmax']['move']}→{entry['minmax']['move']}")
+        log(f"{entry['name']:<18}{ratio('ai_move', 'time_ms')}{ratio('minmax', 'time_ms')}"
+            f"{ratio('minmax', 'nodes')}  {'，'.join(changed) if changed else '相同'}")
+
+    a, b = old["summary"], new["summary"]
+    if a["minmax_time_ms"]:
+        log(f"合计: ai_move {b['ai_move_time_ms'] / a['ai_move_time_ms']:.2f}x，"
+            f"minmax {b['minmax_time_ms'] / a['minmax_time_ms']:.2f}x")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="五子棋AI基准测试")
+    parser.add_argument("--corpus", default=DEFAULT_CORPUS, help="局面库文件")
+    parser.add_argument("-o", "--output", default=DEFAULT_OUTPUT, help="结果JSON文件")
+    parser.add_argument("--compare", metavar="OLD_JSON", help="与之前的结果对比")
+    parser.add_argument("--category", help="只测试某一类局面（opening/middlegame/tactical）")
+    parser.add_argument("--position", action="append", help="只测试指定名称的局面（可重复）")
+    parser.add_argument("--difficulty", type=int, default=4, help="ai_move 的难度（最大深度）")
+    parser.add_argument("--time-limit", type=int, default=60000,
+                        help="ai_move 每步时间预算/毫秒（默认足够大，保证结果可复现）")
+    parser.add_argument("--depth", type=int, default=4, help="单独测试 minmax 的深度")
+    parser.add_argument("--repeat", type=int, default=20, help="微基准的重复次数")
+    parser.add_argument("--workers", type=int, default=1, help="ai_move 并行搜索的进程数")
+    parser.add_argument("--no-memory", action="store_true", help="不测峰值内存（省去一次重复搜索）")
+    args = parser.parse_args(argv)
+
+    positions = load_corpus(args.corpus)
+    if args.category:
+        positions = [p for p in positions if p["category"] == args.category]
+    if args.position:
+        positions = [p for p in positions if p["name"] in args.position]
+    if not positions:
+        parser.error("没有符合条件的局面")
+
+    parallel = None
+    if args.workers > 1:
+        from parallel_search import ParallelSearcher
+        parallel = ParallelSearcher(args.workers)
+    try:
+        result = run_benchmark(positions, args.difficulty, args.time_limit, args.depth,
+                               args.repeat, not args.no_memory, log=print, parallel=parallel)
+    finally:
+        if parallel is not None:
+            parallel.close()
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(result, f, ensure_ascii=False, indent=2)
+    print(f"结果已写入 {args.output}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            compare(json.load(f), result)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
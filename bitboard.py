@@ -0,0 +1,222 @@
+import random
+from itertools import combinations
+import numpy as np
+from constants import BOARD_SIZE
+from native import kernels
+
+# 每行多留一位作为哨兵列（永远为空），横向/斜向移位时不会跨行串位
+STRIDE = BOARD_SIZE + 1
+
+# 四个方向对应的移位量：水平、垂直、对角线、反对角线
+SHIFTS = (1, STRIDE, STRIDE + 1, STRIDE - 1)
+
+# 棋盘上所有有效格子的掩码（不含哨兵列）
+BOARD_MASK = 0
+for _y in range(BOARD_SIZE):
+    BOARD_MASK |= ((1 << BOARD_SIZE) - 1) << (_y * STRIDE)
+
+# Zobrist哈希随机数（固定种子，保证各进程、各次运行的哈希一致）
+_zobrist_rng = random.Random(20251018)
+ZOBRIST = [[_zobrist_rng.getrandbits(64) for _ in range(STRIDE * BOARD_SIZE)] for _ in range(3)]
+# 轮到哪一方落子也要计入哈希
+ZOBRIST_SIDE = [0, _zobrist_rng.getrandbits(64), _zobrist_rng.getrandbits(64)]
+
+# 候选点范围：与已有棋子的横、纵、斜距离都不超过该值的空位
+DEFAULT_FRONTIER_RADIUS = 1
+
+# 五格窗口中已有k颗己方棋子时，其余空格在窗口中的位置组合
+WINDOW_GAPS = [tuple(combinations(range(5), 5 - k)) for k in range(6)]
+
+
+def bit_index(x, y):
+    """坐标(x,y)在位棋盘中的位序号"""
+    return y * STRIDE + x
+
+
+def index_to_xy(index):
+    """位序号转回坐标(x,y)"""
+    return index % STRIDE, index // STRIDE
+
+
+def iter_bits(mask):
+    """按位序号从小到大（即先行后列）依次给出掩码中的坐标"""
+    while mask:
+        low = mask & -mask
+        yield index_to_xy(low.bit_length() - 1)
+        mask ^= low
+
+
+def popcount(mask):
+    """掩码中置位的个数"""
+    return bin(mask).count("1")
+
+
+_neighborhoods = {}
+
+
+def neighborhood(radius):
+    """每个格子周围 (2*radius+1)^2 方框内的其他格子（位序号元组），按半径缓存"""
+    if radius not in _neighborhoods:
+        table = [()] * (STRIDE * BOARD_SIZE)
+        for y in range(BOARD_SIZE):
+            for x in range(BOARD_SIZE):
+                cells = []
+                for ny in range(max(0, y - radius), min(BOARD_SIZE, y + radius + 1)):
+                    for nx in range(max(0, x - radius), min(BOARD_SIZE, x + radius + 1)):
+                        if (nx, ny) != (x, y):
+                            cells.append(ny * STRIDE + nx)
+                table[y * STRIDE + x] = tuple(cells)
+        _neighborhoods[radius] = table
+    return _neighborhoods[radius]
+
+
+def has_five_bits(stones):
+    """移位与运算判断一组棋子中是否存在五连"""
+    for s in SHIFTS:
+        if stones & (stones >> s) & (stones >> 2 * s) & (stones >> 3 * s) & (stones >> 4 * s):
+            return True
+    return False
+
+
+class BitBoard:
+    """AI搜索用的位棋盘：每方棋子各用一个Python整数表示
+
+    另外按位序号保存一份逐格数组，单格读取不必做大整数移位。
+    near 记录每格 radius 范围内的棋子数，落子/回溯时增量更新，
+    计数大于0的格子组成 frontier 掩码，候选点生成直接取其中的空位。
+    """
+
+    def __init__(self, radius=DEFAULT_FRONTIER_RADIUS):
+        self.size = BOARD_SIZE
+        self.stones = [0, 0, 0]  # 下标1、2分别为黑棋、白棋
+        self.cells = [0] * (STRIDE * BOARD_SIZE)
+        self.count = 0
+        self.hash = 0  # Zobrist哈希，随落子/回溯增量更新
+        self.radius = radius
+        self.near = [0] * (STRIDE * BOARD_SIZE)
+        self.frontier = 0
+        self._neighborhood = neighborhood(radius)
+
+    @classmethod
+    def from_array(cls, board, radius=DEFAULT_FRONTIER_RADIUS):
+        """由main.py中的二维数组构造位棋盘"""
+        bitboard = cls(radius)
+        for y in range(BOARD_SIZE):
+            for x in range(BOARD_SIZE):
+                if board[y][x] != 0:
+                    bitboard.place(x, y, int(board[y][x]))
+        return bitboard
+
+    def to_array(self):
+        """转回main.py使用的二维数组"""
+        board = np.zeros((BOARD_SIZE, BOARD_SIZE), dtype=int)
+        for player in (1, 2):
+            for x, y in iter_bits(self.stones[player]):
+                board[y][x] = player
+        return board
+
+    def copy(self):
+        bitboard = type(self)(self.radius)
+        bitboard.stones = self.stones[:]
+        bitboard.cells = self.cells[:]
+        bitboard.count = self.count
+        bitboard.hash = self.hash
+        bitboard.near = self.near[:]
+        bitboard.frontier = self.frontier
+        return bitboard
+
+    def __getstate__(self):
+        # 邻域表是共用的，不随棋盘一起序列化（并行搜索时棋盘要传给子进程）
+        state = self.__dict__.copy()
+        del state["_neighborhood"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._neighborhood = neighborhood(self.radius)
+
+    @property
+    def occupied(self):
+        return self.stones[1] | self.stones[2]
+
+    @property
+    def empty(self):
+        return BOARD_MASK & ~(self.stones[1] | self.stones[2])
+
+    @property
+    def candidates(self):
+        """与已有棋子相距不超过 radius 的空位（掩码）"""
+        return self.frontier & ~(self.stones[1] | self.stones[2])
+
+    def get(self, x, y):
+        """读取(x,y)：0为空，1为黑棋，2为白棋"""
+        return self.cells[y * STRIDE + x]
+
+    def place(self, x, y, player):
+        """落子（O(1)）"""
+        index = y * STRIDE + x
+        self.stones[player] |= 1 << index
+        self.cells[index] = player
+        self.count += 1
+        self.hash ^= ZOBRIST[player][index]
+        near = self.near
+        added = 0
+        for cell in self._neighborhood[index]:
+            near[cell] += 1
+            if near[cell] == 1:
+                added |= 1 << cell
+        self.frontier |= added
+
+    def remove(self, x, y):
+        """撤销(x,y)上的棋子（O(1)）"""
+        index = y * STRIDE + x
+        player = self.cells[index]
+        self.stones[player] &= ~(1 << index)
+        self.cells[index] = 0
+        self.count -= 1
+        self.hash ^= ZOBRIST[player][index]
+        near = self.near
+        dropped = 0
+        for cell in self._neighborhood[index]:
+            near[cell] -= 1
+            if near[cell] == 0:
+                dropped |= 1 << cell
+        self.frontier &= ~dropped
+
+    def position_key(self, player):
+        """置换表键：局面哈希加上轮到落子的一方"""
+        return self.hash ^ ZOBRIST_SIDE[player]
+
+    def has_five(self, player):
+        return has_five_bits(self.stones[player])
+
+    def window_points(self, player, count):
+        """所有“恰有count颗player棋子、其余格为空”的五格窗口中的空位（掩码）
+
+        count=4 即再落一子成五的点，count=3 即落下后能成四（冲四/活四）的点。
+        编译了C扩展时由 _kernels 逐格计算（见 native）。
+        """
+        if kernels is not None:
+            return kernels.window_points(self.cells, player, count)
+        return self._window_points_python(player, count)
+
+    def _window_points_python(self, player, count):
+        own = self.stones[player]
+        empty = self.empty
+        points = 0
+        for s in SHIFTS:
+            shifted_own = [own >> (k * s) for k in range(5)]
+            shifted_empty = [empty >> (k * s) for k in range(5)]
+            # 以五格窗口的起点为基准：gaps中的格为空，其余格都是己方棋子
+            for gaps in WINDOW_GAPS[count]:
+                window = -1
+                for k in range(5):
+                    window &= shifted_empty[k] if k in gaps else shifted_own[k]
+                if window:
+                    for gap in gaps:
+                        points |= window << (gap * s)
+        return points & BOARD_MASK
+
+    def winning_points(self, player):
+        """player再落一子即可成五的所有空位（掩码）"""
+        return self.window_points(player, 4)
@@ -0,0 +1,32 @@
+"""编译可选的C扩展 _kernels（见 native.py），生成的模块放在程序目录下
+
+    python build_kernels.py
+
+需要C编译器（Windows 上为 Visual Studio 生成工具）。编译失败不影响游戏，各模块继续使用纯Python实现。
+禁止浮点乘加合并（FMA），保证分数与Python的计算结果逐位一致。
+"""
+import os
+import sys
+
+from setuptools import Extension, setup
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+if sys.platform == "win32":
+    COMPILE_ARGS = ["/O2", "/fp:precise"]
+else:
+    COMPILE_ARGS = ["-O2", "-ffp-contract=off"]
+
+
+def main():
+    os.chdir(HERE)
+    setup(
+        name="wuziqi-kernels",
+        ext_modules=[Extension("_kernels", ["_kernels.c"], extra_compile_args=COMPILE_ARGS)],
+        script_args=["build_ext", "--inplace"],
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -14,4 +14,18 @@ BUTTON_HOVER = (100, 149, 237)
 TEXT_COLOR = (255, 255, 255)
 HIGHLIGHT = (255, 215, 0, 150)
 
-BOARD_SIZE = 15
\ No newline at end of file
+BOARD_SIZE = 15
+
+# AI并行搜索的进程数（见 parallel_search），1 表示单进程搜索
+AI_SEARCH_WORKERS = 1
+
+# 玩家思考时AI是否按猜测的应手在后台提前搜索（见 ai_worker.AIWorker.ponder）
+AI_PONDER = True
+
+# 界面按事件重画：没有输入、计时或AI结果时阻塞等待，不再每秒60帧轮询；False 时恢复60帧轮询
+EVENT_DRIVEN_RENDER = True
+# AI思考期间查看结果的间隔（毫秒）
+AI_POLL_INTERVAL_MS = 50
+
+# 对局是否边下边追加写入棋谱文件（见 game_record，程序目录下的 game_records.wzq）
+RECORD_GAMES = True
@@ -9,65 +9,116 @@ def draw_background(screen, SCREEN_WIDTH, SCREEN_HEIGHT):
     screen.fill(BACKGROUND)
 
 
-def draw_board(screen, SCREEN_WIDTH, SCREEN_HEIGHT, BOARD_PADDING, BOARD_TOP, GRID_SIZE):
-    # 绘制木质棋盘背景
+TIME_OPTIONS = ["30秒", "1分钟", "2分钟", "无限时间"]
+DIFFICULTY_OPTIONS = ["简单", "正常", "困难"]
+
+# 静态棋盘（木纹、网格、星位）按格子大小缓存，棋子按半径缓存为精灵
+_board_surfaces = {}
+_stone_sprites = {}
+# 各界面的按钮位置按窗口尺寸缓存（点击判断不必再画一遍界面）
+_layouts = {}
+
+
+def _cached_layout(key, build):
+    """key 中应包含窗口尺寸；返回的矩形是共用的，调用方不要修改"""
+    if key not in _layouts:
+        if len(_layouts) > 32:
+            _layouts.clear()  # 窗口尺寸变过多次，旧尺寸的布局不再需要
+        _layouts[key] = build()
+    return _layouts[key]
+
+
+def board_rect(BOARD_PADDING, BOARD_TOP, GRID_SIZE):
+    """木质棋盘所占的矩形（网格外留半格）"""
     board_width = GRID_SIZE * (BOARD_SIZE - 1)
-    board_rect = pygame.Rect(
+    return pygame.Rect(
         BOARD_PADDING - GRID_SIZE * 0.5,
         BOARD_TOP - GRID_SIZE * 0.5,
         board_width + GRID_SIZE,
         board_width + GRID_SIZE
     )
-    pygame.draw.rect(screen, BOARD_COLOR, board_rect)
-
-    # 绘制棋盘纹理
-    for i in range(50):
-        x = random.randint(board_rect.left, board_rect.right)
-        y = random.randint(board_rect.top, board_rect.bottom)
-        w = random.randint(5, 30)
-        h = random.randint(1, 3)
-        pygame.draw.rect(screen, (200, 170, 130), (x, y, w, h))
-
-    # 绘制网格线
-    for i in range(BOARD_SIZE):
-        # 横线
-        pygame.draw.line(
-            screen, LINE_COLOR,
-            (BOARD_PADDING, BOARD_TOP + i * GRID_SIZE),
-            (BOARD_PADDING + (BOARD_SIZE - 1) * GRID_SIZE, BOARD_TOP + i * GRID_SIZE),
-            2
-        )
-        # 竖线
-        pygame.draw.line(
-            screen, LINE_COLOR,
-            (BOARD_PADDING + i * GRID_SIZE, BOARD_TOP),
-            (BOARD_PADDING + i * GRID_SIZE, BOARD_TOP + (BOARD_SIZE - 1) * GRID_SIZE),
-            2
-        )
 
-    # 绘制天元和星位
-    star_points = [3, BOARD_SIZE // 2, BOARD_SIZE - 4]
-    for x in star_points:
-        for y in star_points:
-            pygame.draw.circle(
-                screen, LINE_COLOR,
-                (BOARD_PADDING + x * GRID_SIZE, BOARD_TOP + y * GRID_SIZE),
-                5
+
+def get_board_surface(GRID_SIZE):
+    """预先渲染好的棋盘（只依赖格子大小），窗口尺寸变化时才重新生成"""
+    if GRID_SIZE not in _board_surfaces:
+        _board_surfaces.clear()
+        rect = board_rect(GRID_SIZE * 0.5, GRID_SIZE * 0.5, GRID_SIZE)
+        surface = pygame.Surface(rect.size)
+        surface.fill(BOARD_COLOR)
+
+        # 棋盘纹理（固定种子，每次生成的纹理相同，画面不会闪烁）
+        rng = random.Random(0)
+        for i in range(50):
+            x = rng.randint(0, rect.width)
+            y = rng.randint(0, rect.height)
+            w = rng.randint(5, 30)
+            h = rng.randint(1, 3)
+            pygame.draw.rect(surface, (200, 170, 130), (x, y, w, h))
+
+        # 网格线（相对棋盘左上角；棋盘矩形的左上角取整时向下取整，网格偏移相应向上取整）
+        offset = GRID_SIZE - GRID_SIZE // 2
+        for i in range(BOARD_SIZE):
+            # 横线
+            pygame.draw.line(
+                surface, LINE_COLOR,
+                (offset, offset + i * GRID_SIZE),
+                (offset + (BOARD_SIZE - 1) * GRID_SIZE, offset + i * GRID_SIZE),
+                2
+            )
+            # 竖线
+            pygame.draw.line(
+                surface, LINE_COLOR,
+                (offset + i * GRID_SIZE, offset),
+                (offset + i * GRID_SIZE, offset + (BOARD_SIZE - 1) * GRID_SIZE),
+                2
             )
 
+        # 天元和星位
+        star_points = [3, BOARD_SIZE // 2, BOARD_SIZE - 4]
+        for x in star_points:
+            for y in star_points:
+                pygame.draw.circle(
+                    surface, LINE_COLOR,
+                    (offset + x * GRID_SIZE, offset + y * GRID_SIZE),
+                    5
+                )
+        _board_surfaces[GRID_SIZE] = surface
+    return _board_surfaces[GRID_SIZE]
+
+
+def get_stone_sprites(STONE_RADIUS):
+    """黑白棋子的精灵 {1: 黑, 2: 白}，中心即Surface中心"""
+    if STONE_RADIUS not in _stone_sprites:
+        _stone_sprites.clear()
+        size = int(STONE_RADIUS * 2) + 2
+        center = (size / 2, size / 2)
+        sprites = {}
+        for player, outer, inner in ((1, BLACK, (50, 50, 50)), (2, WHITE, (230, 230, 230))):
+            sprite = pygame.Surface((size, size), pygame.SRCALPHA)
+            pygame.draw.circle(sprite, outer, center, STONE_RADIUS)
+            pygame.draw.circle(sprite, inner, center, STONE_RADIUS - 2)
+            sprites[player] = sprite
+        _stone_sprites[STONE_RADIUS] = sprites
+    return _stone_sprites[STONE_RADIUS]
+
+
+def draw_board(screen, SCREEN_WIDTH, SCREEN_HEIGHT, BOARD_PADDING, BOARD_TOP, GRID_SIZE):
+    # 木质棋盘、纹理、网格线和星位都已预先渲染，直接贴图
+    screen.blit(get_board_surface(GRID_SIZE), board_rect(BOARD_PADDING, BOARD_TOP, GRID_SIZE))
+
+
+def _blit_stone(screen, sprites, player, pos_x, pos_y):
+    sprite = sprites[player]
+    screen.blit(sprite, (pos_x - sprite.get_width() / 2, pos_y - sprite.get_height() / 2))
+
 
 def draw_stone(screen, board, last_move, BOARD_PADDING, BOARD_TOP, GRID_SIZE, STONE_RADIUS):
+    sprites = get_stone_sprites(STONE_RADIUS)
     for y in range(BOARD_SIZE):
         for x in range(BOARD_SIZE):
-            pos_x = BOARD_PADDING + x * GRID_SIZE
-            pos_y = BOARD_TOP + y * GRID_SIZE
-
-            if board[y][x] == 1:  # 黑棋
-                pygame.draw.circle(screen, BLACK, (pos_x, pos_y), STONE_RADIUS)
-                pygame.draw.circle(screen, (50, 50, 50), (pos_x, pos_y), STONE_RADIUS - 2)
-            elif board[y][x] == 2:  # 白棋
-                pygame.draw.circle(screen, WHITE, (pos_x, pos_y), STONE_RADIUS)
-                pygame.draw.circle(screen, (230, 230, 230), (pos_x, pos_y), STONE_RADIUS - 2)
+            if board[y][x] != 0:
+                _blit_stone(screen, sprites, board[y][x], BOARD_PADDING + x * GRID_SIZE, BOARD_TOP + y * GRID_SIZE)
 
     # 高亮显示最后一步
     if last_move:
@@ -77,6 +128,183 @@ def draw_stone(screen, board, last_move, BOARD_PADDING, BOARD_TOP, GRID_SIZE, ST
         pygame.draw.circle(screen, RED, (pos_x, pos_y), 5)
 
 
+class BoardView:
+    """对局画面的增量绘制（脏矩形）
+
+    背景和棋盘预先渲染成一张整屏的底图，落子时只在底图上补画变化的格子；
+    控制台、回合提示、进度条等作为浮层，每帧给出 (名称, 矩形, 内容, 绘制函数)，
+    只有内容或位置变化时才重画。render() 返回需要刷新的矩形，
+    交给 pygame.display.update(rects)；画面没有变化时返回空列表。
+    """
+
+    def __init__(self):
+        self._layout = None
+        self._layer = None  # 背景 + 棋盘 + 棋子
+        self._static = None  # 背景 + 棋盘
+        self._stones = None  # _layer 上已画的棋子
+        self._last_move = None
+        self._overlays = {}  # 名称 → (矩形, 内容)
+        self._full = True
+
+    def invalidate(self):
+        """下一次 render 整屏重画（切换界面后调用）"""
+        self._full = True
+
+    def _cell_rect(self, x, y):
+        _, padding, top, grid, _ = self._layout
+        return pygame.Rect(padding + x * grid - grid / 2 - 1, top + y * grid - grid / 2 - 1, grid + 2, grid + 2)
+
+    def _draw_cell(self, x, y):
+        """在 _layer 上重画一个格子：先贴回底图，再画棋子和最后一步标记"""
+        _, padding, top, grid, radius = self._layout
+        rect = self._cell_rect(x, y)
+        self._layer.blit(self._static, rect, rect)
+        player = self._stones[y][x]
+        pos_x, pos_y = padding + x * grid, top + y * grid
+        if player != 0:
+            _blit_stone(self._layer, get_stone_sprites(radius), player, pos_x, pos_y)
+        if self._last_move == (x, y):
+            pygame.draw.circle(self._layer, RED, (pos_x, pos_y), 5)
+        return rect
+
+    def _rebuild(self, layout):
+        self._layout = layout
+        size, padding, top, grid, radius = layout
+        self._static = pygame.Surface(size)
+        self._static.fill(BACKGROUND)
+        draw_board(self._static, size[0], size[1], padding, top, grid)
+        self._layer = self._static.copy()
+        self._stones = [[0] * BOARD_SIZE for _ in range(BOARD_SIZE)]
+        self._last_move = None
+
+    def render(self, screen, board, last_move, BOARD_PADDING, BOARD_TOP, GRID_SIZE, STONE_RADIUS,
+               overlays=()):
+        """overlays 为 [(名称, 矩形, 内容, 绘制函数)]，绘制函数 draw(screen) 按列表顺序叠在棋盘上"""
+        layout = (screen.get_size(), BOARD_PADDING, BOARD_TOP, GRID_SIZE, STONE_RADIUS)
+        if layout != self._layout:
+            self._rebuild(layout)
+            self._full = True
+
+        # 棋盘上变化的格子（落子、悔棋、最后一步标记移动）
+        dirty = []
+        changed = set()
+        for y in range(BOARD_SIZE):
+            row, drawn = board[y], self._stones[y]
+            for x in range(BOARD_SIZE):
+                if row[x] != drawn[x]:
+                    drawn[x] = int(row[x])
+                    changed.add((x, y))
+        last_move = tuple(last_move) if last_move else None
+        if last_move != self._last_move:
+            for move in (self._last_move, last_move):
+                if move:
+                    changed.add(move)
+            self._last_move = last_move
+        for x, y in changed:
+            dirty.append(self._draw_cell(x, y))
+
+        # 浮层：新出现、消失或内容变化的都要重画
+        overlays = [(name, pygame.Rect(rect), key, draw) for name, rect, key, draw in overlays]
+        current = {name: (rect, key) for name, rect, key, _ in overlays}
+        for name, (rect, key) in current.items():
+            previous = self._overlays.get(name)
+            if previous != (rect, key):
+                dirty.append(rect)
+                if previous is not None:
+                    dirty.append(previous[0])
+        for name, (rect, _) in self._overlays.items():
+            if name not in current:
+                dirty.append(rect)
+        self._overlays = current
+
+        if self._full:
+            self._full = False
+            dirty = [screen.get_rect()]
+        screen_rect = screen.get_rect()
+        dirty = [rect.clip(screen_rect) for rect in dirty]
+        dirty = [rect for rect in dirty if rect.width > 0 and rect.height > 0]
+
+        # 重画脏区域：贴回带棋子的底图，再按顺序叠上与之相交的浮层
+        for rect in dirty:
+            screen.set_clip(rect)
+            screen.blit(self._layer, rect, rect)
+            for _, overlay_rect, _, draw in overlays:
+                if rect.colliderect(overlay_rect):
+                    draw(screen)
+        screen.set_clip(None)
+        return dirty
+
+
+def _thinking_text():
+    # 末尾的点随时间变化，表示AI仍在计算
+    return "AI思考中" + "." * (pygame.time.get_ticks() // 400 % 4)
+
+
+def draw_thinking_indicator(screen, SCREEN_WIDTH, small_font=None):
+    if small_font is None:
+        small_font = pygame.font.Font(None, 28)
+
+    text = small_font.render(_thinking_text(), True, GOLD)
+    screen.blit(text, (SCREEN_WIDTH - text.get_width() - 20, 165))
+
+
+def thinking_indicator_overlay(SCREEN_WIDTH, small_font):
+    """BoardView 的浮层：AI思考中提示"""
+    text = _thinking_text()
+    width, height = small_font.size(text)
+    return ("thinking", (SCREEN_WIDTH - width - 20, 165, width, height), text,
+            lambda screen: draw_thinking_indicator(screen, SCREEN_WIDTH, small_font))
+
+
+def draw_turn_indicator(screen, SCREEN_WIDTH, move_count, font):
+    """右上角显示当前回合"""
+    turn_player = "黑棋" if move_count % 2 == 0 else "白棋"
+    turn_text = font.render(f"当前回合: {turn_player}", True, WHITE)
+    screen.blit(turn_text, (SCREEN_WIDTH - turn_text.get_width() - 20, 120))
+
+
+def turn_indicator_overlay(SCREEN_WIDTH, move_count, font):
+    """BoardView 的浮层：当前回合"""
+    width, height = font.size(f"当前回合: {'黑棋' if move_count % 2 == 0 else '白棋'}")
+    return ("turn", (SCREEN_WIDTH - width - 20, 120, width, height), move_count % 2,
+            lambda screen: draw_turn_indicator(screen, SCREEN_WIDTH, move_count, font))
+
+
+def _search_stats_rect(SCREEN_HEIGHT, lines, small_font):
+    line_height = small_font.get_linesize()
+    panel_width = max(small_font.size(line)[0] for line in lines) + 20
+    panel_height = line_height * len(lines) + 10
+    return pygame.Rect(10, SCREEN_HEIGHT - panel_height - 10, panel_width, panel_height)
+
+
+def draw_search_stats(screen, SCREEN_WIDTH, SCREEN_HEIGHT, lines, small_font=None):
+    """调试模式下在左下角显示AI上一步的搜索统计（lines 见 SearchStats.format_lines）"""
+    if small_font is None:
+        small_font = pygame.font.Font(None, 28)
+    if not lines:
+        lines = ["搜索统计: 暂无"]
+
+    line_height = small_font.get_linesize()
+    rendered = [small_font.render(line, True, TEXT_COLOR) for line in lines]
+    panel_x, panel_y, panel_width, panel_height = _search_stats_rect(SCREEN_HEIGHT, lines, small_font)
+
+    # 半透明面板，与控制台风格一致
+    s = pygame.Surface((panel_width, panel_height), pygame.SRCALPHA)
+    s.fill(PANEL_COLOR)
+    screen.blit(s, (panel_x, panel_y))
+    pygame.draw.rect(screen, GOLD, (panel_x, panel_y, panel_width, panel_height), 1, border_radius=5)
+
+    for i, text in enumerate(rendered):
+        screen.blit(text, (panel_x + 10, panel_y + 5 + i * line_height))
+
+
+def search_stats_overlay(SCREEN_WIDTH, SCREEN_HEIGHT, lines, small_font):
+    """BoardView 的浮层：搜索统计面板"""
+    lines = tuple(lines) if lines else ("搜索统计: 暂无",)
+    return ("search_stats", _search_stats_rect(SCREEN_HEIGHT, lines, small_font), lines,
+            lambda screen: draw_search_stats(screen, SCREEN_WIDTH, SCREEN_HEIGHT, lines, small_font))
+
+
 def draw_control_panel(screen, SCREEN_WIDTH, SCREEN_HEIGHT, player_color, game_over=False, winner=0,
                        font=None, small_font=None):
     if font is None:
@@ -84,12 +312,7 @@ def draw_control_panel(screen, SCREEN_WIDTH, SCREEN_HEIGHT, player_color, game_o
     if small_font is None:
         small_font = pygame.font.Font(None, 28)
 
-    # 缩小控制面板尺寸并移到左上角
-    panel_width = min(SCREEN_WIDTH * 0.15, 200)  # 更小宽度
-    # 增加面板高度以容纳更多按钮
-    panel_height = min(SCREEN_HEIGHT * 0.25, 220)  # 增加高度
-    panel_x = 10  # 左上角
-    panel_y = 10  # 左上角
+    panel_x, panel_y, panel_width, panel_height = control_panel_rect(SCREEN_WIDTH, SCREEN_HEIGHT)
 
     # 绘制半透明面板
     s = pygame.Surface((panel_width, panel_height), pygame.SRCALPHA)
@@ -119,6 +342,38 @@ def draw_control_panel(screen, SCREEN_WIDTH, SCREEN_HEIGHT, player_color, game_o
     screen.blit(status_text, (panel_x + 5, panel_y + 55))
 
     # 绘制按钮
+    buttons = control_panel_buttons(SCREEN_WIDTH, SCREEN_HEIGHT, game_over)
+    mouse_pos = pygame.mouse.get_pos()
+    for text, button_rect in buttons:
+        # 按钮颜色（根据鼠标悬停状态）
+        color = BUTTON_HOVER if button_rect.collidepoint(mouse_pos) else BUTTON_COLOR
+
+        pygame.draw.rect(screen, color, button_rect, border_radius=3)
+        pygame.draw.rect(screen, GOLD, button_rect, 1, border_radius=3)
+
+        text_surf = small_font.render(text, True, TEXT_COLOR)
+        screen.blit(text_surf, (button_rect.centerx - text_surf.get_width() // 2,
+                                button_rect.centery - text_surf.get_height() // 2))
+
+    return buttons
+
+
+def control_panel_rect(SCREEN_WIDTH, SCREEN_HEIGHT):
+    # 缩小控制面板尺寸并移到左上角
+    panel_width = min(SCREEN_WIDTH * 0.15, 200)  # 更小宽度
+    # 增加面板高度以容纳更多按钮
+    panel_height = min(SCREEN_HEIGHT * 0.25, 220)  # 增加高度
+    return pygame.Rect(10, 10, panel_width, panel_height)  # 左上角
+
+
+def control_panel_buttons(SCREEN_WIDTH, SCREEN_HEIGHT, game_over=False):
+    """控制面板按钮的位置 [(文字, 矩形)]，不做绘制"""
+    return _cached_layout(("control_panel", SCREEN_WIDTH, SCREEN_HEIGHT, game_over),
+                          lambda: _control_panel_buttons(SCREEN_WIDTH, SCREEN_HEIGHT, game_over))
+
+
+def _control_panel_buttons(SCREEN_WIDTH, SCREEN_HEIGHT, game_over):
+    panel_x, panel_y, panel_width, _ = control_panel_rect(SCREEN_WIDTH, SCREEN_HEIGHT)
     buttons = []
     button_y = panel_y + 80
     button_height = 25  # 更小按钮高度
@@ -131,24 +386,23 @@ def draw_control_panel(screen, SCREEN_WIDTH, SCREEN_HEIGHT, player_color, game_o
         button_texts = ["退出", "和棋", "悔棋", "重新开始"]  # 新增"重新开始"按钮
 
     for text in button_texts:
-        button_rect = pygame.Rect(panel_x + 5, button_y, panel_width - 10, button_height)
-        buttons.append((text, button_rect))
-
-        # 按钮颜色（根据鼠标悬停状态）
-        mouse_pos = pygame.mouse.get_pos()
-        color = BUTTON_HOVER if button_rect.collidepoint(mouse_pos) else BUTTON_COLOR
-
-        pygame.draw.rect(screen, color, button_rect, border_radius=3)
-        pygame.draw.rect(screen, GOLD, button_rect, 1, border_radius=3)
-
-        text_surf = small_font.render(text, True, TEXT_COLOR)
-        screen.blit(text_surf, (button_rect.centerx - text_surf.get_width() // 2,
-                                button_rect.centery - text_surf.get_height() // 2))
-
+        buttons.append((text, pygame.Rect(panel_x + 5, button_y, panel_width - 10, button_height)))
         button_y += button_height + 5  # 更小按钮间距
-
     return buttons
 
+
+def control_panel_overlay(SCREEN_WIDTH, SCREEN_HEIGHT, player_color, game_over, winner, font, small_font):
+    """BoardView 的浮层：控制面板，鼠标悬停的按钮变化时重画"""
+    mouse_pos = pygame.mouse.get_pos()
+    hovered = None
+    for text, rect in control_panel_buttons(SCREEN_WIDTH, SCREEN_HEIGHT, game_over):
+        if rect.collidepoint(mouse_pos):
+            hovered = text
+    return ("control_panel", control_panel_rect(SCREEN_WIDTH, SCREEN_HEIGHT),
+            (player_color, game_over, winner, hovered),
+            lambda screen: draw_control_panel(screen, SCREEN_WIDTH, SCREEN_HEIGHT, player_color,
+                                              game_over, winner, font, small_font))
+
 def draw_home_screen(screen, SCREEN_WIDTH, SCREEN_HEIGHT, STONE_RADIUS,
                      title_font=None, font=None, small_font=None):
     if title_font is None:
@@ -169,14 +423,10 @@ def draw_home_screen(screen, SCREEN_WIDTH, SCREEN_HEIGHT, STONE_RADIUS,
     screen.blit(subtitle, (SCREEN_WIDTH / 2 - subtitle.get_width() // 2, SCREEN_HEIGHT * 0.25))
 
     # 绘制棋子选择按钮
-    buttons = []
-    button_width = min(200, SCREEN_WIDTH * 0.3)
-    button_height = min(60, SCREEN_HEIGHT * 0.1)
-    button_y = SCREEN_HEIGHT * 0.4
+    buttons = home_screen_buttons(SCREEN_WIDTH, SCREEN_HEIGHT)
+    (_, black_rect), (_, white_rect), (_, instructions_btn_rect) = buttons
 
     # 黑棋按钮
-    black_rect = pygame.Rect(SCREEN_WIDTH / 2 - button_width - 20, button_y, button_width, button_height)
-    buttons.append(('black', black_rect))
     pygame.draw.rect(screen, (50, 50, 50), black_rect, border_radius=10)
     pygame.draw.rect(screen, GOLD, black_rect, 3, border_radius=10)
     black_text = font.render("黑棋", True, WHITE)
@@ -184,8 +434,6 @@ def draw_home_screen(screen, SCREEN_WIDTH, SCREEN_HEIGHT, STONE_RADIUS,
                              black_rect.centery - black_text.get_height() // 2))
 
     # 白棋按钮
-    white_rect = pygame.Rect(SCREEN_WIDTH / 2 + 20, button_y, button_width, button_height)
-    buttons.append(('white', white_rect))
     pygame.draw.rect(screen, (220, 220, 220), white_rect, border_radius=10)
     pygame.draw.rect(screen, GOLD, white_rect, 3, border_radius=10)
     white_text = font.render("白棋", True, BLACK)
@@ -207,16 +455,6 @@ def draw_home_screen(screen, SCREEN_WIDTH, SCREEN_HEIGHT, STONE_RADIUS,
     creator = small_font.render("制作人：浩空", True, (50, 50, 50))
     screen.blit(creator, (SCREEN_WIDTH / 2 - creator.get_width() // 2, SCREEN_HEIGHT * 0.91))
 
-    instructions_btn_width = 120
-    instructions_btn_height = 30
-    instructions_btn_rect = pygame.Rect(
-        SCREEN_WIDTH / 2 - instructions_btn_width // 2,
-        SCREEN_HEIGHT * 0.96,
-        instructions_btn_width,
-        instructions_btn_height
-    )
-    buttons.append(('instructions', instructions_btn_rect))
-
     mouse_pos = pygame.mouse.get_pos()
     color = BUTTON_HOVER if instructions_btn_rect.collidepoint(mouse_pos) else BUTTON_COLOR
 
@@ -229,6 +467,28 @@ def draw_home_screen(screen, SCREEN_WIDTH, SCREEN_HEIGHT, STONE_RADIUS,
 
     return buttons
 
+
+def home_screen_buttons(SCREEN_WIDTH, SCREEN_HEIGHT):
+    """主界面按钮 [(类型, 矩形)]：black、white、instructions"""
+    def build():
+        button_width = min(200, SCREEN_WIDTH * 0.3)
+        button_height = min(60, SCREEN_HEIGHT * 0.1)
+        button_y = SCREEN_HEIGHT * 0.4
+        instructions_btn_width = 120
+        instructions_btn_height = 30
+        return [
+            ('black', pygame.Rect(SCREEN_WIDTH / 2 - button_width - 20, button_y, button_width, button_height)),
+            ('white', pygame.Rect(SCREEN_WIDTH / 2 + 20, button_y, button_width, button_height)),
+            ('instructions', pygame.Rect(
+                SCREEN_WIDTH / 2 - instructions_btn_width // 2,
+                SCREEN_HEIGHT * 0.96,
+                instructions_btn_width,
+                instructions_btn_height
+            )),
+        ]
+    return _cached_layout(("home", SCREEN_WIDTH, SCREEN_HEIGHT), build)
+
+
 def draw_instructions_dialog(screen, SCREEN_WIDTH, SCREEN_HEIGHT, font=None, small_font=None):
     if font is None:
         font = pygame.font.Font(None, 36)
@@ -267,14 +527,7 @@ def draw_instructions_dialog(screen, SCREEN_WIDTH, SCREEN_HEIGHT, font=None, sma
         screen.blit(text, (dialog_x + dialog_width // 2 - text.get_width() // 2, content_y))
         content_y += 30
 
-    ok_btn_width = 100
-    ok_btn_height = 40
-    ok_btn_rect = pygame.Rect(
-        dialog_x + dialog_width // 2 - ok_btn_width // 2,
-        dialog_y + dialog_height - 60,
-        ok_btn_width,
-        ok_btn_height
-    )
+    ok_btn_rect = instructions_ok_rect(SCREEN_WIDTH, SCREEN_HEIGHT)
 
     mouse_pos = pygame.mouse.get_pos()
     color = BUTTON_HOVER if ok_btn_rect.collidepoint(mouse_pos) else BUTTON_COLOR
@@ -289,6 +542,46 @@ def draw_instructions_dialog(screen, SCREEN_WIDTH, SCREEN_HEIGHT, font=None, sma
     return ok_btn_rect
 
 
+def instructions_ok_rect(SCREEN_WIDTH, SCREEN_HEIGHT):
+    """游玩须知对话框的“确定”按钮"""
+    def build():
+        dialog_width = min(SCREEN_WIDTH * 0.8, 600)
+        dialog_height = min(SCREEN_HEIGHT * 0.6, 400)
+        dialog_x = (SCREEN_WIDTH - dialog_width) // 2
+        dialog_y = (SCREEN_HEIGHT - dialog_height) // 2
+        ok_btn_width = 100
+        ok_btn_height = 40
+        return pygame.Rect(
+            dialog_x + dialog_width // 2 - ok_btn_width // 2,
+            dialog_y + dialog_height - 60,
+            ok_btn_width,
+            ok_btn_height
+        )
+    return _cached_layout(("instructions", SCREEN_WIDTH, SCREEN_HEIGHT), build)
+
+
+def _option_buttons(SCREEN_WIDTH, SCREEN_HEIGHT, count):
+    """难度/时间选择界面纵向排列的选项按钮"""
+    buttons = []
+    button_width = min(300, SCREEN_WIDTH * 0.6)
+    button_height = min(60, SCREEN_HEIGHT * 0.1)
+    button_y = SCREEN_HEIGHT * 0.35
+    for i in range(count):
+        buttons.append(pygame.Rect(SCREEN_WIDTH / 2 - button_width / 2, button_y, button_width, button_height))
+        button_y += button_height + 15
+    return buttons
+
+
+def time_setting_buttons(SCREEN_WIDTH, SCREEN_HEIGHT):
+    return _cached_layout(("time_setting", SCREEN_WIDTH, SCREEN_HEIGHT),
+                          lambda: _option_buttons(SCREEN_WIDTH, SCREEN_HEIGHT, len(TIME_OPTIONS)))
+
+
+def difficulty_buttons(SCREEN_WIDTH, SCREEN_HEIGHT):
+    return _cached_layout(("difficulty", SCREEN_WIDTH, SCREEN_HEIGHT),
+                          lambda: _option_buttons(SCREEN_WIDTH, SCREEN_HEIGHT, len(DIFFICULTY_OPTIONS)))
+
+
 def draw_time_setting_screen(screen, SCREEN_WIDTH, SCREEN_HEIGHT,
                              title_font=None, font=None, small_font=None):
     if title_font is None:
@@ -306,17 +599,9 @@ def draw_time_setting_screen(screen, SCREEN_WIDTH, SCREEN_HEIGHT,
     subtitle = font.render("选择时间限制", True, WHITE)
     screen.blit(subtitle, (SCREEN_WIDTH / 2 - subtitle.get_width() // 2, SCREEN_HEIGHT * 0.25))
 
-    buttons = []
-    button_width = min(300, SCREEN_WIDTH * 0.6)
-    button_height = min(60, SCREEN_HEIGHT * 0.1)
-    button_y = SCREEN_HEIGHT * 0.35
-    time_options = ["30秒", "1分钟", "2分钟", "无限时间"]
-
-    for i, option in enumerate(time_options):
-        button_rect = pygame.Rect(SCREEN_WIDTH / 2 - button_width / 2, button_y, button_width, button_height)
-        buttons.append(button_rect)
-
-        mouse_pos = pygame.mouse.get_pos()
+    buttons = time_setting_buttons(SCREEN_WIDTH, SCREEN_HEIGHT)
+    mouse_pos = pygame.mouse.get_pos()
+    for option, button_rect in zip(TIME_OPTIONS, buttons):
         color = BUTTON_HOVER if button_rect.collidepoint(mouse_pos) else BUTTON_COLOR
 
         pygame.draw.rect(screen, color, button_rect, border_radius=10)
@@ -326,8 +611,6 @@ def draw_time_setting_screen(screen, SCREEN_WIDTH, SCREEN_HEIGHT,
         screen.blit(text, (button_rect.centerx - text.get_width() // 2,
                            button_rect.centery - text.get_height() // 2))
 
-        button_y += button_height + 15
-
     return buttons
 
 def draw_difficulty_screen(screen, SCREEN_WIDTH, SCREEN_HEIGHT,
@@ -347,17 +630,9 @@ def draw_difficulty_screen(screen, SCREEN_WIDTH, SCREEN_HEIGHT,
     subtitle = font.render("难度越高，AI思考越深", True, WHITE)
     screen.blit(subtitle, (SCREEN_WIDTH / 2 - subtitle.get_width() // 2, SCREEN_HEIGHT * 0.25))
 
-    buttons = []
-    button_width = min(300, SCREEN_WIDTH * 0.6)
-    button_height = min(60, SCREEN_HEIGHT * 0.1)
-    button_y = SCREEN_HEIGHT * 0.35
-    difficulty_options = ["简单", "正常", "困难"]
-
-    for i, option in enumerate(difficulty_options):
-        button_rect = pygame.Rect(SCREEN_WIDTH / 2 - button_width / 2, button_y, button_width, button_height)
-        buttons.append(button_rect)
-
-        mouse_pos = pygame.mouse.get_pos()
+    buttons = difficulty_buttons(SCREEN_WIDTH, SCREEN_HEIGHT)
+    mouse_pos = pygame.mouse.get_pos()
+    for option, button_rect in zip(DIFFICULTY_OPTIONS, buttons):
         color = BUTTON_HOVER if button_rect.collidepoint(mouse_pos) else BUTTON_COLOR
 
         pygame.draw.rect(screen, color, button_rect, border_radius=10)
@@ -367,6 +642,4 @@ def draw_difficulty_screen(screen, SCREEN_WIDTH, SCREEN_HEIGHT,
         screen.blit(text, (button_rect.centerx - text.get_width() // 2,
                            button_rect.centery - text.get_height() // 2))
 
-        button_y += button_height + 15
-
     return buttons
\ No newline at end of file
@@ -0,0 +1,86 @@
+from constants import BOARD_SIZE
+from bitboard import BitBoard, STRIDE, DEFAULT_FRONTIER_RADIUS
+from patterns import LINE_WINDOWS
+from native import kernels
+
+CELL_COUNT = STRIDE * BOARD_SIZE
+
+
+def _build_initial_codes():
+    """空棋盘上每格4个方向的窗口编码（只含棋盘外格子的固定部分）"""
+    codes = [0] * (CELL_COUNT * 4)
+    for index, windows in enumerate(LINE_WINDOWS):
+        if windows is None:
+            continue  # 哨兵列
+        for direction, (base, _) in enumerate(windows):
+            codes[index * 4 + direction] = base
+    return codes
+
+
+def _build_affected():
+    """落在某格的棋子会改变哪些窗口编码：(((编码下标, 权重), ...), (受影响的格子, ...))
+
+    即经过该格的四条线上、距离1~4以内的格子，最多32个。
+    """
+    slots = [[] for _ in range(CELL_COUNT)]
+    cells = [set() for _ in range(CELL_COUNT)]
+    for index, windows in enumerate(LINE_WINDOWS):
+        if windows is None:
+            continue
+        for direction, (_, positions) in enumerate(windows):
+            for other, weight in positions:
+                slots[other].append((index * 4 + direction, weight))
+                cells[other].add(index)
+    return [(tuple(slots[i]), tuple(sorted(cells[i]))) for i in range(CELL_COUNT)]
+
+
+INITIAL_CODES = _build_initial_codes()
+AFFECTED = _build_affected()
+
+
+class EvalBoard(BitBoard):
+    """带增量评估缓存的位棋盘
+
+    codes 保存每个格子四个方向的窗口编码（patterns.PATTERN_TABLE 的下标），
+    落子/回溯时只更新经过该点的四条线上的格子；
+    score_cache[player] 缓存 ai.evaluate_position 的结果，同样只作废这些格子。
+    """
+
+    def __init__(self, radius=DEFAULT_FRONTIER_RADIUS):
+        super().__init__(radius)
+        self.codes = INITIAL_CODES[:]
+        self.score_cache = [None, [None] * CELL_COUNT, [None] * CELL_COUNT]
+
+    def copy(self):
+        board = super().copy()
+        board.codes = self.codes[:]
+        board.score_cache = [None, self.score_cache[1][:], self.score_cache[2][:]]
+        return board
+
+    def _update(self, index, delta):
+        if kernels is not None:
+            slots, cells = AFFECTED[index]
+            kernels.update_codes(self.codes, slots, cells, delta, self.score_cache[1], self.score_cache[2])
+            return
+        self._update_python(index, delta)
+
+    def _update_python(self, index, delta):
+        codes = self.codes
+        slots, cells = AFFECTED[index]
+        for slot, weight in slots:
+            codes[slot] += delta * weight
+        cache_black = self.score_cache[1]
+        cache_white = self.score_cache[2]
+        for cell in cells:
+            cache_black[cell] = None
+            cache_white[cell] = None
+
+    def place(self, x, y, player):
+        super().place(x, y, player)
+        self._update(y * STRIDE + x, player)
+
+    def remove(self, x, y):
+        index = y * STRIDE + x
+        player = self.cells[index]
+        super().remove(x, y)
+        self._update(index, -player)
@@ -1,3 +1,6 @@
+import opening_book
+from symmetry import canonical_key, transform, inverse_transform, board_stones
+
 OPENING_BOOK = {
     "0" * 225: (7, 7),
     "0" * 112 + "1" + "0" * 112: (7, 6),
@@ -8,57 +11,42 @@ OPENING_BOOK = {
 def board_to_string(board):
     return ''.join(str(cell) for row in board for cell in row)
 
-def get_symmetric_boards(board_str):
-    size = 15
-    symmetries = [board_str]
-    # 旋转90度
-    rotated90 = []
-    for x in range(size):
-        for y in range(size-1, -1, -1):
-            rotated90.append(board_str[y * size + x])
-    symmetries.append(''.join(rotated90))
-    # 旋转180度
-    symmetries.append(board_str[::-1])
-    # 旋转270度
-    rotated270 = []
-    for x in range(size-1, -1, -1):
-        for y in range(size):
-            rotated270.append(board_str[y * size + x])
-    symmetries.append(''.join(rotated270))
-    # 水平翻转
-    flipped_h = []
-    for y in range(size):
-        flipped_h.append(board_str[y*size : (y+1)*size][::-1])
-    symmetries.append(''.join(flipped_h))
-    return symmetries
 
-def transform_move_for_symmetry(move, original_board_str, current_board_str):
-    size = 15
-    x, y = move
-    current_symmetries = get_symmetric_boards(current_board_str)
-    if original_board_str not in current_symmetries:
-        return (x, y)
-    idx = current_symmetries.index(original_board_str)
-    if idx == 1:
-        return (y, size - 1 - x)
-    elif idx == 2:
-        return (size - 1 - x, size - 1 - y)
-    elif idx == 3:
-        return (size - 1 - y, x)
-    elif idx == 4:
-        return (size - 1 - x, y)
-    return (x, y)
+def _build_builtin_book():
+    """内置开局表按8种对称归一：规范哈希 → 规范方向下的落子"""
+    book = {}
+    for board_str, (x, y) in OPENING_BOOK.items():
+        stones = [(i % 15, i // 15, int(cell)) for i, cell in enumerate(board_str) if cell != "0"]
+        key, symmetry = canonical_key(stones)
+        book[key] = transform(x, y, symmetry)
+    return book
+
+
+_BUILTIN_BOOK = _build_builtin_book()
+# 内置开局表只覆盖开局的前几步
+BUILTIN_BOOK_STONES = 4
+
 
 def get_opening_move(board, player):
-    board_str = board_to_string(board)
-    current_symmetries = get_symmetric_boards(board_str)
-    for original_str, move in OPENING_BOOK.items():
-        if original_str in current_symmetries:
-            transformed_move = transform_move_for_symmetry(move, original_str, board_str)
-            tx, ty = transformed_move
-            if 0 <= tx < 15 and 0 <= ty < 15 and board[ty][tx] == 0:
-                return transformed_move
+    """先查开局库文件（opening_book.db），没有时再查内置开局表；都没有返回None"""
+    book = opening_book.default_book()
+    if book is not None:
+        move = book.lookup(board)
+        if move is not None:
+            return move
+
+    key, symmetry = canonical_key(board_stones(board))
+    if key in _BUILTIN_BOOK:
+        tx, ty = inverse_transform(*_BUILTIN_BOOK[key], symmetry)
+        if 0 <= tx < 15 and 0 <= ty < 15 and board[ty][tx] == 0:
+            return (tx, ty)
     return None
 
+
 def is_very_early_game(board):
-    return sum(sum(1 for cell in row if cell != 0) for row in board) < 4
\ No newline at end of file
+    """是否还在开局库覆盖的范围内（开局库有多深就查多深）"""
+    stones = sum(sum(1 for cell in row if cell != 0) for row in board)
+    if stones < BUILTIN_BOOK_STONES:
+        return True
+    book = opening_book.default_book()
+    return book is not None and stones <= book.max_stones
@@ -3,6 +3,7 @@ import math
 
 
 def check_win(board, player):
+    """全盘扫描判断胜负（较慢，仅作为 check_win_at 的校验）"""
     directions = [
         [(0, 1), (0, -1)],  # 垂直
         [(1, 0), (-1, 0)],  # 水平
@@ -36,6 +37,29 @@ def check_win(board, player):
     return False
 
 
+def check_win_at(board, x, y, player):
+    """只检查经过(x,y)的四条线，判断刚落在(x,y)的棋子是否形成五连"""
+    height = len(board)
+    width = len(board[0])
+    if board[y][x] != player:
+        return False
+
+    for dx, dy in ((1, 0), (0, 1), (1, 1), (1, -1)):
+        count = 1
+
+        # 沿正反两个方向延伸
+        for sx, sy in ((dx, dy), (-dx, -dy)):
+            nx, ny = x + sx, y + sy
+            while 0 <= nx < width and 0 <= ny < height and board[ny][nx] == player:
+                count += 1
+                nx += sx
+                ny += sy
+
+        if count >= 5:
+            return True
+    return False
+
+
 def is_board_full(board):
     for row in board:
         for cell in row:
@@ -0,0 +1,427 @@
+"""棋谱存取：追加写入的二进制棋谱，以及常见文本棋谱格式的批量导入导出
+
+二进制格式（.wzq）每步一个字节，边下边追加并立即flush，程序崩溃也不会丢失已下的棋步：
+    文件头  b"WZQ\\x01" + 棋盘大小（1字节）
+    0xFF    新的一盘开始
+    0~224   落子 y*BOARD_SIZE+x（黑先交替）
+    0xFE    悔棋，撤回上一步
+    0xF0~F2 本盘结束：和棋 / 黑胜 / 白胜（未结束的棋局没有这一字节）
+
+文本格式：
+    xy      每行一盘 "x,y x,y ... [结果]"，坐标从0开始（opening_book 原有的格式）
+    renju   每行一盘 "h8 i9 j10 ... [结果]"，列a~o、行从下往上1~15（RenjuNet的记法，同 arena）
+    pgn     arena 输出的类PGN格式
+    psq     Piskvork 的 .psq 格式，可多盘连写；没有结果字段，按最后一步是否成五推断
+结果写作 1-0（黑胜）、0-1（白胜）、1/2（和棋）。
+
+所有读取函数都是生成器，逐盘返回 (moves, result)：moves 为 [(x, y)]，
+result 为 1（黑胜）、2（白胜）、0（和棋）或None（未知/未结束）；不会一次读入整个文件。
+
+    python game_record.py info game_records.wzq
+    python game_record.py convert games.psq games.wzq
+    python game_record.py corpus games.wzq -o imported_positions.txt --plies 10,20
+"""
+import argparse
+import os
+import re
+import sys
+
+from constants import BOARD_SIZE
+
+DEFAULT_RECORD_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "game_records.wzq")
+
+MAGIC = b"WZQ\x01"
+GAME_START = 0xFF
+UNDO = 0xFE
+GAME_END = 0xF0  # + 结果
+READ_CHUNK = 1 << 20
+
+FORMATS = ("binary", "xy", "renju", "pgn", "psq")
+_EXTENSIONS = {".wzq": "binary", ".pgn": "pgn", ".psq": "psq"}
+
+RESULT_TEXT = {1: "1-0", 2: "0-1", 0: "1/2"}
+_TEXT_RESULT = {"1-0": 1, "0-1": 2, "1/2": 0, "1/2-1/2": 0}
+
+_RENJU_MOVE = re.compile(r"[a-o]\d{1,2}")
+_PSQ_MOVE = re.compile(r"^(\d+),(\d+),(-?\d+)$")
+_PGN_RESULT = re.compile(r'^\[Result "(.*)"\]$')
+
+
+def move_to_text(move):
+    """(x, y) → 'h8'：列用字母a~o，行从下往上为1~15"""
+    x, y = move
+    return f"{chr(ord('a') + x)}{BOARD_SIZE - y}"
+
+
+def text_to_move(text):
+    return ord(text[0]) - ord('a'), BOARD_SIZE - int(text[1:])
+
+
+# 批量导入时查表代替逐个解析
+_TEXT_MOVES = {move_to_text((x, y)): (x, y) for y in range(BOARD_SIZE) for x in range(BOARD_SIZE)}
+
+
+def infer_result(moves):
+    """按最后一步是否成五推断结果；没有成五时棋盘已满为和棋，否则返回None"""
+    from game_logic import check_win_at
+
+    if not moves:
+        return None
+    board = [[0] * BOARD_SIZE for _ in range(BOARD_SIZE)]
+    for ply, (x, y) in enumerate(moves):
+        board[y][x] = 1 if ply % 2 == 0 else 2
+    x, y = moves[-1]
+    if check_win_at(board, x, y, board[y][x]):
+        return board[y][x]
+    return 0 if len(moves) == BOARD_SIZE * BOARD_SIZE else None
+
+
+# ---------- 二进制格式 ----------
+
+class GameRecorder:
+    """把正在进行的对局追加写入二进制棋谱文件
+
+    recorder.new_game()           # 新开一局
+    recorder.sync(move_history)   # 落子、悔棋后调用，只写入与上次的差异
+    recorder.end(winner)          # 棋局结束（重复调用无效）
+    每次写入后立即flush；fsync=True 时还会等数据落盘（断电也不丢，但每步多一次磁盘同步）。
+    """
+
+    def __init__(self, path=DEFAULT_RECORD_PATH, fsync=False):
+        self.path = path
+        self.fsync = fsync
+        self._file = open(path, "ab")
+        if self._file.tell() == 0:
+            self._write(MAGIC + bytes([BOARD_SIZE]))
+        else:
+            with open(path, "rb") as f:
+                header = f.read(len(MAGIC) + 1)
+            if header != MAGIC + bytes([BOARD_SIZE]):
+                self._file.close()
+                raise ValueError(f"{path} 不是 {BOARD_SIZE}路棋盘的棋谱文件")
+        self.moves = []
+        self.ended = True  # 还没有开始任何一盘
+
+    def close(self):
+        self._file.close()
+
+    def _write(self, data):
+        self._file.write(data)
+        self._file.flush()
+        if self.fsync:
+            os.fsync(self._file.fileno())
+
+    def new_game(self):
+        self._write(bytes([GAME_START]))
+        self.moves = []
+        self.ended = False
+
+    def sync(self, moves):
+        """让文件中的当前对局与 moves 一致：分叉之后的棋步记为悔棋，再写入新的棋步"""
+        if moves == self.moves:
+            return
+        if self.ended:
+            self.new_game()
+        common = 0
+        limit = min(len(moves), len(self.moves))
+        while common < limit and moves[common] == self.moves[common]:
+            common += 1
+        data = bytes([UNDO]) * (len(self.moves) - common)
+        data += bytes(y * BOARD_SIZE + x for x, y in moves[common:])
+        self._write(data)
+        self.moves = [tuple(move) for move in moves]
+
+    def end(self, result):
+        """result：1 黑胜、2 白胜、0 和棋"""
+        if not self.ended:
+            self._write(bytes([GAME_END + result]))
+            self.ended = True
+
+
+def _decode_game(data, size):
+    result = None
+    if data and GAME_END <= data[-1] <= GAME_END + 2:
+        result = data[-1] - GAME_END
+        data = data[:-1]
+    if UNDO in data:
+        moves = []
+        for code in data:
+            if code == UNDO:
+                if moves:
+                    moves.pop()
+            else:
+                moves.append((code % size, code // size))
+    else:
+        moves = [(code % size, code // size) for code in data]
+    if not moves and result is None:
+        return None  # 开局后一步未下
+    return moves, result
+
+
+def read_binary(f):
+    """逐盘读取二进制棋谱（f 为以 'rb' 打开的文件），按块读取，内存占用与文件大小无关"""
+    header = f.read(len(MAGIC) + 1)
+    if header[:len(MAGIC)] != MAGIC or len(header) <= len(MAGIC):
+        raise ValueError("不是二进制棋谱文件")
+    size = header[len(MAGIC)]
+    pending = b""
+    while True:
+        chunk = f.read(READ_CHUNK)
+        if not chunk:
+            break
+        parts = (pending + chunk).split(bytes([GAME_START]))
+        pending = parts.pop()  # 最后一盘可能还没读完
+        for part in parts:
+            game = _decode_game(part, size)
+            if game is not None:
+                yield game
+    game = _decode_game(pending, size)
+    if game is not None:
+        yield game
+
+
+def write_binary(f, games):
+    f.write(MAGIC + bytes([BOARD_SIZE]))
+    count = 0
+    for moves, result in games:
+        data = bytes([GAME_START]) + bytes(y * BOARD_SIZE + x for x, y in moves)
+        if result is not None:
+            data += bytes([GAME_END + result])
+        f.write(data)
+        count += 1
+    return count
+
+
+# ---------- 文本格式 ----------
+
+def _split_result(tokens):
+    if tokens and tokens[-1] in _TEXT_RESULT:
+        return tokens[:-1], _TEXT_RESULT[tokens[-1]]
+    return tokens, None
+
+
+def parse_xy_line(line):
+    """解析 xy 格式的一行，返回 (moves, result)；空行和注释返回None"""
+    line = line.strip()
+    if not line or line.startswith("#"):
+        return None
+    tokens, result = _split_result(line.split())
+    moves = []
+    for token in tokens:
+        x, y = token.split(",")
+        moves.append((int(x), int(y)))
+    return moves, result
+
+
+def parse_renju_line(line):
+    """解析 renju 格式的一行（棋步之间的空格可省略，如 h8i9j10）"""
+    line = line.strip()
+    if not line or line.startswith("#"):
+        return None
+    tokens, result = _split_result(line.split())
+    try:
+        moves = [_TEXT_MOVES[token] for token in tokens]
+    except KeyError:
+        moves = [_TEXT_MOVES[token] for token in _RENJU_MOVE.findall("".join(tokens))]
+    return moves, result
+
+
+def _read_lines(lines, parse):
+    for line in lines:
+        game = parse(line)
+        if game is not None:
+            yield game
+
+
+def _read_pgn(lines):
+    moves = None
+    result = None
+    for line in lines:
+        line = line.strip()
+        if line.startswith("[Event"):
+            if moves:
+                yield moves, result
+            moves, result = [], None
+            continue
+        if line.startswith("["):
+            match = _PGN_RESULT.match(line)
+            if match:
+                result = _TEXT_RESULT.get(match.group(1))
+            continue
+        if moves is not None:
+            moves.extend(_TEXT_MOVES[token] for token in _RENJU_MOVE.findall(line))
+    if moves:
+        yield moves, result
+
+
+def _read_psq(lines):
+    moves = None
+    for line in lines:
+        line = line.strip()
+        if line.startswith("Piskvorky"):
+            if moves:
+                yield moves, infer_result(moves)
+            moves = []
+            continue
+        match = _PSQ_MOVE.match(line)
+        if match and moves is not None:
+            moves.append((int(match.group(1)) - 1, int(match.group(2)) - 1))
+        elif moves:
+            yield moves, infer_result(moves)  # 棋步之后是引擎名等附加信息
+            moves = None
+    if moves:
+        yield moves, infer_result(moves)
+
+
+def read_text(lines, fmt):
+    """逐盘读取文本棋谱，lines 为逐行迭代的文件对象等"""
+    if fmt == "xy":
+        return _read_lines(lines, parse_xy_line)
+    if fmt == "renju":
+        return _read_lines(lines, parse_renju_line)
+    if fmt == "pgn":
+        return _read_pgn(lines)
+    if fmt == "psq":
+        return _read_psq(lines)
+    raise ValueError(f"未知的棋谱格式：{fmt}")
+
+
+def write_text(f, games, fmt):
+    count = 0
+    for moves, result in games:
+        count += 1
+        if fmt == "xy":
+            tokens = [f"{x},{y}" for x, y in moves]
+        elif fmt == "renju":
+            tokens = [move_to_text(move) for move in moves]
+        elif fmt == "pgn":
+            f.write(f'[Event "wuziqi"]\n[Game "{count}"]\n'
+                    f'[Result "{RESULT_TEXT[result] if result is not None else "*"}"]\n\n')
+            text = [f"{i // 2 + 1}. " + " ".join(move_to_text(m) for m in moves[i:i + 2])
+                    for i in range(0, len(moves), 2)]
+            for i in range(0, len(text), 10):
+                f.write(" ".join(text[i:i + 10]) + "\n")
+            f.write("\n")
+            continue
+        elif fmt == "psq":
+            f.write(f"Piskvorky {BOARD_SIZE}x{BOARD_SIZE}, 11:11, 0\n")
+            for x, y in moves:
+                f.write(f"{x + 1},{y + 1},0\n")
+            f.write("-1\n")
+            continue
+        else:
+            raise ValueError(f"未知的棋谱格式：{fmt}")
+        if result is not None:
+            tokens.append(RESULT_TEXT[result])
+        f.write(" ".join(tokens) + "\n")
+    return count
+
+
+# ---------- 按文件读写 ----------
+
+def detect_format(path):
+    """按扩展名判断格式，无法判断时看文件开头"""
+    fmt = _EXTENSIONS.get(os.path.splitext(path)[1].lower())
+    if fmt is not None:
+        return fmt
+    with open(path, "rb") as f:
+        if f.read(len(MAGIC)) == MAGIC:
+            return "binary"
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            if line.startswith("Piskvorky"):
+                return "psq"
+            if line.startswith("["):
+                return "pgn"
+            return "xy" if "," in line else "renju"
+    return "xy"
+
+
+def read_games(path, fmt=None):
+    """逐盘读取棋谱文件，返回 (moves, result) 的生成器；fmt 为None时自动判断格式"""
+    fmt = fmt or detect_format(path)
+    if fmt == "binary":
+        with open(path, "rb") as f:
+            yield from read_binary(f)
+    else:
+        with open(path, encoding="utf-8") as f:
+            yield from read_text(f, fmt)
+
+
+def write_games(path, games, fmt=None):
+    """把 (moves, result) 序列写入文件（覆盖），边读边写，返回盘数"""
+    fmt = fmt or _EXTENSIONS.get(os.path.splitext(path)[1].lower(), "xy")
+    if fmt == "binary":
+        with open(path, "wb") as f:
+            return write_binary(f, games)
+    with open(path, "w", encoding="utf-8") as f:
+        return write_text(f, games, fmt)
+
+
+def corpus_positions(games, plies, prefix="game"):
+    """从棋谱中截取第 plies 手之前的局面，生成 benchmark 局面库条目的文字"""
+    from benchmark import format_position
+
+    for number, (moves, _) in enumerate(games, 1):
+        for ply in plies:
+            if ply >= len(moves):
+                break
+            black = moves[0:ply:2]
+            white = moves[1:ply:2]
+            yield format_position(f"{prefix}-{number}-{ply}", black, white, category="imported",
+                                  note=f"棋谱第{number}盘第{ply + 1}手之前")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="五子棋棋谱格式转换")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    info_parser = sub.add_parser("info", help="统计棋谱的盘数和胜负")
+    info_parser.add_argument("path", nargs="?", default=DEFAULT_RECORD_PATH)
+    info_parser.add_argument("--format", choices=FORMATS, default=None)
+
+    convert_parser = sub.add_parser("convert", help="转换棋谱格式")
+    convert_parser.add_argument("source")
+    convert_parser.add_argument("target")
+    convert_parser.add_argument("--from", dest="source_format", choices=FORMATS, default=None)
+    convert_parser.add_argument("--to", dest="target_format", choices=FORMATS, default=None)
+
+    corpus_parser = sub.add_parser("corpus", help="从棋谱截取局面，追加到基准测试局面库")
+    corpus_parser.add_argument("source")
+    corpus_parser.add_argument("-o", "--output", required=True, help="局面库文件（追加写入）")
+    corpus_parser.add_argument("--format", choices=FORMATS, default=None)
+    corpus_parser.add_argument("--plies", default="10,20", help="截取第几手之前的局面，逗号分隔")
+    corpus_parser.add_argument("--limit", type=int, default=None, help="最多读取的盘数")
+
+    args = parser.parse_args(argv)
+    if args.command == "info":
+        games = moves = 0
+        results = {1: 0, 2: 0, 0: 0, None: 0}
+        for game_moves, result in read_games(args.path, args.format):
+            games += 1
+            moves += len(game_moves)
+            results[result] += 1
+        print(f"{args.path}: {games} 盘 {moves} 步（黑胜 {results[1]}，白胜 {results[2]}，"
+              f"和 {results[0]}，未知/未结束 {results[None]}）")
+    elif args.command == "convert":
+        count = write_games(args.target, read_games(args.source, args.source_format), args.target_format)
+        print(f"{args.source} → {args.target}: {count} 盘")
+    else:
+        plies = [int(ply) for ply in args.plies.split(",")]
+        games = read_games(args.source, args.format)
+        if args.limit is not None:
+            games = (game for _, game in zip(range(args.limit), games))
+        count = 0
+        with open(args.output, "a", encoding="utf-8") as f:
+            for entry in corpus_positions(games, sorted(plies)):
+                f.write(entry)
+                count += 1
+        print(f"{args.output}: 追加 {count} 个局面")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -3,12 +3,55 @@ import sys
 import numpy as np
 from constants import *
 from draw_utils import *
-from game_logic import check_win, is_board_full
-from ai import ai_move
+from game_logic import check_win, check_win_at, is_board_full
+from ai import DIFFICULTY_SETTINGS
+from ai_worker import AIWorker
 from progress_bar import ProgressBar
+from game_record import GameRecorder
 import time
 
+
+def ai_time_limit_ms(difficulty, player_time_limit):
+    """AI的思考时间不超过难度预算，也不超过玩家的每步限时"""
+    limit = DIFFICULTY_SETTINGS[difficulty][1]
+    if player_time_limit > 0:
+        limit = min(limit, player_time_limit * 1000)
+    return limit
+
+
+def wait_events(timeout_ms):
+    """阻塞等待事件，最多 timeout_ms 毫秒（None 表示一直等到有事件），返回本轮要处理的全部事件"""
+    event = pygame.event.wait() if timeout_ms is None else pygame.event.wait(timeout_ms)
+    events = [] if event.type == pygame.NOEVENT else [event]
+    events.extend(pygame.event.get())
+    return events
+
+
+def menu_buttons(game_state, SCREEN_WIDTH, SCREEN_HEIGHT):
+    """菜单界面的按钮矩形（用于判断鼠标悬停是否变化）"""
+    if game_state == "home":
+        return [rect for _, rect in home_screen_buttons(SCREEN_WIDTH, SCREEN_HEIGHT)]
+    if game_state == "instructions":
+        return [instructions_ok_rect(SCREEN_WIDTH, SCREEN_HEIGHT)]
+    if game_state == "difficulty_setting":
+        return difficulty_buttons(SCREEN_WIDTH, SCREEN_HEIGHT)
+    if game_state == "time_setting":
+        return time_setting_buttons(SCREEN_WIDTH, SCREEN_HEIGHT)
+    return []
+
+
 def main():
+    # AI在独立进程中搜索，避免阻塞界面（在初始化pygame之前启动子进程）
+    ai_worker = AIWorker(search_workers=AI_SEARCH_WORKERS)
+
+    # 对局棋谱边下边写入文件，重玩或退出后仍然保留
+    recorder = None
+    if RECORD_GAMES:
+        try:
+            recorder = GameRecorder()
+        except (OSError, ValueError):
+            recorder = None
+
     pygame.init()
     screen_info = pygame.display.Info()
     SCREEN_WIDTH = min(screen_info.current_w, 1920)
@@ -36,8 +79,9 @@ def main():
     player_timer_start = 0
     player_time_limit = 30
     ai_difficulty = 0  # 默认难度为困难
+    ai_thinking = False  # AI是否正在后台思考
 
-    debug_enabled = False
+    debug_enabled = False  # F3 切换：控制台输出状态，界面显示AI搜索统计
     last_debug_output = 0
 
     bar_width = 300
@@ -67,56 +111,69 @@ def main():
 
     # 主游戏循环
     clock = pygame.time.Clock()
+    board_view = BoardView()  # 对局画面的增量绘制
 
     # 用于窗口大小调整的变量
     current_size = (SCREEN_WIDTH, SCREEN_HEIGHT)
 
-    while True:
-        # 处理窗口大小调整
-        if current_size != screen.get_size():
-            SCREEN_WIDTH, SCREEN_HEIGHT = screen.get_size()
-            current_size = (SCREEN_WIDTH, SCREEN_HEIGHT)
-
-            # 重新计算尺寸 - 棋盘居中
-            GRID_SIZE = min(SCREEN_HEIGHT * 0.8 // BOARD_SIZE, SCREEN_WIDTH * 0.8 // BOARD_SIZE)
-            BOARD_PADDING = (SCREEN_WIDTH - (BOARD_SIZE - 1) * GRID_SIZE) // 2
-            BOARD_TOP = (SCREEN_HEIGHT - (BOARD_SIZE - 1) * GRID_SIZE) // 2
-            STONE_RADIUS = GRID_SIZE * 0.4
+    needs_redraw = True  # 菜单界面是否需要重画（对局画面由 BoardView 自己判断变化）
+    hovered_button = None  # 菜单界面鼠标悬停的按钮序号
 
-            # 更新进度条位置
-            bar_width = 300
-            bar_height = 20
-            bar_x = (SCREEN_WIDTH - bar_width) // 2
-            bar_y = SCREEN_HEIGHT - 50
-            player_progress_bar.x = bar_x
-            player_progress_bar.y = bar_y
-            player_progress_bar.width = bar_width
-            player_progress_bar.height = bar_height
+    while True:
+        if EVENT_DRIVEN_RENDER:
+            # 没有需要定时处理的事情时一直阻塞，直到有输入
+            timeout = None
+            if ai_thinking:
+                timeout = AI_POLL_INTERVAL_MS  # 查看AI结果、刷新“思考中”动画
+            elif player_progress_bar.active:
+                # 进度条每秒走一格，等到下一秒
+                timeout = max(1, 1000 - (pygame.time.get_ticks() - player_progress_bar.last_update))
+            if debug_enabled:
+                timeout = min(timeout or 1000, 1000)  # 每秒输出调试信息
+            events = wait_events(timeout)
+        else:
+            clock.tick(60)
+            events = pygame.event.get()
+            needs_redraw = True
 
         mouse_pos = pygame.mouse.get_pos()
 
         # 处理事件
-        for event in pygame.event.get():
+        for event in events:
+            if event.type == pygame.MOUSEMOTION:
+                # 鼠标移动只在悬停的按钮变化时重画菜单
+                hovered = None
+                for i, rect in enumerate(menu_buttons(game_state, SCREEN_WIDTH, SCREEN_HEIGHT)):
+                    if rect.collidepoint(event.pos):
+                        hovered = i
+                if hovered != hovered_button:
+                    hovered_button = hovered
+                    needs_redraw = True
+                continue
+            needs_redraw = True
+            if event.type in (pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED):
+                board_view.invalidate()  # 窗口被遮挡后重新显示，整屏重画
+
             if event.type == pygame.QUIT:
+                ai_worker.close()
                 pygame.quit()
                 sys.exit()
 
             if event.type == pygame.KEYDOWN:
                 if event.key == pygame.K_ESCAPE:
+                    ai_worker.close()
                     pygame.quit()
                     sys.exit()
+                elif event.key == pygame.K_F3:
+                    debug_enabled = not debug_enabled
 
             if event.type == pygame.VIDEORESIZE:
-                # 更新窗口尺寸
-                SCREEN_WIDTH, SCREEN_HEIGHT = event.w, event.h
-                screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT), pygame.RESIZABLE)
-                current_size = (SCREEN_WIDTH, SCREEN_HEIGHT)
+                # 更新窗口尺寸（各项尺寸在下面统一重新计算）
+                screen = pygame.display.set_mode((event.w, event.h), pygame.RESIZABLE)
 
             if event.type == pygame.MOUSEBUTTONDOWN:
                 if game_state == "home":
-                    home_buttons = draw_home_screen(screen, SCREEN_WIDTH, SCREEN_HEIGHT, STONE_RADIUS,
-                                                    title_font, font, small_font)
-                    for btn_type, rect in home_buttons:
+                    for btn_type, rect in home_screen_buttons(SCREEN_WIDTH, SCREEN_HEIGHT):
                         if rect.collidepoint(mouse_pos):
                             if btn_type == "black":
                                 player_color = 1
@@ -128,15 +185,11 @@ def main():
                                 game_state = "instructions"
 
                 elif game_state == "instructions":
-                    # 绘制游玩须知对话框
-                    ok_btn_rect = draw_instructions_dialog(screen, SCREEN_WIDTH, SCREEN_HEIGHT, font, small_font)
-                    if ok_btn_rect.collidepoint(mouse_pos):
+                    if instructions_ok_rect(SCREEN_WIDTH, SCREEN_HEIGHT).collidepoint(mouse_pos):
                         game_state = "home"
 
                 elif game_state == "difficulty_setting":
-                    difficulty_buttons = draw_difficulty_screen(screen, SCREEN_WIDTH, SCREEN_HEIGHT,
-                                                                title_font, font, small_font)
-                    for i, rect in enumerate(difficulty_buttons):
+                    for i, rect in enumerate(difficulty_buttons(SCREEN_WIDTH, SCREEN_HEIGHT)):
                         if rect.collidepoint(mouse_pos):
                             if i == 0:
                                 ai_difficulty = 3  # 简单
@@ -148,9 +201,7 @@ def main():
                             game_state = "time_setting"
 
                 elif game_state == "time_setting":
-                    time_buttons = draw_time_setting_screen(screen, SCREEN_WIDTH, SCREEN_HEIGHT,
-                                                            title_font, font, small_font)
-                    for i, rect in enumerate(time_buttons):
+                    for i, rect in enumerate(time_setting_buttons(SCREEN_WIDTH, SCREEN_HEIGHT)):
                         if rect.collidepoint(mouse_pos):
                             if i == 0:
                                 player_time_limit = 30
@@ -165,6 +216,9 @@ def main():
                             player_progress_bar.total_time = player_time_limit
 
                             game_state = "playing"
+                            ai_worker.new_game()  # 清空上一局的AI搜索缓存
+                            if recorder is not None:
+                                recorder.new_game()
 
                             # 重置进度条
                             player_progress_bar.reset()
@@ -189,11 +243,11 @@ def main():
 
                 elif game_state == "playing":
                     # 检查控制按钮
-                    control_buttons = draw_control_panel(screen, SCREEN_WIDTH, SCREEN_HEIGHT, player_color,
-                                                         game_over, winner, font, small_font)
+                    control_buttons = control_panel_buttons(SCREEN_WIDTH, SCREEN_HEIGHT, game_over)
                     for i, (text, rect) in enumerate(control_buttons):
                         if rect.collidepoint(mouse_pos):
                             if text == "退出":
+                                ai_worker.close()
                                 pygame.quit()
                                 sys.exit()
                             elif text == "和棋":
@@ -201,11 +255,21 @@ def main():
                                 winner = 0
                                 game_state = "game_over"
                                 player_thinking = False
+                                ai_worker.cancel()
+                                ai_thinking = False
                             elif text == "悔棋":
-                                # 只有在至少有两步棋的情况下才能悔棋
-                                if len(move_history) >= 2:
+                                # 取消进行中的搜索或预想
+                                ai_worker.cancel()
+                                if ai_thinking:
+                                    # AI还在思考：只撤回玩家刚下的一步
+                                    ai_thinking = False
+                                    undo_steps = 1
+                                else:
                                     # 移除最后两步棋（玩家和AI各一步）
-                                    for _ in range(2):
+                                    undo_steps = 2
+                                # 只有在棋步足够的情况下才能悔棋
+                                if len(move_history) >= undo_steps:
+                                    for _ in range(undo_steps):
                                         if move_history:
                                             x, y = move_history.pop()
                                             board[y][x] = 0
@@ -229,6 +293,10 @@ def main():
                                 move_history = []
                                 player_thinking = False
                                 player_progress_bar.reset()
+                                ai_thinking = False
+                                ai_worker.new_game()
+                                if recorder is not None:
+                                    recorder.new_game()
 
                                 # 根据玩家颜色决定谁先手
                                 if player_color == 2:  # 玩家选择白棋，AI先下
@@ -272,48 +340,36 @@ def main():
                                     player_thinking = False
                                     player_progress_bar.reset()
 
-                                    # 检查胜利
-                                    if check_win(board, player_color):
+                                    # 检查胜利（只检查经过落子点的四条线）
+                                    player_won = check_win_at(board, x, y, player_color)
+                                    if debug_enabled:
+                                        # 调试模式下用全盘扫描校验
+                                        assert player_won == check_win(board, player_color)
+                                    if player_won:
                                         game_over = True
                                         winner = player_color
                                         game_state = "game_over"
+                                        ai_worker.cancel()  # 停止预想
                                     elif is_board_full(board):
                                         game_over = True
                                         winner = 0
                                         game_state = "game_over"
+                                        ai_worker.cancel()
                                     else:
-                                        # AI下棋
+                                        # AI下棋（玩家正好下在预想的应手上时直接沿用后台搜索）
                                         ai_player = 3 - player_color
-                                        move = ai_move(board, ai_player, ai_difficulty)
-                                        if move:
-                                            x, y = move
-                                            board[y][x] = ai_player
-                                            last_move = (x, y)
-                                            move_history.append((x, y))
-
-                                            # 检查胜利
-                                            if check_win(board, ai_player):
-                                                game_over = True
-                                                winner = ai_player
-                                                game_state = "game_over"
-                                            elif is_board_full(board):
-                                                game_over = True
-                                                winner = 0
-                                                game_state = "game_over"
-                                            else:
-                                                # 玩家回合开始
-                                                player_thinking = True
-                                                player_timer_start = pygame.time.get_ticks()
-                                                player_progress_bar.reset()
-                                                if player_time_limit > 0:
-                                                    player_progress_bar.start()
+                                        ai_worker.request_move(board, ai_player, ai_difficulty,
+                                                               time_limit_ms=ai_time_limit_ms(
+                                                                   ai_difficulty, player_time_limit),
+                                                               collect_stats=debug_enabled)
+                                        ai_thinking = True
 
                 elif game_state == "game_over":
-                    control_buttons = draw_control_panel(screen, SCREEN_WIDTH, SCREEN_HEIGHT, player_color,
-                                                         game_over, winner, font, small_font)
+                    control_buttons = control_panel_buttons(SCREEN_WIDTH, SCREEN_HEIGHT, game_over)
                     for text, rect in control_buttons:
                         if rect.collidepoint(mouse_pos):
                             if text == "退出":
+                                ai_worker.close()
                                 pygame.quit()
                                 sys.exit()
                             elif text == "重玩":
@@ -326,6 +382,65 @@ def main():
                                 player_progress_bar.reset()
                                 game_state = "home"
 
+        # 处理窗口大小调整
+        if current_size != screen.get_size():
+            SCREEN_WIDTH, SCREEN_HEIGHT = screen.get_size()
+            current_size = (SCREEN_WIDTH, SCREEN_HEIGHT)
+            needs_redraw = True
+
+            # 重新计算尺寸 - 棋盘居中
+            GRID_SIZE = min(SCREEN_HEIGHT * 0.8 // BOARD_SIZE, SCREEN_WIDTH * 0.8 // BOARD_SIZE)
+            BOARD_PADDING = (SCREEN_WIDTH - (BOARD_SIZE - 1) * GRID_SIZE) // 2
+            BOARD_TOP = (SCREEN_HEIGHT - (BOARD_SIZE - 1) * GRID_SIZE) // 2
+            STONE_RADIUS = GRID_SIZE * 0.4
+
+            # 更新进度条位置
+            bar_width = 300
+            bar_height = 20
+            bar_x = (SCREEN_WIDTH - bar_width) // 2
+            bar_y = SCREEN_HEIGHT - 50
+            player_progress_bar.x = bar_x
+            player_progress_bar.y = bar_y
+            player_progress_bar.width = bar_width
+            player_progress_bar.height = bar_height
+
+        # AI后台搜索完成后落子
+        if ai_thinking:
+            done, move = ai_worker.poll()
+            if done:
+                ai_thinking = False
+                ai_player = 3 - player_color
+                if move:
+                    x, y = move
+                    board[y][x] = ai_player
+                    last_move = (x, y)
+                    move_history.append((x, y))
+
+                    # 检查胜利
+                    ai_won = check_win_at(board, x, y, ai_player)
+                    if debug_enabled:
+                        assert ai_won == check_win(board, ai_player)
+                    if ai_won:
+                        game_over = True
+                        winner = ai_player
+                        game_state = "game_over"
+                    elif is_board_full(board):
+                        game_over = True
+                        winner = 0
+                        game_state = "game_over"
+                    else:
+                        # 玩家回合开始
+                        player_thinking = True
+                        player_timer_start = pygame.time.get_ticks()
+                        player_progress_bar.reset()
+                        if player_time_limit > 0:
+                            player_progress_bar.start()
+                        if AI_PONDER:
+                            # 玩家思考期间，AI按猜测的应手提前搜索下一步
+                            ai_worker.ponder(board, ai_player, ai_difficulty,
+                                             time_limit_ms=ai_time_limit_ms(ai_difficulty, player_time_limit),
+                                             collect_stats=debug_enabled)
+
         current_time = time.time()
         if debug_enabled and current_time - last_debug_output > 1.0:  # 每秒输出一次
             last_debug_output = current_time
@@ -350,13 +465,49 @@ def main():
                 winner = 3 - player_color
                 game_state = "game_over"
                 player_thinking = False
+                ai_worker.cancel()
+
+        # 棋谱只写入与上次的差异（落子、悔棋），棋局结束时写入结果
+        if recorder is not None and game_state in ("playing", "game_over"):
+            recorder.sync(move_history)
+            if game_over:
+                recorder.end(winner)
 
         # 绘制游戏
+        if game_state in ("playing", "game_over"):
+            # 对局画面只重画变化的区域
+            overlays = [control_panel_overlay(SCREEN_WIDTH, SCREEN_HEIGHT, player_color,
+                                              game_over, winner, font, small_font)]
+            if not game_over:
+                overlays.append(turn_indicator_overlay(SCREEN_WIDTH, len(move_history), font))
+            # AI思考中提示
+            if ai_thinking:
+                overlays.append(thinking_indicator_overlay(SCREEN_WIDTH, small_font))
+            # 调试模式：AI上一步的搜索统计
+            if debug_enabled:
+                stats = ai_worker.last_stats
+                overlays.append(search_stats_overlay(SCREEN_WIDTH, SCREEN_HEIGHT,
+                                                     stats.format_lines() if stats is not None else None,
+                                                     small_font))
+            # 进度条
+            if player_thinking and player_time_limit > 0 and player_progress_bar.active:
+                overlays.append(player_progress_bar.overlay())
+            dirty_rects = board_view.render(screen, board, last_move, BOARD_PADDING, BOARD_TOP,
+                                            GRID_SIZE, STONE_RADIUS, overlays)
+            if dirty_rects:
+                pygame.display.update(dirty_rects)
+            needs_redraw = False
+            continue
+
+        board_view.invalidate()  # 回到对局画面时整屏重画
+        if not needs_redraw:
+            continue  # 菜单界面没有变化，不重画
+        needs_redraw = False
         screen.fill(BACKGROUND)
 
         if game_state == "home":
-            home_buttons = draw_home_screen(screen, SCREEN_WIDTH, SCREEN_HEIGHT, STONE_RADIUS,
-                                            title_font, font, small_font)
+            draw_home_screen(screen, SCREEN_WIDTH, SCREEN_HEIGHT, STONE_RADIUS,
+                             title_font, font, small_font)
         elif game_state == "instructions":
             # 绘制主界面背景
             draw_home_screen(screen, SCREEN_WIDTH, SCREEN_HEIGHT, STONE_RADIUS,
@@ -364,32 +515,11 @@ def main():
             # 绘制游玩须知对话框
             draw_instructions_dialog(screen, SCREEN_WIDTH, SCREEN_HEIGHT, font, small_font)
         elif game_state == "difficulty_setting":
-            difficulty_buttons = draw_difficulty_screen(screen, SCREEN_WIDTH, SCREEN_HEIGHT,
-                                                        title_font, font, small_font)
+            draw_difficulty_screen(screen, SCREEN_WIDTH, SCREEN_HEIGHT, title_font, font, small_font)
         elif game_state == "time_setting":
-            time_buttons = draw_time_setting_screen(screen, SCREEN_WIDTH, SCREEN_HEIGHT,
-                                                    title_font, font, small_font)
-        else:
-            # 绘制棋盘和棋子
-            draw_board(screen, SCREEN_WIDTH, SCREEN_HEIGHT, BOARD_PADDING, BOARD_TOP, GRID_SIZE)
-            draw_stone(screen, board, last_move, BOARD_PADDING, BOARD_TOP, GRID_SIZE, STONE_RADIUS)
-
-            # 绘制左上角控制面板
-            control_buttons = draw_control_panel(screen, SCREEN_WIDTH, SCREEN_HEIGHT, player_color,
-                                                 game_over, winner, font, small_font)
-
-            # 显示当前回合
-            if not game_over:
-                turn_player = "黑棋" if len(move_history) % 2 == 0 else "白棋"
-                turn_text = font.render(f"当前回合: {turn_player}", True, WHITE)
-                screen.blit(turn_text, (SCREEN_WIDTH - turn_text.get_width() - 20, 120))
-
-            # 绘制进度条
-            if player_thinking and player_time_limit > 0:
-                player_progress_bar.draw(screen)
+            draw_time_setting_screen(screen, SCREEN_WIDTH, SCREEN_HEIGHT, title_font, font, small_font)
 
         pygame.display.flip()
-        clock.tick(60)
 
 
 if __name__ == "__main__":
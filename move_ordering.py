@@ -0,0 +1,49 @@
+from bitboard import STRIDE
+from constants import BOARD_SIZE
+
+KILLER_SLOTS = 2  # 每层保留的杀手走法数
+
+
+class MoveOrdering:
+    """走法排序的启发信息：杀手走法和历史表
+
+    杀手走法：同一层中最近引起beta剪枝的走法，兄弟节点里往往也能剪枝；
+    历史表：每个格子引起剪枝的累计分（按剩余深度的平方加权），
+    每次ai_move开始时减半，让旧局面的统计逐渐淡出。
+    随 SearchCache 在一盘棋内跨回合保留。
+    """
+
+    def __init__(self):
+        self.killers = {}  # 层数 → [走法, ...]（最近的在前）
+        self.history = [None] + [[0] * (STRIDE * BOARD_SIZE) for _ in range(2)]
+
+    def new_search(self):
+        """每次ai_move开始时调用：清空杀手走法，历史分减半"""
+        self.killers = {}
+        for player in (1, 2):
+            self.history[player] = [h >> 1 for h in self.history[player]]
+
+    def clear(self):
+        self.__init__()
+
+    def order(self, candidate_moves, player, ply, hash_move):
+        """原地排序：置换表走法 → 杀手走法 → 按历史分从高到低；同分保持原来的静态评分顺序"""
+        killers = self.killers.get(ply, ())
+        history = self.history[player]
+
+        def key(move):
+            point = (move[0], move[1])
+            if point == hash_move:
+                return 0, 0
+            if point in killers:
+                return 1, killers.index(point)
+            return 2, -history[move[1] * STRIDE + move[0]]
+
+        candidate_moves.sort(key=key)
+
+    def record_cutoff(self, player, ply, move, depth):
+        killers = self.killers.setdefault(ply, [])
+        if move not in killers:
+            killers.insert(0, move)
+            del killers[KILLER_SLOTS:]
+        self.history[player][move[1] * STRIDE + move[0]] += depth * depth
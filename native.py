@@ -0,0 +1,122 @@
+"""可选的C扩展（_kernels.c）：编译后各模块自动改用，没有编译时仍使用原来的纯Python实现
+
+    python build_kernels.py     # 编译（需要C编译器），在程序目录生成 _kernels 扩展模块
+    python native.py            # 在随机局面上逐项对比两种实现，并比较速度
+
+C实现的计算与纯Python逐位一致（包括浮点分数），只影响速度：
+    bitboard.BitBoard.window_points   成四点/成五点（威胁空间搜索和必胜/必防检查）
+    evaluator.EvalBoard._update       落子/回溯时更新窗口编码、作废评估缓存
+    ai._score_from_codes              查棋型表计算落子分数（候选点排序）
+设置环境变量 WUZIQI_PURE_PYTHON=1 可强制使用纯Python实现。
+"""
+import os
+import random
+import sys
+import time
+
+from constants import BOARD_SIZE
+
+kernels = None
+if not os.environ.get("WUZIQI_PURE_PYTHON"):
+    try:
+        import _kernels as kernels
+    except ImportError:
+        kernels = None
+    if kernels is not None and kernels.BOARD_SIZE != BOARD_SIZE:
+        kernels = None  # 按其他棋盘大小编译的扩展不能用
+
+BACKEND = "c" if kernels is not None else "python"
+
+
+def _random_board(rng, radius):
+    from evaluator import EvalBoard
+
+    board = EvalBoard(radius)
+    cells = [(x, y) for y in range(BOARD_SIZE) for x in range(BOARD_SIZE)]
+    for ply, (x, y) in enumerate(rng.sample(cells, rng.randint(0, 120))):
+        board.place(x, y, 1 if ply % 2 == 0 else 2)
+    return board
+
+
+def self_check(boards=300, seed=0, log=print):
+    """随机局面上对比C实现与纯Python实现，返回不一致的项数"""
+    import ai
+    from evaluator import AFFECTED
+    from bitboard import STRIDE
+
+    if kernels is None:
+        log("未找到可用的C扩展（python build_kernels.py 编译），当前使用纯Python实现")
+        return 0
+    rng = random.Random(seed)
+    mismatches = 0
+    for number in range(boards):
+        board = _random_board(rng, rng.choice((1, 2)))
+        for player in (1, 2):
+            for count in (3, 4):
+                if kernels.window_points(board.cells, player, count) != board._window_points_python(player, count):
+                    mismatches += 1
+                    log(f"局面{number}: window_points({player}, {count}) 不一致")
+            for index in range(STRIDE * BOARD_SIZE):
+                if index % STRIDE == BOARD_SIZE or board.cells[index] != 0:
+                    continue
+                native_score = kernels.score_from_codes(player, board.codes, index)
+                python_score = ai._score_from_codes_python(player, board.codes, index)
+                if type(native_score) is not type(python_score) or native_score != python_score:
+                    mismatches += 1
+                    log(f"局面{number}: score_from_codes({player}, {index}) {native_score!r} != {python_score!r}")
+
+        # 落一子再回溯：两种实现各更新一份副本，窗口编码和评估缓存都要相同
+        empties = [(x, y) for y in range(BOARD_SIZE) for x in range(BOARD_SIZE) if board.get(x, y) == 0]
+        if not empties:
+            continue
+        x, y = rng.choice(empties)
+        index = y * STRIDE + x
+        for delta in (rng.choice((1, 2)), -2):
+            native_board, python_board = board.copy(), board.copy()
+            slots, cells = AFFECTED[index]
+            kernels.update_codes(native_board.codes, slots, cells, delta,
+                                 native_board.score_cache[1], native_board.score_cache[2])
+            python_board._update_python(index, delta)
+            if (native_board.codes != python_board.codes or
+                    native_board.score_cache != python_board.score_cache):
+                mismatches += 1
+                log(f"局面{number}: _update({index}, {delta}) 不一致")
+    log(f"{boards} 个随机局面：{'全部一致' if mismatches == 0 else f'{mismatches} 项不一致'}")
+    return mismatches
+
+
+def compare_speed(boards=50, seed=1, log=print):
+    """同一批局面上两种实现的耗时"""
+    import ai
+
+    rng = random.Random(seed)
+    samples = [_random_board(rng, 1) for _ in range(boards)]
+    runs = {
+        "window_points": (lambda b: kernels.window_points(b.cells, 1, 3),
+                          lambda b: b._window_points_python(1, 3)),
+        "score_from_codes": (lambda b: [kernels.score_from_codes(1, b.codes, i) for i in range(200)],
+                             lambda b: [ai._score_from_codes_python(1, b.codes, i) for i in range(200)]),
+    }
+    for name, (native_run, python_run) in runs.items():
+        timings = []
+        for run in (native_run, python_run):
+            start = time.perf_counter()
+            for board in samples:
+                run(board)
+            timings.append(time.perf_counter() - start)
+        log(f"{name:<18} C {timings[0] * 1000:8.2f}ms  Python {timings[1] * 1000:8.2f}ms  "
+            f"({timings[1] / max(timings[0], 1e-9):.1f}x)")
+
+
+def main(argv=None):
+    print(f"当前实现：{BACKEND}")
+    if kernels is None:
+        print("未找到可用的C扩展，运行 python build_kernels.py 编译")
+        return 0
+    mismatches = self_check()
+    compare_speed()
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
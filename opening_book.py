@@ -0,0 +1,236 @@
+"""开局库：按8种对称归一的局面哈希保存在sqlite文件中
+
+查询：
+    book = opening_book.default_book()   # 没有开局库文件时为None
+    move = book.lookup(board)           # 不在库中返回None
+
+生成（自对弈，或从棋谱导入）：
+    python opening_book.py build --games 2000 --plies 12
+    python opening_book.py build --records games.txt --records games.wzq
+    python opening_book.py info
+
+棋谱文件可以是 game_record 支持的任意格式（按扩展名或内容自动判断），逐盘读取，不会整个读入内存；
+原有格式为每行一盘：x,y x,y ... [结果]，结果为 1-0（黑胜）、0-1（白胜）或 1/2（和棋），可省略。
+"""
+import argparse
+import multiprocessing as mp
+import os
+import random
+import sqlite3
+import sys
+
+from constants import BOARD_SIZE
+from game_record import read_games, parse_xy_line
+from symmetry import canonical_key, transform, inverse_transform, board_stones
+
+DEFAULT_BOOK_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "opening_book.db")
+# 查询时走法至少出现过这么多盘才采用，避免只下过一两盘的走法凭偶然的胜局排到前面
+DEFAULT_MIN_GAMES = 3
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS book (
+    key INTEGER NOT NULL,      -- symmetry.canonical_key 的规范哈希
+    move INTEGER NOT NULL,     -- 规范方向下的落子 y*BOARD_SIZE+x
+    games INTEGER NOT NULL,    -- 出现次数
+    score REAL NOT NULL,       -- 落子方的累计得分（胜1 和0.5 负0）
+    PRIMARY KEY (key, move)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS meta (
+    name TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+"""
+
+
+class OpeningBook:
+    """sqlite开局库；查询走主键索引，与库的大小基本无关"""
+
+    def __init__(self, path=DEFAULT_BOOK_PATH, readonly=True):
+        self.path = path
+        if readonly:
+            self._conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True, check_same_thread=False)
+        else:
+            self._conn = sqlite3.connect(path)
+            self._conn.executescript(_SCHEMA)
+        row = self._conn.execute("SELECT value FROM meta WHERE name = 'max_stones'").fetchone()
+        self.max_stones = row[0] if row else -1  # 库中局面的最多棋子数
+
+    def close(self):
+        self._conn.close()
+
+    def lookup(self, board, min_games=DEFAULT_MIN_GAMES):
+        """查询二维数组局面的开局库走法（已换算回原方向），不在库中返回None
+
+        出现过至少min_games盘的走法中取平均得分最高的。数据库被锁或损坏时也返回None（按未命中处理）。
+        """
+        stones = board_stones(board)
+        if len(stones) > self.max_stones:
+            return None
+        key, symmetry = canonical_key(stones)
+        try:
+            rows = self._conn.execute(
+                "SELECT move FROM book WHERE key = ? AND games >= ? "
+                "ORDER BY score / games DESC, games DESC, move", (key, min_games)).fetchall()
+        except sqlite3.Error:
+            return None
+        for (move,) in rows:
+            x, y = inverse_transform(move % BOARD_SIZE, move // BOARD_SIZE, symmetry)
+            if board[y][x] == 0:  # 哈希冲突时走法可能落在已有棋子上
+                return x, y
+        return None
+
+    def size(self):
+        return self._conn.execute("SELECT COUNT(*) FROM book").fetchone()[0]
+
+    def positions(self):
+        return self._conn.execute("SELECT COUNT(DISTINCT key) FROM book").fetchone()[0]
+
+    def add_game(self, moves, result=None, max_plies=None, skip_plies=0):
+        """把一盘棋的前max_plies步计入开局库
+
+        moves 为 [(x, y), ...]（黑先交替），result 为 1（黑胜）、2（白胜）、0（和棋）或None（未知，按和棋计）。
+        前skip_plies步（自对弈的随机开局）只摆上棋盘，不作为走法计入。
+        """
+        board = [[0] * BOARD_SIZE for _ in range(BOARD_SIZE)]
+        stones = []
+        rows = []
+        for ply, (x, y) in enumerate(moves[:max_plies]):
+            player = 1 if ply % 2 == 0 else 2
+            if ply >= skip_plies:
+                key, symmetry = canonical_key(stones)
+                cx, cy = transform(x, y, symmetry)
+                score = 0.5 if not result else (1.0 if result == player else 0.0)
+                rows.append((key, cy * BOARD_SIZE + cx, score))
+            board[y][x] = player
+            stones.append((x, y, player))
+
+        self._conn.executemany(
+            "INSERT INTO book (key, move, games, score) VALUES (?, ?, 1, ?) "
+            "ON CONFLICT (key, move) DO UPDATE SET games = games + 1, score = score + excluded.score",
+            rows)
+        last_stones = len(stones) - 1  # 最后一条走法之前盘面上的棋子数
+        if rows and last_stones > self.max_stones:
+            self.max_stones = last_stones
+            self._conn.execute("INSERT OR REPLACE INTO meta (name, value) VALUES ('max_stones', ?)",
+                               (self.max_stones,))
+
+    def commit(self):
+        self._conn.commit()
+
+
+_default_book = None
+_default_book_loaded = False
+
+
+def default_book():
+    """程序目录下的 opening_book.db（只读，首次调用时打开）；文件不存在时返回None"""
+    global _default_book, _default_book_loaded
+    if not _default_book_loaded:
+        _default_book_loaded = True
+        if os.path.exists(DEFAULT_BOOK_PATH):
+            try:
+                _default_book = OpeningBook(DEFAULT_BOOK_PATH)
+            except sqlite3.Error:
+                _default_book = None
+    return _default_book
+
+
+# 解析棋谱文件的一行（xy 格式），返回 (moves, result)；空行和注释返回None
+parse_record_line = parse_xy_line
+
+RECORD_COMMIT_INTERVAL = 10000  # 导入棋谱时每多少盘提交一次
+
+
+def _self_play_game(args):
+    """自对弈一盘：开头几步在中心附近随机落子，之后由AI对下；返回 (moves, result)"""
+    seed, random_plies, depth, time_limit_ms, max_moves = args
+    import ai
+    from game_logic import check_win_at, is_board_full
+
+    ai.USE_SOLVED_CACHE = False  # 不读写用户的已解局面缓存
+    rng = random.Random(seed)
+    board = [[0] * BOARD_SIZE for _ in range(BOARD_SIZE)]
+    center = BOARD_SIZE // 2
+    moves = []
+    cache = ai.SearchCache()
+    while len(moves) < max_moves:
+        player = 1 if len(moves) % 2 == 0 else 2
+        if len(moves) == 0:
+            x, y = center, center
+        elif len(moves) < random_plies:
+            while True:
+                x, y = center + rng.randint(-2, 2), center + rng.randint(-2, 2)
+                if board[y][x] == 0:
+                    break
+        else:
+            x, y = ai.ai_move([row[:] for row in board], player, depth, cache=cache,
+                              time_limit_ms=time_limit_ms)
+        board[y][x] = player
+        moves.append((x, y))
+        if check_win_at(board, x, y, player):
+            return moves, player
+        if is_board_full(board):
+            break
+    return moves, 0
+
+
+def build(path, records=(), games=0, plies=12, random_plies=3, depth=2, time_limit_ms=500,
+          max_moves=120, processes=None, seed=0, log=print):
+    """生成/扩充开局库：先导入棋谱文件，再并行自对弈games盘"""
+    book = OpeningBook(path, readonly=False)
+    for record_path in records:
+        count = 0
+        for moves, result in read_games(record_path):
+            book.add_game(moves, result, plies)
+            count += 1
+            if count % RECORD_COMMIT_INTERVAL == 0:
+                book.commit()
+                log(f"{record_path}: 已导入 {count} 盘")
+        book.commit()
+        log(f"{record_path}: 导入 {count} 盘")
+
+    if games:
+        tasks = [(seed + i, random_plies, depth, time_limit_ms, max_moves) for i in range(games)]
+        with mp.Pool(processes) as pool:
+            for i, (moves, result) in enumerate(pool.imap_unordered(_self_play_game, tasks), 1):
+                # 开头的随机落子不是选出来的走法，不计入
+                book.add_game(moves, result, plies, skip_plies=random_plies)
+                if i % 50 == 0 or i == games:
+                    book.commit()
+                    log(f"自对弈 {i}/{games} 盘，库中 {book.size()} 条")
+    book.commit()
+    log(f"开局库 {path}: {book.positions()} 个局面，{book.size()} 条走法，最多 {book.max_stones} 子")
+    book.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="五子棋开局库工具")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    build_parser = sub.add_parser("build", help="由棋谱和/或自对弈生成开局库")
+    build_parser.add_argument("-o", "--output", default=DEFAULT_BOOK_PATH, help="开局库文件")
+    build_parser.add_argument("--records", action="append", default=[], help="棋谱文件（可重复，格式见 game_record）")
+    build_parser.add_argument("--games", type=int, default=0, help="自对弈盘数")
+    build_parser.add_argument("--plies", type=int, default=12, help="每盘计入开局库的步数")
+    build_parser.add_argument("--random-plies", type=int, default=3, help="自对弈开头随机落子的步数")
+    build_parser.add_argument("--depth", type=int, default=2, help="自对弈的搜索深度")
+    build_parser.add_argument("--time-limit", type=int, default=500, help="自对弈每步时间/毫秒")
+    build_parser.add_argument("--processes", type=int, default=None, help="自对弈进程数（默认CPU核数）")
+    build_parser.add_argument("--seed", type=int, default=0)
+
+    info_parser = sub.add_parser("info", help="查看开局库规模")
+    info_parser.add_argument("path", nargs="?", default=DEFAULT_BOOK_PATH)
+
+    args = parser.parse_args(argv)
+    if args.command == "build":
+        build(args.output, args.records, args.games, args.plies, args.random_plies, args.depth,
+              args.time_limit, processes=args.processes, seed=args.seed)
+    else:
+        book = OpeningBook(args.path)
+        print(f"{args.path}: {book.positions()} 个局面，{book.size()} 条走法，最多 {book.max_stones} 子")
+        book.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
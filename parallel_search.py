@@ -0,0 +1,234 @@
+import argparse
+import multiprocessing as mp
+import os
+import sys
+
+import ai
+from patterns import SCORE_FIVE
+from transposition import EXACT
+
+# 根节点分割的并行搜索：根节点的第一个候选点在主进程中串行搜索得到alpha，
+# 其余候选点以 (alpha, +inf) 为窗口分给进程池并行搜索。
+# 窗口内的分数都是精确值、窗口外的只是上界，按原顺序取第一个最大值，
+# 与串行 minmax 的结果（同分时取靠前的走法）一致。
+# python parallel_search.py 在基准局面库上逐个对比串行与并行搜索，改动搜索后用它检查一致性。
+
+_worker_cache = None
+_worker_stop = None
+_worker_search_id = None
+_worker_game_id = None
+
+
+def _init_worker(stop_flag):
+    global _worker_cache, _worker_stop
+    _worker_cache = ai.SearchCache()
+    _worker_stop = stop_flag
+
+
+def _search_root_move(task):
+    """子进程：搜索根节点的一个候选点，返回 (走法, 分数, 节点数)，超时或被停止时分数为None"""
+    global _worker_search_id, _worker_game_id
+    game_id, search_id, board, player, move, depth, alpha, deadline, quiescence = task
+    if game_id != _worker_game_id:
+        _worker_game_id = game_id
+        _worker_cache.clear()
+    if search_id != _worker_search_id:
+        # 每次ai_move对应一次 new_search，之前的条目变为可替换的旧条目
+        _worker_search_id = search_id
+        _worker_cache.new_search()
+    ctx = ai.SearchContext(_worker_cache.tt, deadline, lambda: _worker_stop.value,
+                           ordering=_worker_cache.ordering, quiescence=quiescence)
+    ctx.root_depth = depth
+    x, y = move
+    board.place(x, y, player)
+    try:
+        score, _ = ai.minmax(board, 3 - player, depth - 1, -float('inf'), -alpha, move, ctx)
+    except ai.SearchTimeout:
+        return move, None, ctx.nodes
+    return move, -score, ctx.nodes
+
+
+class ParallelSearcher:
+    """持有进程池的并行搜索器，在一盘棋中反复使用（进程内的置换表跨回合保留）
+
+    用法：ai.ai_move(board, player, difficulty, parallel=ParallelSearcher(4))。
+    用完后调用 close()。
+    """
+
+    def __init__(self, workers=None):
+        self.workers = workers or os.cpu_count() or 1
+        self._stop = mp.Value('b', 0, lock=False)
+        self._pool = mp.Pool(self.workers, initializer=_init_worker, initargs=(self._stop,))
+        self._game_id = 0
+        self._search_id = 0
+
+    def new_search(self):
+        """每次ai_move开始时调用（子进程在收到下一个任务时更新置换表的代数）"""
+        self._search_id += 1
+
+    def new_game(self):
+        """新开一局：子进程在收到下一个任务时清空置换表"""
+        self._game_id += 1
+
+    def close(self):
+        self._pool.terminate()
+        self._pool.join()
+
+    def _collect(self, pending, ctx):
+        """等待所有子任务完成；主进程超时或被取消时通知子进程停止，仍要等它们返回"""
+        results = []
+        stopped = False
+        for async_result in pending:
+            while True:
+                if not stopped:
+                    try:
+                        ctx.check_time()
+                    except ai.SearchTimeout:
+                        stopped = True
+                        self._stop.value = 1
+                try:
+                    results.append(async_result.get(timeout=0.01))
+                    break
+                except mp.TimeoutError:
+                    continue
+        self._stop.value = 0
+        return results, stopped
+
+    def search_root(self, board, player, depth, ctx):
+        """与 ai.minmax 在根节点（last_move=None）时的行为相同，超时抛出 SearchTimeout
+
+        两者从相同的置换表状态开始时返回相同的 (分数, 走法)，见 self_check。
+        """
+        ctx.nodes += 1
+        ctx.check_time()
+        tt = ctx.tt
+        opponent = 3 - player
+
+        if board.has_five(player):
+            return SCORE_FIVE, None
+        if board.has_five(opponent):
+            return -SCORE_FIVE, None
+
+        hash_move = None
+        key = board.position_key(player)
+        if tt is not None:
+            entry = tt.lookup(key)
+            if entry is not None:
+                entry_depth, flag, entry_score, hash_move = entry
+                if entry_depth >= depth and flag == EXACT:
+                    return entry_score, hash_move
+
+        candidate_moves = ai.get_candidate_moves(board, player)
+        if hash_move is not None:
+            candidate_moves.sort(key=lambda m: (m[0], m[1]) != hash_move)
+        moves = [(x, y) for x, y, _ in candidate_moves if board.get(x, y) == 0]
+        if not moves:
+            return -float('inf'), None
+
+        # 第一个候选点在主进程串行搜索，得到后续搜索的alpha
+        first = moves[0]
+        board.place(first[0], first[1], player)
+        try:
+            score, _ = ai.minmax(board, opponent, depth - 1, -float('inf'), float('inf'), first, ctx)
+        finally:
+            board.remove(first[0], first[1])
+        best_score, best_move = -score, first
+
+        scores = []
+        rest = moves[1:]
+        if best_score >= SCORE_FIVE:
+            pass  # 已经必胜，后面的走法不可能更好
+        elif depth == 1:
+            # 子节点深度为0，开销很小，不值得分给子进程
+            for move in rest:
+                board.place(move[0], move[1], player)
+                try:
+                    score, _ = ai.minmax(board, opponent, 0, -float('inf'), -best_score, move, ctx)
+                finally:
+                    board.remove(move[0], move[1])
+                scores.append((move, -score))
+        elif rest:
+            tasks = [(self._game_id, self._search_id, board, player, move, depth, best_score, ctx.deadline,
+                      ctx.quiescence) for move in rest]
+            pending = [self._pool.apply_async(_search_root_move, (task,)) for task in tasks]
+            results, stopped = self._collect(pending, ctx)
+            for move, score, nodes in results:
+                ctx.nodes += nodes
+                scores.append((move, score))
+            if stopped or any(score is None for _, score in scores):
+                raise ai.SearchTimeout()
+
+        # 按原顺序取第一个最高分（与串行搜索的同分取舍一致）
+        for move, score in scores:
+            if score > best_score:
+                best_score, best_move = score, move
+
+        if tt is not None:
+            tt.store(key, depth, EXACT, best_score, best_move)
+        return best_score, best_move
+
+    def iterative_deepening(self, board, player, max_depth, ctx):
+        """与 ai.iterative_deepening 相同，每一层的根节点用 search_root 并行展开"""
+        best_score, best_move = None, None
+        search_board = board.copy()
+        for depth in range(1, max_depth + 1):
+            ctx.root_depth = depth
+            try:
+                score, move = self.search_root(search_board, player, depth, ctx)
+            except ai.SearchTimeout:
+                break
+            if move is not None:
+                best_score, best_move = score, move
+                ctx.completed_depth = depth
+            if abs(score) >= SCORE_FIVE:
+                break
+        return best_score, best_move
+
+
+def self_check(path=None, depth=4, workers=3, log=print):
+    """在局面库的每个局面上对比串行 ai.minmax 与 search_root 的 (分数, 走法)，返回不一致的局面数
+
+    两边都从空的置换表开始，深度固定、不限时。
+    """
+    import benchmark
+    from evaluator import EvalBoard
+
+    if path is None:
+        path = os.path.join(os.path.dirname(os.path.abspath(__file__)), benchmark.DEFAULT_CORPUS)
+    searcher = ParallelSearcher(workers)
+    mismatches = 0
+    try:
+        for position in benchmark.load_corpus(path):
+            board = EvalBoard.from_array(benchmark.position_board(position), ai.CANDIDATE_RADIUS)
+            player = position["to_move"]
+            cache = ai.SearchCache()
+            ctx = ai.SearchContext(cache.tt, ordering=cache.ordering)
+            ctx.root_depth = depth
+            serial = ai.minmax(board, player, depth, -float('inf'), float('inf'), ctx=ctx)
+
+            searcher.new_game()
+            searcher.new_search()
+            cache = ai.SearchCache()
+            ctx = ai.SearchContext(cache.tt, ordering=cache.ordering)
+            ctx.root_depth = depth
+            parallel = searcher.search_root(board, player, depth, ctx)
+            if parallel != serial:
+                mismatches += 1
+                log(f"{position['name']}: 串行 {serial} 并行 {parallel}")
+    finally:
+        searcher.close()
+    log(f"深度{depth}：{'全部一致' if mismatches == 0 else f'{mismatches} 个局面不一致'}")
+    return mismatches
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="对比串行与并行搜索的结果")
+    parser.add_argument("--corpus", default=None, help="局面库文件（默认 benchmark_positions.txt）")
+    parser.add_argument("--depth", type=int, default=4, help="搜索深度")
+    parser.add_argument("--workers", type=int, default=3, help="并行进程数")
+    args = parser.parse_args(argv)
+    return 1 if self_check(args.corpus, args.depth, args.workers) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
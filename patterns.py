@@ -0,0 +1,137 @@
+import math
+from constants import BOARD_SIZE
+from bitboard import STRIDE
+from native import kernels
+
+# 评分常量（定义棋型价值）
+SCORE_FIVE = 10000000
+SCORE_FOUR = 100000
+SCORE_BLOCKED_FOUR = 10000
+SCORE_THREE = 1000
+SCORE_BLOCKED_THREE = 100
+SCORE_TWO = 100
+SCORE_BLOCKED_TWO = 10
+
+# 四个方向（与 ai.evaluate_position 的顺序一致）
+DIRECTIONS = ((1, 0), (0, 1), (1, 1), (1, -1))
+
+# 窗口编码：以空位为中心的9格窗口去掉中心后剩8格，每格取值
+# 0=空、1=黑、2=白、3=棋盘外，按 -4..-1、+1..+4 的顺序组成4进制数
+BOUNDARY = 3
+WINDOW_OFFSETS = (-4, -3, -2, -1, 1, 2, 3, 4)
+WINDOW_WEIGHTS = tuple(4 ** k for k in range(8))
+PATTERN_COUNT = 4 ** 8
+
+
+def line_score(count, total_block):
+    """按连子数和两端阻挡数给分"""
+    if count >= 4:
+        return SCORE_FIVE
+    if count == 3 and total_block == 0:
+        return SCORE_FOUR
+    if count == 3 and total_block == 1:
+        return SCORE_BLOCKED_FOUR
+    if count == 2 and total_block == 0:
+        return SCORE_THREE
+    if count == 2 and total_block == 1:
+        return SCORE_BLOCKED_THREE
+    if count == 1 and total_block == 0:
+        return SCORE_TWO
+    if count == 1 and total_block == 1:
+        return SCORE_BLOCKED_TWO
+    return 0
+
+
+def _half_line(cells, player):
+    """从中心向外数连续的player棋子，返回 (连子数, 是否被挡)"""
+    count = 0
+    for cell in cells:
+        if cell == player:
+            count += 1
+        else:
+            # 边界或对方棋子视为阻挡
+            return count, 1 if cell != 0 else 0
+    return count, 0
+
+
+def _build_pattern_tables():
+    """生成查表：PATTERN_TABLE[player][窗口编码] = (己方分, 对方分, 对方在此是否成活二)"""
+    # 半边窗口（4格，由近到远）的4进制编码 → 格子列表
+    halves = []
+    for code in range(4 ** 4):
+        halves.append([(code >> (2 * k)) & 3 for k in range(4)])
+
+    tables = [None, None, None]
+    for player in (1, 2):
+        opponent = 3 - player
+        half_player = [_half_line(cells, player) for cells in halves]
+        half_opponent = [_half_line(cells, opponent) for cells in halves]
+        shared = {}  # 相同的条目共用一个元组，节省内存
+        table = [None] * PATTERN_COUNT
+        for left in range(4 ** 4):
+            # 编码里左半边按 -4..-1 排列，需要倒过来才是由近到远
+            near_left = sum(halves[left][3 - k] << (2 * k) for k in range(4))
+            lp_count, lp_block = half_player[near_left]
+            lo_count, lo_block = half_opponent[near_left]
+            for right in range(4 ** 4):
+                rp_count, rp_block = half_player[right]
+                ro_count, ro_block = half_opponent[right]
+                opponent_count = lo_count + ro_count
+                opponent_block = lo_block + ro_block
+                entry = (
+                    line_score(lp_count + rp_count, lp_block + rp_block),
+                    line_score(opponent_count, opponent_block),
+                    # 对方落在中心后形成活二（中心+1子，两端无挡）
+                    1 if opponent_count == 1 and opponent_block == 0 else 0,
+                )
+                table[left | (right << 8)] = shared.setdefault(entry, entry)
+        tables[player] = table
+    return tables
+
+
+def _build_line_windows():
+    """每个格子、每个方向的窗口：(棋盘外格子的固定编码, ((位序号, 权重), ...))"""
+    windows = [None] * (STRIDE * BOARD_SIZE)
+    for y in range(BOARD_SIZE):
+        for x in range(BOARD_SIZE):
+            per_direction = []
+            for dx, dy in DIRECTIONS:
+                base = 0
+                cells = []
+                for offset, weight in zip(WINDOW_OFFSETS, WINDOW_WEIGHTS):
+                    nx, ny = x + dx * offset, y + dy * offset
+                    if 0 <= nx < BOARD_SIZE and 0 <= ny < BOARD_SIZE:
+                        cells.append((ny * STRIDE + nx, weight))
+                    else:
+                        base += BOUNDARY * weight
+                per_direction.append((base, tuple(cells)))
+            windows[y * STRIDE + x] = tuple(per_direction)
+    return windows
+
+
+def _build_center_bonus():
+    """中心区域加成（鼓励早期抢占中心）"""
+    bonus = [0] * (STRIDE * BOARD_SIZE)
+    center = BOARD_SIZE // 2
+    for y in range(BOARD_SIZE):
+        for x in range(BOARD_SIZE):
+            distance = math.sqrt((x - center) ** 2 + (y - center) ** 2)
+            bonus[y * STRIDE + x] = max(0, 100 - distance * 5)
+    return bonus
+
+
+# 导入时生成一次
+PATTERN_TABLE = _build_pattern_tables()
+LINE_WINDOWS = _build_line_windows()
+CENTER_BONUS = _build_center_bonus()
+if kernels is not None:
+    kernels.set_tables(PATTERN_TABLE[1], PATTERN_TABLE[2], CENTER_BONUS, SCORE_FOUR, SCORE_TWO)
+
+
+def window_code(cells, window):
+    """按 LINE_WINDOWS 中的一项计算窗口编码，cells 为 BitBoard.cells"""
+    base, positions = window
+    code = base
+    for index, weight in positions:
+        code += cells[index] * weight
+    return code
@@ -61,4 +61,9 @@ class ProgressBar:
 
         font = pygame.font.Font(None, 24)
         text = font.render(f"{self.remaining_time}s", True, (255, 255, 255))
-        screen.blit(text, (self.x + self.width // 2 - text.get_width() // 2, self.y - 25))
\ No newline at end of file
+        screen.blit(text, (self.x + self.width // 2 - text.get_width() // 2, self.y - 25))
+
+    def overlay(self):
+        """对局画面（draw_utils.BoardView）的浮层：剩余秒数变化时才重画"""
+        return ("progress_bar", (self.x, self.y - 25, self.width, self.height + 25),
+                (self.remaining_time, self.total_time), self.draw)
@@ -0,0 +1,111 @@
+import time
+
+
+class SearchStats:
+    """搜索统计（调试用）
+
+    把实例传给 ai.ai_move(stats=...)，搜索过程中由 minmax 等函数累加；
+    不传时各处只多一次 `is None` 判断，不做任何计数和计时。
+    """
+
+    def __init__(self):
+        self.source = None  # 这一步由哪个环节决定：win/block/solved/threat/opening/search/fallback
+        self.root_depth = 0  # 当前迭代的搜索深度，用来把剩余深度换算成层数
+        self.nodes_by_ply = {}  # 层数 → 访问节点数（各轮迭代累加）
+        self.iterations = []  # 每轮迭代：(深度, 节点数, 用时ms, 最佳走法, 分数)，超时的一轮走法为None
+        self.expanded = 0  # 展开了候选点的节点数
+        self.cutoffs = 0  # 发生beta剪枝的节点数
+        self.first_move_cutoffs = 0  # 第一个候选点就剪枝的节点数
+        self.pvs_researches = 0  # 零窗口试探失败后用完整窗口重搜的次数
+        self.qs_nodes = 0  # 叶子之后静态搜索访问的节点数（不计入 nodes_by_ply）
+        self.candidate_lists = 0
+        self.candidate_total = 0
+        self.candidate_max = 0
+        self.tt_probes = 0
+        self.tt_hits = 0
+        self.tt_cutoffs = 0  # 直接用置换表条目返回的次数
+        self.time_eval = 0.0  # 秒，候选点打分（evaluate_position）
+        self.time_movegen = 0.0  # 秒，候选点生成和排序（不含打分）
+        self.time_win_check = 0.0  # 秒，成五判断
+        self.time_threat = 0.0  # 秒，VCF/VCT威胁搜索
+        self.time_total = 0.0
+        self._iteration_start = 0.0
+        self._iteration_nodes = 0
+
+    def count_node(self, depth):
+        ply = self.root_depth - depth
+        self.nodes_by_ply[ply] = self.nodes_by_ply.get(ply, 0) + 1
+
+    def count_candidates(self, count):
+        self.candidate_lists += 1
+        self.candidate_total += count
+        if count > self.candidate_max:
+            self.candidate_max = count
+
+    def begin_iteration(self, depth, nodes):
+        self.root_depth = depth
+        self._iteration_start = time.perf_counter()
+        self._iteration_nodes = nodes
+
+    def end_iteration(self, nodes, move, score):
+        elapsed = (time.perf_counter() - self._iteration_start) * 1000
+        self.iterations.append((self.root_depth, nodes - self._iteration_nodes, elapsed, move, score))
+
+    @property
+    def nodes(self):
+        return sum(self.nodes_by_ply.values())
+
+    def summary(self):
+        """统计结果（dict，可直接写成JSON）"""
+        return {
+            "source": self.source,
+            "nodes": self.nodes,
+            "nodes_by_ply": dict(sorted(self.nodes_by_ply.items())),
+            "iterations": [
+                {"depth": depth, "nodes": nodes, "time_ms": round(ms, 2),
+                 "move": list(move) if move else None, "score": score}
+                for depth, nodes, ms, move, score in self.iterations
+            ],
+            "cutoff_rate": _ratio(self.cutoffs, self.expanded),
+            "first_move_cutoff_ratio": _ratio(self.first_move_cutoffs, self.cutoffs),
+            "pvs_researches": self.pvs_researches,
+            "qs_nodes": self.qs_nodes,
+            "avg_candidates": _ratio(self.candidate_total, self.candidate_lists),
+            "max_candidates": self.candidate_max,
+            "tt_probes": self.tt_probes,
+            "tt_hit_rate": _ratio(self.tt_hits, self.tt_probes),
+            "tt_cutoffs": self.tt_cutoffs,
+            "time_ms": {
+                "total": round(self.time_total * 1000, 2),
+                "eval": round(self.time_eval * 1000, 2),
+                "movegen": round(self.time_movegen * 1000, 2),
+                "win_check": round(self.time_win_check * 1000, 2),
+                "threat": round(self.time_threat * 1000, 2),
+            },
+        }
+
+    def format_lines(self):
+        """供界面调试浮层显示的几行文字"""
+        s = self.summary()
+        times = s["time_ms"]
+        lines = [
+            f"来源: {s['source']}  节点: {s['nodes']}  用时: {times['total']:.0f}ms",
+            "各层节点: " + " ".join(str(n) for n in s["nodes_by_ply"].values()),
+        ]
+        for it in s["iterations"]:
+            lines.append(f"深度{it['depth']}: {it['nodes']}节点 {it['time_ms']:.0f}ms 走法{it['move']}")
+        lines.append(f"剪枝率: {_percent(s['cutoff_rate'])}  首步剪枝: {_percent(s['first_move_cutoff_ratio'])}"
+                     f"  重搜: {s['pvs_researches']}  静态搜索: {s['qs_nodes']}节点")
+        lines.append(f"候选数: 平均{s['avg_candidates'] or 0:.1f} 最多{s['max_candidates']}")
+        lines.append(f"置换表: 命中{_percent(s['tt_hit_rate'])} 截断{s['tt_cutoffs']}")
+        lines.append(f"评估{times['eval']:.0f} 生成{times['movegen']:.0f} "
+                     f"判胜{times['win_check']:.0f} 威胁{times['threat']:.0f} (ms)")
+        return lines
+
+
+def _ratio(part, whole):
+    return round(part / whole, 4) if whole else None
+
+
+def _percent(value):
+    return "-" if value is None else f"{value * 100:.0f}%"
@@ -0,0 +1,145 @@
+"""已解局面缓存：已证明必胜的局面及取胜的一步按8种对称归一后存入sqlite，跨对局保留
+
+只写入VCF（连续冲四）算出的必胜局面；minmax 的候选点有上限、VCT 只试部分防守，
+它们得到的胜负都不算证明，不写入。ai_move 命中时直接落子。
+
+    cache = solved_cache.default_cache()   # 首次调用时打开（不存在则新建）
+    move = cache.lookup(board, player)    # 取胜的一步 (x, y) 或 None
+    cache.store(board, player, move, depth)
+
+数据库使用WAL模式，同一台机器上的多个对局进程可以同时读写同一个文件；
+条目数超过上限时按最近使用时间淘汰最旧的一批（LRU）。
+缓存只是加速手段，数据库被锁或损坏时查询返回None、写入直接放弃，不影响下棋。
+
+    python solved_cache.py info
+    python solved_cache.py clear
+"""
+import argparse
+import os
+import sqlite3
+import sys
+import time
+
+from constants import BOARD_SIZE
+from bitboard import ZOBRIST_SIDE
+from symmetry import canonical_key, transform, inverse_transform, board_stones, KEY_MASK
+
+DEFAULT_SOLVED_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "solved_positions.db")
+DEFAULT_MAX_ENTRIES = 200000
+EVICT_FRACTION = 0.1  # 超出上限时一次淘汰的比例，避免每次写入都淘汰
+BUSY_TIMEOUT = 0.5  # 秒；其他进程正在写入时最多等待这么久
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS solved (
+    key INTEGER PRIMARY KEY,   -- 规范哈希（含轮到落子的一方）
+    move INTEGER NOT NULL,     -- 规范方向下取胜的一步 y*BOARD_SIZE+x
+    depth INTEGER NOT NULL,    -- 证明时的搜索深度，0 表示威胁空间搜索（VCF）
+    used REAL NOT NULL         -- 最近一次写入或命中的时间，LRU淘汰用
+);
+CREATE INDEX IF NOT EXISTS solved_used ON solved (used);
+"""
+
+
+def position_key(board, player):
+    """二维数组局面 + 轮到落子的一方 → (规范哈希, 对称变换)"""
+    key, symmetry = canonical_key(board_stones(board))
+    return (key ^ ZOBRIST_SIDE[player]) & KEY_MASK, symmetry
+
+
+class SolvedCache:
+    """sqlite已解局面表（自动提交，每条语句都是一个独立事务）"""
+
+    def __init__(self, path=DEFAULT_SOLVED_PATH, max_entries=DEFAULT_MAX_ENTRIES):
+        self.path = path
+        self.max_entries = max_entries
+        self._conn = sqlite3.connect(path, timeout=BUSY_TIMEOUT, isolation_level=None,
+                                     check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self.hits = 0
+        self.stores = 0
+
+    def close(self):
+        self._conn.close()
+
+    def lookup(self, board, player):
+        """查询局面，命中时返回取胜的一步 (x, y) 并刷新使用时间，否则返回None"""
+        key, symmetry = position_key(board, player)
+        try:
+            row = self._conn.execute("SELECT move FROM solved WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            move = row[0]
+            x, y = inverse_transform(move % BOARD_SIZE, move // BOARD_SIZE, symmetry)
+            if board[y][x] != 0:
+                return None  # 哈希冲突
+            self._conn.execute("UPDATE solved SET used = ? WHERE key = ?", (time.time(), key))
+        except sqlite3.Error:
+            return None
+        self.hits += 1
+        return x, y
+
+    def store(self, board, player, move, depth):
+        """记录必胜局面和取胜的一步；已有条目时保留更浅的证明"""
+        key, symmetry = position_key(board, player)
+        cx, cy = transform(move[0], move[1], symmetry)
+        try:
+            self._conn.execute(
+                "INSERT INTO solved (key, move, depth, used) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT (key) DO UPDATE SET move = excluded.move, "
+                "depth = excluded.depth, used = excluded.used WHERE excluded.depth <= solved.depth",
+                (key, cy * BOARD_SIZE + cx, depth, time.time()))
+            self.stores += 1
+            if self.stores % 64 == 1:
+                self._evict()
+        except sqlite3.Error:
+            pass
+
+    def _evict(self):
+        """条目数超过上限时删掉最久未用的一批"""
+        count = self.size()
+        if count > self.max_entries:
+            excess = count - self.max_entries + int(self.max_entries * EVICT_FRACTION)
+            self._conn.execute("DELETE FROM solved WHERE key IN "
+                               "(SELECT key FROM solved ORDER BY used LIMIT ?)", (excess,))
+
+    def size(self):
+        return self._conn.execute("SELECT COUNT(*) FROM solved").fetchone()[0]
+
+    def clear(self):
+        self._conn.execute("DELETE FROM solved")
+
+
+_default_cache = None
+_default_cache_loaded = False
+
+
+def default_cache():
+    """程序目录下的 solved_positions.db（首次调用时打开或新建）；无法打开时返回None"""
+    global _default_cache, _default_cache_loaded
+    if not _default_cache_loaded:
+        _default_cache_loaded = True
+        try:
+            _default_cache = SolvedCache()
+        except sqlite3.Error:
+            _default_cache = None
+    return _default_cache
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="五子棋已解局面缓存工具")
+    parser.add_argument("command", choices=("info", "clear"))
+    parser.add_argument("path", nargs="?", default=DEFAULT_SOLVED_PATH)
+    args = parser.parse_args(argv)
+
+    cache = SolvedCache(args.path)
+    if args.command == "clear":
+        cache.clear()
+    print(f"{args.path}: {cache.size()} 个必胜局面，上限 {cache.max_entries}")
+    cache.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,55 @@
+from constants import BOARD_SIZE
+from bitboard import ZOBRIST, STRIDE
+
+# 棋盘的8种对称变换（旋转0/90/180/270度，以及再做一次翻转）
+SYMMETRY_COUNT = 8
+_LAST = BOARD_SIZE - 1
+_TRANSFORMS = (
+    lambda x, y: (x, y),                  # 原样
+    lambda x, y: (_LAST - y, x),          # 旋转90度
+    lambda x, y: (_LAST - x, _LAST - y),  # 旋转180度
+    lambda x, y: (y, _LAST - x),          # 旋转270度
+    lambda x, y: (_LAST - x, y),          # 左右翻转
+    lambda x, y: (x, _LAST - y),          # 上下翻转
+    lambda x, y: (y, x),                  # 沿主对角线翻转
+    lambda x, y: (_LAST - y, _LAST - x),  # 沿副对角线翻转
+)
+# 逆变换：旋转90和270度互逆，其余都是自身的逆
+_INVERSE = (0, 3, 2, 1, 4, 5, 6, 7)
+
+# sqlite 的整数是有符号64位，哈希只取低63位
+KEY_MASK = (1 << 63) - 1
+
+
+def transform(x, y, symmetry):
+    """把坐标(x,y)做第symmetry种对称变换"""
+    return _TRANSFORMS[symmetry](x, y)
+
+
+def inverse_transform(x, y, symmetry):
+    """transform 的逆变换"""
+    return _TRANSFORMS[_INVERSE[symmetry]](x, y)
+
+
+def board_stones(board):
+    """二维数组棋盘 → [(x, y, player), ...]"""
+    return [(x, y, int(board[y][x]))
+            for y in range(BOARD_SIZE) for x in range(BOARD_SIZE) if board[y][x] != 0]
+
+
+def canonical_key(stones):
+    """局面在8种对称下的规范哈希：返回 (key, symmetry)
+
+    key 为8种变换后Zobrist哈希中最小的一个（63位），相互对称的局面得到同一个key；
+    symmetry 为取到最小值的那种变换，用 transform/inverse_transform 换算落子坐标。
+    """
+    best_key, best_symmetry = None, 0
+    for symmetry, func in enumerate(_TRANSFORMS):
+        key = 0
+        for x, y, player in stones:
+            tx, ty = func(x, y)
+            key ^= ZOBRIST[player][ty * STRIDE + tx]
+        key &= KEY_MASK
+        if best_key is None or key < best_key:
+            best_key, best_symmetry = key, symmetry
+    return best_key, best_symmetry
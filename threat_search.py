@@ -0,0 +1,167 @@
+import time
+from bitboard import STRIDE, iter_bits, popcount
+from patterns import PATTERN_TABLE
+
+# 默认搜索限制
+VCF_MAX_NODES = 4000
+VCT_MAX_NODES = 2000
+VCF_MAX_DEPTH = 15  # 进攻方最多连续走几步威胁棋
+VCT_MAX_DEPTH = 8
+
+
+class _LimitReached(Exception):
+    """超出节点数或时间限制"""
+
+
+class _ThreatSearch:
+    """威胁空间搜索：进攻方每步都必须形成威胁（冲四，VCT中还包括活三），
+    防守方只考虑能化解威胁的应手，因此分支很少，可以算到很深。
+    """
+
+    def __init__(self, board, attacker, allow_three, max_nodes, max_depth, deadline):
+        self.board = board
+        self.attacker = attacker
+        self.defender = 3 - attacker
+        self.allow_three = allow_three
+        self.max_nodes = max_nodes
+        self.max_depth = max_depth
+        self.deadline = deadline
+        self.nodes = 0
+
+    def _count_node(self):
+        self.nodes += 1
+        if self.nodes > self.max_nodes:
+            raise _LimitReached()
+        if self.deadline is not None and self.nodes & 63 == 0 and time.monotonic() >= self.deadline:
+            raise _LimitReached()
+
+    def _has_threat(self):
+        """进攻方是否有未化解的威胁：已成四，或（VCT中）下一步能成活四/双四"""
+        board = self.board
+        if board.winning_points(self.attacker):
+            return True
+        if not self.allow_three:
+            return False
+        for x, y in iter_bits(board.window_points(self.attacker, 3)):
+            board.place(x, y, self.attacker)
+            double = popcount(board.winning_points(self.attacker)) >= 2
+            board.remove(x, y)
+            if double:
+                return True
+        return False
+
+    def _attack_value(self, move):
+        """按四个方向的己方棋型分之和排序，双三、四三等组合威胁优先"""
+        x, y = move
+        base = (y * STRIDE + x) * 4
+        codes = self.board.codes
+        table = PATTERN_TABLE[self.attacker]
+        return (table[codes[base]][0] + table[codes[base + 1]][0]
+                + table[codes[base + 2]][0] + table[codes[base + 3]][0])
+
+    def _threat_moves(self, fours_only):
+        """进攻方的威胁走法：先冲四，VCT中再加上可能成活三的点"""
+        board = self.board
+        fours = board.window_points(self.attacker, 3)
+        moves = sorted(iter_bits(fours), key=self._attack_value, reverse=True)
+        if self.allow_three and not fours_only:
+            threes = iter_bits(board.window_points(self.attacker, 2) & ~fours)
+            moves.extend(sorted(threes, key=self._attack_value, reverse=True))
+        return moves
+
+    def attack(self, depth):
+        """进攻方走棋，返回取胜的落子序列，找不到返回None"""
+        self._count_node()
+        board = self.board
+        attacker = self.attacker
+
+        wins = board.winning_points(attacker)
+        if wins:
+            return [next(iter_bits(wins))]
+
+        # 对方已有冲四：只能先挡，挡完仍保有威胁才能继续
+        blocks = board.winning_points(self.defender)
+        if blocks:
+            if popcount(blocks) >= 2:
+                return None
+            x, y = next(iter_bits(blocks))
+            board.place(x, y, attacker)
+            sequence = self.defend(depth) if self._has_threat() else None
+            board.remove(x, y)
+            return [(x, y)] + sequence if sequence is not None else None
+
+        if depth >= self.max_depth:
+            return None
+
+        last = depth == self.max_depth - 1
+        for x, y in self._threat_moves(last):
+            board.place(x, y, attacker)
+            if last:
+                # 最后一步只能靠活四/双四直接取胜，不必再展开防守方
+                sequence = [] if popcount(board.winning_points(attacker)) >= 2 else None
+            else:
+                sequence = self.defend(depth + 1) if self._has_threat() else None
+            board.remove(x, y)
+            if sequence is not None:
+                return [(x, y)] + sequence
+        return None
+
+    def defend(self, depth):
+        """防守方应对，所有应手都被破解才算进攻成功"""
+        self._count_node()
+        board = self.board
+        defender = self.defender
+
+        if board.winning_points(defender):
+            return None  # 防守方直接成五
+
+        wins = board.winning_points(self.attacker)
+        if wins:
+            if popcount(wins) >= 2:
+                return []  # 活四/双四，挡不住
+            defenses = list(iter_bits(wins))
+        else:
+            # 活三：只能在进攻方的成四点上防守，或者反冲四抢先手
+            defenses = list(iter_bits(board.window_points(self.attacker, 3)
+                                      | board.window_points(defender, 3)))
+
+        line = None
+        for x, y in defenses:
+            board.place(x, y, defender)
+            sequence = self.attack(depth)
+            board.remove(x, y)
+            if sequence is None:
+                return None
+            if line is None:
+                line = [(x, y)] + sequence
+        return line
+
+
+def _search(board, player, allow_three, max_nodes, max_depth, time_limit_ms):
+    deadline = time.monotonic() + time_limit_ms / 1000 if time_limit_ms is not None else None
+    search = _ThreatSearch(board.copy(), player, allow_three, max_nodes, max_depth, deadline)
+    try:
+        # 逐步放宽进攻步数限制，短的取胜序列先被找到；节点数限制是共用的
+        for depth_limit in range(1, max_depth + 1):
+            search.max_depth = depth_limit
+            sequence = search.attack(0)
+            if sequence is not None:
+                return sequence
+    except _LimitReached:
+        pass
+    return None
+
+
+def find_vcf(board, player, max_nodes=VCF_MAX_NODES, max_depth=VCF_MAX_DEPTH, time_limit_ms=None):
+    """连续冲四取胜（VCF）
+
+    board 为 EvalBoard（用其中的窗口编码给威胁走法排序），不会被修改。
+    返回双方交替的落子序列（第一步为player的落子），在限制内找不到则返回None。
+    传入对手即可检测对手是否有VCF。
+    """
+    return _search(board, player, False, max_nodes, max_depth, time_limit_ms)
+
+
+def find_vct(board, player, max_nodes=VCT_MAX_NODES, max_depth=VCT_MAX_DEPTH, time_limit_ms=None):
+    """连续冲四、活三取胜（VCT），返回值同 find_vcf"""
+    return _search(board, player, True, max_nodes, max_depth, time_limit_ms)
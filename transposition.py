@@ -0,0 +1,41 @@
+# 置换表条目的边界类型
+EXACT = 0  # 精确值
+LOWER = 1  # 下界（发生beta剪枝，真实值 >= score）
+UPPER = 2  # 上界（所有走法都不超过alpha，真实值 <= score）
+
+DEFAULT_TT_SIZE = 1 << 18  # 默认槽位数
+
+
+class TranspositionTable:
+    """置换表：按Zobrist哈希保存搜索结果
+
+    固定槽位数（哈希取模定位），同一槽位冲突时的替换策略：
+    空槽和之前几次搜索留下的旧条目直接覆盖；
+    本次搜索的条目只被不浅于它的搜索结果覆盖（深度优先）。
+    """
+
+    def __init__(self, size=DEFAULT_TT_SIZE):
+        self.size = size
+        self.slots = [None] * size  # (key, depth, flag, score, best_move, generation)
+        self.generation = 0
+
+    def new_search(self):
+        """每次ai_move开始时调用，之前的条目变为可被替换的旧条目"""
+        self.generation += 1
+
+    def clear(self):
+        self.slots = [None] * self.size
+        self.generation = 0
+
+    def lookup(self, key):
+        """返回 (depth, flag, score, best_move)，未命中返回None"""
+        entry = self.slots[key % self.size]
+        if entry is None or entry[0] != key:
+            return None
+        return entry[1:5]
+
+    def store(self, key, depth, flag, score, best_move):
+        index = key % self.size
+        entry = self.slots[index]
+        if entry is None or entry[5] != self.generation or depth >= entry[1]:
+            self.slots[index] = (key, depth, flag, score, best_move, self.generation)
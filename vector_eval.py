@@ -0,0 +1,94 @@
+import numpy as np
+from constants import BOARD_SIZE
+from bitboard import STRIDE, iter_bits
+from patterns import (PATTERN_TABLE, DIRECTIONS, WINDOW_OFFSETS, WINDOW_WEIGHTS, BOUNDARY,
+                      CENTER_BONUS, SCORE_FOUR, SCORE_TWO)
+
+# 整盘一次性打分：四个方向的窗口编码用平移切片加权求和（相当于按4进制权重做一维卷积），
+# 再用 patterns.PATTERN_TABLE 转成的数组查表，按 ai._score_from_codes 的规则逐格组合。
+# 结果与逐格调用 ai.evaluate_position 完全相同（已落子的格子为0）。
+
+PAD = 4  # 窗口半径，棋盘外补4圈“棋盘外”格子
+
+
+def _build_table_arrays():
+    arrays = [None, None, None]
+    for player in (1, 2):
+        table = PATTERN_TABLE[player]
+        arrays[player] = (
+            np.array([entry[0] for entry in table], dtype=np.int64),  # 己方分
+            np.array([entry[1] for entry in table], dtype=np.int64),  # 对方分
+            np.array([entry[2] for entry in table], dtype=np.int64),  # 对方活二标记
+        )
+    return arrays
+
+
+_TABLE_ARRAYS = _build_table_arrays()
+CENTER_MATRIX = np.array([[CENTER_BONUS[y * STRIDE + x] for x in range(BOARD_SIZE)]
+                          for y in range(BOARD_SIZE)])
+
+
+def pattern_codes(board):
+    """整盘的窗口编码，形状 (4, 15, 15)，与 EvalBoard.codes 中的值相同"""
+    size = BOARD_SIZE
+    padded = np.full((size + 2 * PAD, size + 2 * PAD), BOUNDARY, dtype=np.int64)
+    padded[PAD:PAD + size, PAD:PAD + size] = board
+    codes = np.zeros((4, size, size), dtype=np.int64)
+    for direction, (dx, dy) in enumerate(DIRECTIONS):
+        for offset, weight in zip(WINDOW_OFFSETS, WINDOW_WEIGHTS):
+            ox, oy = PAD + dx * offset, PAD + dy * offset
+            codes[direction] += padded[oy:oy + size, ox:ox + size] * weight
+    return codes
+
+
+def score_matrix(board, player, codes=None):
+    """返回15x15的分数矩阵 scores[y][x]，即 evaluate_position(board, player, x, y)
+
+    board 为二维数组（numpy数组或嵌套列表）；codes 可传入 pattern_codes 的结果以便两方共用。
+    """
+    board = np.asarray(board)
+    if codes is None:
+        codes = pattern_codes(board)
+    own_table, opponent_table, two_table = _TABLE_ARRAYS[player]
+    own = own_table[codes]
+    opponent = opponent_table[codes]
+    high_risk = two_table[codes].sum(axis=0) >= 2
+
+    # 四个方向各自的得分，分支与 ai._score_from_codes 一一对应
+    terms = np.where(
+        opponent >= SCORE_FOUR, opponent * 3,
+        np.where(high_risk & (opponent >= SCORE_TWO), opponent * 2,
+                 np.where(opponent >= SCORE_TWO, own * 1.2 + opponent * 0.3,
+                          own * 1.5 + opponent * 0.5)))
+    # 按方向顺序逐个相加，浮点结果与逐格计算一致
+    scores = terms[0] + terms[1]
+    scores = scores + terms[2]
+    scores = scores + terms[3]
+    scores = scores + CENTER_MATRIX
+    scores[board != 0] = 0
+    return scores
+
+
+def score_matrices(board):
+    """双方的分数矩阵 [None, 黑, 白]，窗口编码只算一次"""
+    board = np.asarray(board)
+    codes = pattern_codes(board)
+    return [None, score_matrix(board, 1, codes), score_matrix(board, 2, codes)]
+
+
+def fill_score_cache(bitboard, board):
+    """用整盘分数矩阵填满 EvalBoard 的评估缓存，之后根节点的候选点排序只需查缓存
+
+    已落子的格子留空（None）：回溯提子时不会作废该格自身的缓存，不能存0。
+    """
+    matrices = score_matrices(board)
+    stones = list(iter_bits(bitboard.occupied))
+    for player in (1, 2):
+        cache = bitboard.score_cache[player]
+        rows = matrices[player].tolist()
+        for x, y in stones:
+            rows[y][x] = None
+        for y in range(BOARD_SIZE):
+            base = y * STRIDE
+            cache[base:base + BOARD_SIZE] = rows[y]
+    return matrices